@@ -3,14 +3,20 @@ import dash_bootstrap_components as dbc
 from dash import html
 
 from components.header import header
+from reports.aco_dashboard.callbacks import warm_up_default_view
 from services.database import sqlite_manager
+from services.settings import ARTIFACT_PATH
 
-sqlite_manager.initialize()
+if ARTIFACT_PATH:
+    sqlite_manager.open_artifact(ARTIFACT_PATH)
+else:
+    sqlite_manager.initialize()
 
 app = dash.Dash(
     __name__,
     external_stylesheets=[dbc.themes.BOOTSTRAP],
     suppress_callback_exceptions=True,
+    compress=True,
     assets_folder="assets",
     title="TUVA Health ACO Analytics",
     use_pages=True,
@@ -24,5 +30,17 @@ app.layout = html.Div(
     ]
 )
 
+warm_up_default_view()
+
+# WSGI entry point for gunicorn (see gunicorn.conf.py).
+server = app.server
+
+
+@server.route("/metrics")
+def metrics():
+    """Return this worker's query admission counters by lane, as JSON."""
+    return sqlite_manager.admission.stats()
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,26 @@
+// Virtual scrolling for the CCSR cost-driver chart: when the chart is scrolled
+// to the bottom, click "load more" so the server renders the next page.
+(function () {
+    let lastHeight = null;
+
+    document.addEventListener(
+        "scroll",
+        function (event) {
+            const target = event.target;
+            if (!(target instanceof Element) || !target.closest("#condition-ccsr-container")) {
+                return;
+            }
+            const button = document.getElementById("condition-ccsr-load-more");
+            if (!button || button.style.display === "none") {
+                return;
+            }
+            const atBottom = target.scrollTop + target.clientHeight >= target.scrollHeight - 40;
+            // Only request one page per content height, i.e. until the new page renders.
+            if (atBottom && target.scrollHeight !== lastHeight) {
+                lastHeight = target.scrollHeight;
+                button.click();
+            }
+        },
+        true
+    );
+})();
@@ -0,0 +1,67 @@
+// Clientside callbacks for updates that need no data from the server: they run
+// in the browser instead of as requests (see reports/aco_dashboard/callbacks.py).
+(function () {
+    function triggered(propId) {
+        return window.dash_clientside.callback_context.triggered.some(function (trigger) {
+            return trigger.prop_id === propId;
+        });
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        dashboard: {
+            // Label of the comparison period under the KPI card.
+            comparisonText: function (comparisonPeriod) {
+                return comparisonPeriod;
+            },
+
+            // Pages of CCSR categories to show: scrolling to the bottom of the
+            // chart clicks "load more"; any other change starts again from the
+            // first page.
+            ccsrPages: function (nClicks, startDate, endDate, groupClick, pages) {
+                if (triggered("condition-ccsr-load-more.n_clicks")) {
+                    return (pages || 1) + 1;
+                }
+                return 1;
+            },
+
+            // Highlight the selected bars by their customdata, so the selection
+            // stays shown when the server replaces or patches the figure.
+            highlightSelected: function (selectedData, figure) {
+                if (!figure || !figure.data) {
+                    return window.dash_clientside.no_update;
+                }
+                const points = (selectedData && selectedData.points) || [];
+                const selected = new Set(
+                    points.map(function (point) {
+                        return point.customdata;
+                    })
+                );
+                let changed = false;
+                const data = figure.data.map(function (trace) {
+                    if (!Array.isArray(trace.customdata)) {
+                        return trace;
+                    }
+                    let selectedPoints = null;
+                    if (selected.size) {
+                        selectedPoints = [];
+                        trace.customdata.forEach(function (value, index) {
+                            if (selected.has(value)) {
+                                selectedPoints.push(index);
+                            }
+                        });
+                    }
+                    const current = trace.selectedpoints || null;
+                    if (JSON.stringify(current) === JSON.stringify(selectedPoints)) {
+                        return trace;
+                    }
+                    changed = true;
+                    return Object.assign({}, trace, { selectedpoints: selectedPoints });
+                });
+                if (!changed) {
+                    return window.dash_clientside.no_update;
+                }
+                return Object.assign({}, figure, { data: data });
+            },
+        },
+    });
+})();
@@ -0,0 +1,18 @@
+// Tag callback requests with an id of this browser tab, so the server can
+// cancel the queries of a request once a newer one for the same callback
+// supersedes it (see services/admission.py).
+(function () {
+    const tabId = Math.random().toString(36).slice(2) + Date.now().toString(36);
+    const fetch = window.fetch;
+
+    window.fetch = function (resource, options) {
+        const url = typeof resource === "string" ? resource : resource && resource.url;
+        if (url && url.includes("_dash-update-component")) {
+            options = Object.assign({}, options);
+            options.headers = Object.assign({}, options.headers, {
+                "X-Dashboard-Tab": tabId,
+            });
+        }
+        return fetch.call(this, resource, options);
+    };
+})();
@@ -0,0 +1,83 @@
+"""Count the callbacks each dashboard interaction triggers.
+
+`python -m benchmarks.callback_count` reads the registered callbacks (without
+loading any data) and prints, for each user interaction in `INTERACTIONS`,
+how many server callbacks (one HTTP request each) and clientside callbacks
+it sets off. A callback fires when one of its inputs changes and, in turn,
+changes its outputs, so chained callbacks are followed; one whose output is
+rendered inside another callback's output (`RENDERED_IN`) runs again each
+time that content is replaced. Progressive refinements (`*-refine` stores)
+are counted too, although they only follow answers estimated from the
+sample.
+"""
+
+import dash._callback
+
+# Input properties each interaction changes.
+INTERACTIONS = {
+    "change the period": [
+        "date-picker-input.start_date",
+        "date-picker-input.end_date",
+    ],
+    "change the comparison period": ["comparison-period-dropdown.value"],
+    "select encounter groups": ["encounter-group-chart.selectedData"],
+    "select CCSR categories": ["condition-ccsr-chart.selectedData"],
+    "scroll to more CCSR categories": ["condition-ccsr-load-more.n_clicks"],
+    "page the top members": ["top-members-next.n_clicks"],
+}
+
+# Components created by a callback's output rather than the static layout.
+RENDERED_IN = {"comparison-pmpm": "pmpm-cost-card.children"}
+
+
+def _outputs(entry: dict) -> list[str]:
+    """Return the `"<component id>.<property>"` outputs of a registered callback."""
+    # Several outputs are joined as "..a.x...b.y.."; duplicates carry "@<hash>".
+    outputs = entry["output"].strip(".").split("...")
+    return [output.split("@")[0] for output in outputs]
+
+
+def _triggered(entry: dict, changed: set[str]) -> bool:
+    inputs = [f"{item['id']}.{item['property']}" for item in entry["inputs"]]
+    rendered = [RENDERED_IN.get(output.split(".")[0]) for output in _outputs(entry)]
+    return any(prop in changed for prop in inputs + rendered)
+
+
+def count(changed: list[str]) -> tuple[int, int]:
+    """Return the server and clientside callbacks triggered by changing `changed`.
+
+    Args:
+        changed (list[str]): `"<component id>.<property>"` of the changed inputs.
+
+    Returns:
+        tuple[int, int]: Server and clientside callbacks that run, each
+            counted once however many of its inputs change.
+    """
+    callbacks = dash._callback.GLOBAL_CALLBACK_LIST
+    changed = set(changed)
+    fired = set()
+    while True:
+        newly = [
+            index
+            for index, entry in enumerate(callbacks)
+            if index not in fired and _triggered(entry, changed)
+        ]
+        if not newly:
+            break
+        fired.update(newly)
+        for index in newly:
+            changed.update(_outputs(callbacks[index]))
+    clientside = sum(
+        1 for index in fired if callbacks[index]["clientside_function"] is not None
+    )
+    return len(fired) - clientside, clientside
+
+
+if __name__ == "__main__":
+    # Imported here: registering the callbacks imports the whole dashboard.
+    import reports.aco_dashboard.callbacks  # noqa: F401
+
+    print(f"{'interaction':<32} {'server':>7} {'clientside':>11}")
+    for interaction, changed in INTERACTIONS.items():
+        server, clientside = count(changed)
+        print(f"{interaction:<32} {server:>7} {clientside:>11}")
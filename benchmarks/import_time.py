@@ -0,0 +1,82 @@
+"""Import-time benchmark of the dashboard modules.
+
+`python -m benchmarks.import_time` imports the app's modules in a fresh
+interpreter under `python -X importtime` (without loading any data) and
+prints the total and the slowest imports. It exits with status 1 when the
+total exceeds `--budget-ms` or when a module that must only be imported on
+demand (see `LAZY_MODULES`) was imported; `tests/test_import_time.py` runs
+the same check with a looser budget.
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+# Modules the dashboard imports: everything `app.py` pulls in before loading data.
+APP_MODULES = (
+    "components.header",
+    "reports.aco_dashboard.callbacks",
+    "services.database",
+)
+
+# Heavy optional dependencies only imported by the code paths that need them.
+LAZY_MODULES = ("snowflake.connector",)
+
+
+def measure(modules=APP_MODULES) -> list[tuple[str, int, int]]:
+    """Import `modules` in a new interpreter and return its `-X importtime` records.
+
+    Returns:
+        list[tuple[str, int, int]]: `(module, self_us, cumulative_us)` per
+            imported module, in import order; nested imports are indented.
+    """
+    code = "import " + ", ".join(modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    records = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        # One space follows the separator; deeper imports are indented further.
+        records.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return records
+
+
+def total_ms(records: list[tuple[str, int, int]]) -> float:
+    """Return the import time of the top-level imports of `measure()` records."""
+    # Top-level imports are the ones not nested under another import.
+    return sum(cum for name, _, cum in records if not name.startswith(" ")) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=1800)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    records = measure()
+    total = total_ms(records)
+    print(f"Total import time: {total:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for name, self_us, cum_us in sorted(records, key=lambda r: -r[2])[: args.top]:
+        print(f"{cum_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {name.strip()}")
+
+    imported = {name.strip() for name, _, _ in records}
+    eager = [module for module in LAZY_MODULES if module in imported]
+    if eager:
+        print(f"❌ Imported eagerly: {', '.join(eager)}")
+    if total > args.budget_ms:
+        print(f"❌ Import time over budget by {total - args.budget_ms:.0f} ms")
+    if eager or total > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Cold-cache I/O benchmark of windowed fact-table queries.
+
+`python -m benchmarks.io_benchmark [db_path ...]` runs YEAR_MONTH-windowed
+queries (the latest month, quarter and year of claims) against each SQLite
+database, as the dashboard routes them. Before each query the file is evicted
+from the OS page cache and a new connection is opened, so SQLite's own cache
+is empty. It prints the bytes SQLite read from the file and the time taken.
+
+Build the databases to compare by running the app's initialization with
+different settings, e.g. `CLUSTERED_LAYOUT=false` and `true`, and copying
+`app_data.db` between runs.
+"""
+
+import os
+import sqlite3
+import sys
+import time
+
+from services.database import SQLiteManager
+from services.queries import sqlite_path
+
+QUERIES = {
+    "claims paid": """
+        SELECT SUM(PAID_AMOUNT) FROM {claims}
+        WHERE YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+    """,
+    "claims paid, one group": """
+        SELECT SUM(PAID_AMOUNT) FROM {claims}
+        WHERE YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+            AND ENCOUNTER_GROUP_SK = :group_sk
+    """,
+    "member months": """
+        SELECT YEAR_MONTH, COUNT(DISTINCT PERSON_ID) FROM {members}
+        WHERE YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+        GROUP BY YEAR_MONTH
+    """,
+}
+
+
+def _bytes_read() -> int:
+    """Bytes this process has read through `read()` calls so far."""
+    with open("/proc/self/io") as io:
+        return next(int(line.split()[1]) for line in io if line.startswith("rchar"))
+
+
+def _evict(path: str):
+    """Drop a file's pages from the OS page cache."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def windows(db_path: str) -> dict[str, tuple[int, int]]:
+    """Return the latest month, quarter and year of claims in the database."""
+    conn = sqlite3.connect(db_path)
+    try:
+        (last,) = conn.execute("SELECT MAX(YEAR_MONTH) FROM FACT_CLAIMS").fetchone()
+    finally:
+        conn.close()
+    year, month = divmod(int(last), 100)
+    quarter_start = (month - 1) // 3 * 3 + 1
+    return {
+        "month": (last, last),
+        "quarter": (year * 100 + quarter_start, year * 100 + quarter_start + 2),
+        "year": (year * 100 + 1, year * 100 + 12),
+    }
+
+
+def measure(db_path: str, sql: str, params: dict) -> tuple[int, float]:
+    """Run `sql` on a cold cache; return the bytes read and the seconds taken."""
+    _evict(db_path)
+    before, started = _bytes_read(), time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    return _bytes_read() - before, time.perf_counter() - started
+
+
+def main(db_paths: list[str]):
+    print(f"{'database':<24} {'query':<24} {'window':<8} {'KiB read':>9} {'ms':>7}")
+    for db_path in db_paths:
+        manager = SQLiteManager(db_path)
+        for window, (start, end) in windows(db_path).items():
+            sources = {
+                "claims": manager.route("FACT_CLAIMS", windowed=True),
+                "members": manager.route("FACT_MEMBER_MONTHS", windowed=True),
+            }
+            params = {"start_yyyymm": start, "end_yyyymm": end, "group_sk": 1}
+            for name, template in QUERIES.items():
+                read, seconds = measure(db_path, template.format(**sources), params)
+                print(
+                    f"{os.path.basename(db_path):<24} {name:<24} {window:<8} "
+                    f"{read / 1024:>9.0f} {seconds * 1000:>7.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or [sqlite_path])
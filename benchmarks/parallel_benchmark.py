@@ -0,0 +1,91 @@
+"""Core-scaling benchmark of the map-reduce aggregations.
+
+`python -m benchmarks.parallel_benchmark [db_path]` runs the aggregations that
+can be split over month chunks (CCSR categories, encounter groups, cohort
+member totals) over the whole YEAR_MONTH range of a database: first as one
+statement, then map-reduced with 1, 2, 4, ... worker processes up to the
+CPU count. The result cache is bypassed and each timing is the best of
+`REPEATS` runs, after a warm-up run that starts the pool and fills the page
+cache. Speedups are relative to one worker, so near-linear scaling shows as a
+speedup close to the worker count.
+
+Build a database large enough to be worth splitting first, e.g. with
+`PARTITION_GRAIN=quarter` and a full Snowflake extract.
+"""
+
+import os
+import sqlite3
+import sys
+import time
+
+from services.database import sqlite_manager
+from services.parallel import chunk_periods, chunk_pool
+from services.queries import sqlite_path
+from services.result_cache import result_cache
+
+REPEATS = 3
+
+
+def _best_ms(func, *args) -> float:
+    func(*args)
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main(db_path: str):
+    # Imported here: the dashboard reads the settings patched below.
+    from reports.aco_dashboard import data
+
+    sqlite_manager.db_path = db_path
+    result_cache.max_bytes = 0
+    data.PARALLEL_MIN_ROWS = 0
+    conn = sqlite3.connect(db_path)
+    try:
+        start, end = conn.execute(
+            "SELECT MIN(YEAR_MONTH), MAX(YEAR_MONTH) FROM FACT_CLAIMS"
+        ).fetchone()
+    finally:
+        conn.close()
+
+    aggregations = {
+        "CCSR categories": (data.get_condition_ccsr_data, start, end, None),
+        "encounter groups": (
+            data.get_pmpm_performance_vs_expected_data,
+            start,
+            end,
+            None,
+        ),
+        "cohort members": (data.get_cohort_data, start, end, None),
+    }
+    chunks = chunk_periods(start, end, data.PARALLEL_CHUNK)
+    print(
+        f"{db_path}: {start} to {end}, "
+        f"{sqlite_manager.window_rows('FACT_CLAIMS', start, end)} claim lines, "
+        f"{len(chunks)} {data.PARALLEL_CHUNK} chunks, {os.cpu_count()} CPUs"
+    )
+
+    workers = [1]
+    while workers[-1] * 2 <= (os.cpu_count() or 1):
+        workers.append(workers[-1] * 2)
+    print(f"{'aggregation':<18} {'workers':>8} {'ms':>9} {'speedup':>8}")
+    for name, (func, *args) in aggregations.items():
+        data.PARALLEL_WORKERS = 0
+        print(f"{name:<18} {'single':>8} {_best_ms(func, *args):>9.1f}")
+        baseline = None
+        for count in workers:
+            chunk_pool.shutdown()
+            chunk_pool.max_workers = count
+            # The mode is enabled by any count above 1; the pool size decides.
+            data.PARALLEL_WORKERS = max(count, 2)
+            ms = _best_ms(func, *args)
+            baseline = baseline or ms
+            print(f"{name:<18} {count:>8} {ms:>9.1f} {baseline / ms:>7.2f}x")
+    chunk_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else sqlite_path)
@@ -1,8 +1,9 @@
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objs as go
+from plotly.colors import qualitative
 
+from components.figure_spec import as_array, figure_spec, props
 from components.no_data_figure import no_data_figure
+from services.figure_cache import cached_figure
 
 
 def vertical_bar_chart(
@@ -44,7 +45,7 @@ def vertical_bar_chart(
         hover_textcolor (str, optional): Text color for hover labels. Defaults to 'black'.
 
     Returns:
-        plotly.graph_objects.Figure: A plotly vertical bar chart figure.
+        dict: A plotly vertical bar chart figure spec.
 
     Notes:
         - Chart height is dynamically calculated based on number of bars
@@ -70,32 +71,34 @@ def vertical_bar_chart(
         min_height, n_bars * bar_height + 100
     )  # Define the height of the bar to maintain the proper height of graph
 
-    fig = go.Figure(
-        go.Bar(
-            x=x_value,
-            y=y_value,
-            orientation="v",
-            marker_color=color_fn if color_fn else marker_color,
-            text=text_fn,
-            textposition=text_position,
-            hovertemplate=hover_template,
-            hoverlabel=dict(
-                bgcolor=hover_backgroundcolor, font=dict(color=hover_textcolor)
-            ),
-            customdata=custom,
-        )
+    bar = props(
+        type="bar",
+        x=as_array(x_value),
+        y=as_array(y_value),
+        orientation="v",
+        marker=dict(color=color_fn if color_fn else marker_color),
+        text=text_fn,
+        textposition=text_position,
+        hovertemplate=hover_template,
+        hoverlabel=dict(
+            bgcolor=hover_backgroundcolor, font=dict(color=hover_textcolor)
+        ),
+        customdata=as_array(custom),
     )
-    fig.update_layout(
-        margin=margin,
-        xaxis=dict(automargin=True),
-        yaxis=dict(showticklabels=show_tick_labels, range=[0, y_range_max]),
-        plot_bgcolor=plot_bgcolor,
-        clickmode=click_mode,
-        height=fig_height,
+    return figure_spec(
+        [bar],
+        dict(
+            margin=margin,
+            xaxis=dict(automargin=True),
+            yaxis=dict(showticklabels=show_tick_labels, range=[0, y_range_max]),
+            plot_bgcolor=plot_bgcolor,
+            clickmode=click_mode,
+            height=fig_height,
+        ),
     )
-    return fig
 
 
+@cached_figure("horizontal_bar_chart")
 def horizontal_bar_chart(
     data,
     x,
@@ -108,11 +111,13 @@ def horizontal_bar_chart(
     show_tick_labels=True,
     plot_bgcolor="white",
     click_mode="event+select",
+    drag_mode=None,
     custom_data=None,
     text_position=None,
     hover_template=None,
     hover_backgroundcolor="white",
     hover_textcolor="black",
+    error=None,
 ):
     """Create and return a horizontal bar chart using plotly.
 
@@ -128,14 +133,16 @@ def horizontal_bar_chart(
         show_tick_labels (bool, optional): Whether to show x-axis tick labels. Defaults to True.
         plot_bgcolor (str, optional): Background color of the plot. Defaults to 'white'.
         click_mode (str, optional): Mode for handling click events. Defaults to 'event+select'.
+        drag_mode (str, optional): Drag interaction, e.g. 'select' to box-select several bars. Defaults to None (zoom).
         custom_data (array-like, optional): Custom data for hover information. Defaults to None.
         text_position (str, optional): Position of text labels ('inside' or 'outside'). Defaults to 'outside'.
         hover_template (str, optional): Template for hover information display. Defaults to None.
         hover_backgroundcolor (str, optional): Background color for hover labels. Defaults to 'white'.
         hover_textcolor (str, optional): Text color for hover labels. Defaults to 'black'.
+        error (str, optional): Column of `data` with the half-width of each bar's confidence interval, drawn as error bars. Defaults to None.
 
     Returns:
-        plotly.graph_objs.Figure: A horizontal bar chart figure object.
+        dict: A horizontal bar chart figure spec, served from the figure cache when the same data and styling were rendered before.
 
     Notes:
         - The chart height adjusts automatically based on the number of bars
@@ -151,7 +158,9 @@ def horizontal_bar_chart(
         custom_data if custom_data is not None else y_value
     )  # Use custom data if provided, else use y values fot the text
 
-    max_value = max(x_value) if not x_value.empty else 0
+    max_value = (
+        max(x_value + data[error] if error else x_value) if not x_value.empty else 0
+    )
     n_bars = len(y_value) if not y_value.empty else 1
     x_range_max = max_value * 1.2 if max_value > 0 else 1
     min_height = 200
@@ -159,32 +168,38 @@ def horizontal_bar_chart(
         min_height, n_bars * bar_height + 100
     )  # Define the height of the bar to maintain the proper height of graph
 
-    fig = go.Figure(
-        go.Bar(
-            x=x_value,
-            y=y_value,
-            orientation="h",
-            marker_color=color_fn if color_fn else marker_color,
-            text=text_fn,
-            textposition=text_position,
-            hovertemplate=hover_template,
-            hoverlabel=dict(
-                bgcolor=hover_backgroundcolor, font=dict(color=hover_textcolor)
-            ),
-            customdata=custom,
-        )
+    bar = props(
+        type="bar",
+        x=as_array(x_value),
+        y=as_array(y_value),
+        orientation="h",
+        marker=dict(color=color_fn if color_fn else marker_color),
+        text=text_fn,
+        textposition=text_position,
+        hovertemplate=hover_template,
+        hoverlabel=dict(
+            bgcolor=hover_backgroundcolor, font=dict(color=hover_textcolor)
+        ),
+        customdata=as_array(custom),
+        error_x=dict(type="data", array=as_array(data[error]), thickness=1)
+        if error
+        else None,
     )
-    fig.update_layout(
-        margin=margin,
-        yaxis=dict(autorange="reversed"),
-        xaxis=dict(showticklabels=show_tick_labels, range=[0, x_range_max]),
-        plot_bgcolor=plot_bgcolor,
-        clickmode=click_mode,
-        height=fig_height,
+    return figure_spec(
+        [bar],
+        props(
+            margin=margin,
+            yaxis=dict(autorange="reversed"),
+            xaxis=dict(showticklabels=show_tick_labels, range=[0, x_range_max]),
+            plot_bgcolor=plot_bgcolor,
+            clickmode=click_mode,
+            dragmode=drag_mode,
+            height=fig_height,
+        ),
     )
-    return fig
 
 
+@cached_figure("stacked_percentage_bar")
 def stacked_percentage_bar(
     data: pd.DataFrame,
     x: str,
@@ -200,45 +215,49 @@ def stacked_percentage_bar(
         height (int, optional): Height of the chart in pixels. Defaults to 120.
 
     Returns:
-        plotly.graph_objects.Figure: A plotly stacked percentage bar chart figure.
+        dict: A plotly stacked percentage bar chart figure spec, served from the figure cache when possible.
     """
-    color_scheme = px.colors.qualitative.Set2
+    color_scheme = qualitative.Set2
 
     total = data[x].sum()
     data["PCT"] = (data[x] / total * 100).round(1) if total > 0 else 0
 
-    fig = go.Figure()
-
-    for i, row in data.iterrows():
-        fig.add_bar(
-            x=[row["PCT"]],
+    bars = [
+        dict(
+            type="bar",
+            x=[pct],
             y=[""],
             orientation="h",
-            name=row[group_col],
-            text=[f"{row['PCT']:.0f}%"],
+            name=group,
+            text=[f"{pct:.0f}%"],
             textposition="inside",
             insidetextanchor="middle",
-            customdata=[[x, row[group_col]]],
+            customdata=[[x, group]],
             hovertemplate=(
                 "<b>%{customdata[1]}</b><br>%{customdata[0]}: %{x:,.2f}%<extra></extra>"
             ),
-            marker_color=color_scheme[i % len(color_scheme)],
+            marker=dict(color=color_scheme[i % len(color_scheme)]),
+        )
+        for i, (pct, group) in enumerate(
+            zip(data["PCT"].tolist(), data[group_col].tolist())
         )
+    ]
 
-    fig.update_layout(
-        barmode="stack",
-        margin=dict(l=20, r=20, t=40, b=20),
-        xaxis=dict(automargin=True, showgrid=False, zeroline=False, ticksuffix="%"),
-        yaxis=dict(showticklabels=False),
-        plot_bgcolor="white",
-        height=height,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.1,
-            xanchor="center",
-            x=0.5,
+    return figure_spec(
+        bars,
+        dict(
+            barmode="stack",
+            margin=dict(l=20, r=20, t=40, b=20),
+            xaxis=dict(automargin=True, showgrid=False, zeroline=False, ticksuffix="%"),
+            yaxis=dict(showticklabels=False),
+            plot_bgcolor="white",
+            height=height,
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.1,
+                xanchor="center",
+                x=0.5,
+            ),
         ),
     )
-
-    return fig
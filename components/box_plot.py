@@ -1,25 +1,28 @@
-import plotly.express as px
 from pandas import DataFrame
 
+from components.figure_spec import as_array, default_template, figure_spec
 from components.no_data_figure import no_data_figure
 
 
 def box_plot(
     data: DataFrame,
-    y: str = "",
-    points: str | bool = False,
+    name: str = "",
     xaxis_title: str = "",
     yaxis_title: str = "",
     show_legend: bool = False,
     show_line: bool = False,
     height=None,
 ):
-    """Create a box plot visualization using plotly express.
+    """Create a box plot from precomputed statistics, styled like plotly express' `px.box`.
+
+    Only the statistics are sent to the browser, so the figure has the same size
+    whatever the number of underlying values.
 
     Args:
-        data : Input DataFrame containing the data to plot. If empty, returns no data figure.
-        y : Column name from DataFrame to plot on y-axis. Default ""
-        points : Display style for points. Options include 'outliers', 'all', or 'False'. Default ""
+        data : Box statistics with one row per box and the `BOX_STATISTICS`
+            columns of `services.sketches` (e.g. from `get_risk_score_distribution`).
+            If empty or without values, returns no data figure.
+        name : Label of the boxes shown on hover. Default ""
         xaxis_title : Title for x-axis label. Default ""
         yaxis_title : Title for y-axis label. Default ""
         show_legend : Whether to display the plot legend. Default False
@@ -27,35 +30,67 @@ def box_plot(
         height : Custom height for the plot in pixels. If None, defaults to 117.
 
     Returns:
-        plotly.graph_objects.Figure: A plotly Figure object containing the box plot visualization or no data figure if input is empty.
+        dict: A plotly figure spec containing the box plot visualization or no data figure if input is empty.
 
     Notes:
         - The plot is styled with a white background and minimal grid lines for a clean look.
-        - Only outlier points are shown in the box plot.
+        - Whiskers end at LOWER_FENCE and UPPER_FENCE; individual points are not shown.
     """
     box_height = height or 117
 
-    if data.empty:
+    if data.empty or not data["COUNT"].any():
         return no_data_figure(message="No data available for the selected period.")
 
-    fig = px.box(data, y=y, points=points)
-
-    fig.update_layout(
-        plot_bgcolor="white",
-        showlegend=show_legend,
-        yaxis_title=yaxis_title,
-        xaxis_title=xaxis_title,
-        margin=dict(l=10, r=10, t=10, b=10),
-        height=box_height,
+    box = dict(
+        type="box",
+        q1=as_array(data["Q1"]),
+        median=as_array(data["MEDIAN"]),
+        q3=as_array(data["Q3"]),
+        lowerfence=as_array(data["LOWER_FENCE"]),
+        upperfence=as_array(data["UPPER_FENCE"]),
+        mean=as_array(data["MEAN"]),
+        boxmean=True,
+        hoverinfo="y",
+        marker=dict(color=default_template()["layout"]["colorway"][0]),
+        name=name,
+        legendgroup="",
+        alignmentgroup="True",
+        offsetgroup="",
+        notched=False,
+        orientation="v",
+        showlegend=False,
+        x0=" ",
+        y0=" ",
+        xaxis="x",
+        yaxis="y",
     )
-    # Clean up grid and axis lines for a cleaner look
-    fig.update_xaxes(showgrid=False, visible=False)
-    fig.update_yaxes(
-        showgrid=True,
-        zeroline=False,
-        ticks="outside",
-        showline=show_line,
-        linewidth=1,
-        linecolor="#ccc",
+    return figure_spec(
+        [box],
+        dict(
+            plot_bgcolor="white",
+            showlegend=show_legend,
+            boxmode="group",
+            legend=dict(tracegroupgap=0),
+            margin=dict(l=10, r=10, t=10, b=10),
+            height=box_height,
+            # Clean up grid and axis lines for a cleaner look
+            xaxis=dict(
+                anchor="y",
+                domain=[0.0, 1.0],
+                title=dict(text=xaxis_title),
+                showgrid=False,
+                visible=False,
+            ),
+            yaxis=dict(
+                anchor="x",
+                domain=[0.0, 1.0],
+                title=dict(text=yaxis_title),
+                showgrid=True,
+                zeroline=False,
+                ticks="outside",
+                showline=show_line,
+                linewidth=1,
+                linecolor="#ccc",
+            ),
+        ),
     )
-    return fig
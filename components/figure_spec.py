@@ -0,0 +1,57 @@
+import functools
+import json
+from importlib import resources
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+from _plotly_utils.utils import convert_to_base64
+
+
+@functools.cache
+def default_template() -> dict:
+    """Return the active plotly template as plain JSON, built once per process.
+
+    Built-in templates are read straight from plotly's package data, which
+    gives the same JSON as `plotly.io.templates` without building and
+    validating the template's graph objects.
+    """
+    name = pio.templates.default
+    if isinstance(name, str):
+        path = resources.files("plotly") / "package_data" / "templates" / f"{name}.json"
+        if path.is_file():
+            return json.loads(path.read_text())
+    return pio.templates[name].to_plotly_json()
+
+
+def figure_spec(data: list[dict], layout: dict) -> dict:
+    """Assemble a plotly figure as a plain dict, skipping graph_objects validation.
+
+    Numeric NumPy arrays in the traces are encoded as base64 typed arrays,
+    as `go.Figure` does, which keeps them compact in the JSON sent to the
+    browser (and stored by the figure cache).
+
+    Args:
+        data (list[dict]): Trace specs, each with a `type` key.
+        layout (dict): Layout properties. The active plotly template is added so the
+            figure renders the same as one built with `go.Figure`.
+
+    Returns:
+        dict: Figure spec accepted by `dcc.Graph(figure=...)`.
+    """
+    convert_to_base64(data)
+    return {"data": data, "layout": {"template": default_template(), **layout}}
+
+
+def props(**kwargs) -> dict:
+    """Return the given properties without the ones set to None (unset in plotly)."""
+    return {key: value for key, value in kwargs.items() if value is not None}
+
+
+def as_array(values):
+    """Return column-like values as a NumPy array, leaving other values untouched."""
+    if isinstance(values, (pd.Series, pd.Index)):
+        return values.to_numpy()
+    if isinstance(values, (list, tuple)):
+        return np.asarray(values)
+    return values
@@ -4,18 +4,32 @@ from datetime import date
 import dash_bootstrap_components as dbc
 from dash import dcc, html
 
-from services.database import sqlite_manager
+from services.pushdown import query_router
 
+DEFAULT_COMPARISON_PERIOD = "Same Period Last Year"
 
-def header():
+
+def default_date_range() -> tuple[date, date, date, date]:
+    """Return the date picker bounds and the default selected period.
+
+    Returns:
+        tuple[date, date, date, date]: Minimum allowed date, maximum allowed date,
+            default start date and default end date (the last year with claims).
+    """
     query = "SELECT DISTINCT(YEAR_MONTH) FROM FACT_CLAIMS"
-    claims_agg = sqlite_manager.query(query)
+    claims_agg = query_router.query(query)
 
     # Use integer division to extract year from YEAR_MONTH which is in YYYYMM format
     years = sorted(((claims_agg["YEAR_MONTH"]).astype(int) // 100).unique())
     last_year = years[-1]
     last_month = 12
     last_day = calendar.monthrange(last_year, last_month)[1]
+    last_date = date(last_year, last_month, last_day)
+    return date(years[0], 1, 1), last_date, date(last_year, 1, 1), last_date
+
+
+def header():
+    min_date, max_date, start_date, end_date = default_date_range()
     return html.Div(
         [
             html.Div(
@@ -45,12 +59,10 @@ def header():
                                     ),
                                     dcc.DatePickerRange(
                                         id="date-picker-input",
-                                        min_date_allowed=date(years[0], 1, 1),
-                                        max_date_allowed=date(
-                                            last_year, last_month, last_day
-                                        ),
-                                        end_date=date(last_year, last_month, last_day),
-                                        start_date=date(last_year, 1, 1),
+                                        min_date_allowed=min_date,
+                                        max_date_allowed=max_date,
+                                        end_date=end_date,
+                                        start_date=start_date,
                                         style={"width": "195px"},
                                     ),
                                 ],
@@ -64,7 +76,7 @@ def header():
                                         style={"font-size": "12px"},
                                     ),
                                     dcc.Dropdown(
-                                        value="Same Period Last Year",
+                                        value=DEFAULT_COMPARISON_PERIOD,
                                         id="comparison-period-dropdown",
                                         options=[
                                             "Previous 18 Months",
@@ -23,6 +23,14 @@ def kpi_card(title, value, comparison_value, expected_value, comparison_id):
     display_value = (
         f"{float(value):,.0f}" if is_utilization else f"${float(value):,.0f}"
     )
+    # Values estimated from the member sample show their 95% confidence interval.
+    margin = getattr(value, "margin", None)
+    if margin is not None:
+        margin_display = f"± {margin:,.0f}" if is_utilization else f"± ${margin:,.0f}"
+        display_value = [
+            display_value,
+            html.Small(margin_display, className="ms-2 text-muted fs-5"),
+        ]
     comparison_display = (
         f"{float(comparison_value):,.0f}"
         if is_utilization
@@ -0,0 +1,45 @@
+import dash_bootstrap_components as dbc
+import pandas as pd
+from dash import html
+
+
+def top_members_table(data: pd.DataFrame, first_rank: int = 1):
+    """Table of members and their paid amount, ranked from `first_rank`."""
+    if data.empty:
+        return html.P("No members with paid claims", className="text-muted")
+
+    header = html.Thead(
+        html.Tr(
+            [
+                html.Th("#"),
+                html.Th("Member"),
+                html.Th("Sex"),
+                html.Th("Age"),
+                html.Th("Total Paid", className="text-end"),
+                html.Th("% of Total", className="text-end"),
+            ]
+        )
+    )
+    rows = [
+        html.Tr(
+            [
+                html.Td(rank),
+                html.Td(int(person_id)),
+                html.Td(sex if isinstance(sex, str) else "-"),
+                html.Td("-" if pd.isna(age) else int(age)),
+                html.Td(f"${paid:,.2f}", className="text-end"),
+                html.Td(f"{percent:.1f}%", className="text-end"),
+            ]
+        )
+        for rank, person_id, sex, age, paid, percent in zip(
+            range(first_rank, first_rank + len(data)),
+            data["PERSON_ID"],
+            data["SEX"],
+            data["AGE"],
+            data["TOTAL_PAID"],
+            data["PERCENT_OF_TOTAL"],
+        )
+    ]
+    return dbc.Table(
+        [header, html.Tbody(rows)], size="sm", hover=True, className="mb-2"
+    )
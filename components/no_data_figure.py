@@ -1,4 +1,4 @@
-import plotly.graph_objs as go
+from components.figure_spec import figure_spec
 
 
 def no_data_figure(message="No data available for the selected period"):
@@ -12,25 +12,28 @@ def no_data_figure(message="No data available for the selected period"):
             Defaults to "No data available for the selected period".
 
     Returns:
-        go.Figure: A plotly figure object containing only the centered message with
+        dict: A plotly figure spec containing only the centered message with
             invisible axes and white background.
     """
-    fig = go.Figure()
-    fig.add_annotation(
-        text=message,
-        xref="paper",
-        yref="paper",
-        x=0.5,
-        y=0.5,
-        showarrow=False,
-        font=dict(size=18, color="gray"),
-        align="center",
+    return figure_spec(
+        [],
+        dict(
+            annotations=[
+                dict(
+                    text=message,
+                    xref="paper",
+                    yref="paper",
+                    x=0.5,
+                    y=0.5,
+                    showarrow=False,
+                    font=dict(size=18, color="gray"),
+                    align="center",
+                )
+            ],
+            xaxis=dict(visible=False),
+            yaxis=dict(visible=False),
+            plot_bgcolor="white",
+            paper_bgcolor="white",
+            margin=dict(l=0, r=0, t=40, b=0),
+        ),
     )
-    fig.update_layout(
-        xaxis=dict(visible=False),
-        yaxis=dict(visible=False),
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        margin=dict(l=0, r=0, t=40, b=0),
-    )
-    return fig
@@ -1,39 +1,48 @@
-import plotly.graph_objects as go
+from components.figure_spec import as_array, figure_spec, props
+from services.figure_cache import cached_figure
 
 
-def trend_chart(current_data, comparison_data):
-    fig = go.Figure()
+@cached_figure("trend_chart")
+def trend_chart(current_data, comparison_data, current_margins=None):
+    traces = []
 
     if current_data:
         x_cur, y_cur = zip(*current_data)
-        fig.add_trace(
-            go.Scatter(
-                x=x_cur,
-                y=y_cur,
+        traces.append(
+            props(
+                type="scatter",
+                x=as_array(x_cur),
+                y=as_array(y_cur),
                 mode="lines+markers",
                 name="Current",
                 line=dict(color="#64b0e1"),
+                # Confidence intervals of values estimated from the sample.
+                error_y=None
+                if current_margins is None
+                else dict(type="data", array=as_array(current_margins), thickness=1),
             )
         )
 
     if comparison_data:
         x_cmp, y_cmp = zip(*comparison_data)
-        fig.add_trace(
-            go.Scatter(
-                x=x_cmp,
-                y=y_cmp,
+        traces.append(
+            dict(
+                type="scatter",
+                x=as_array(x_cmp),
+                y=as_array(y_cmp),
                 mode="lines+markers",
                 name="Comparison",
                 line=dict(color="gray", dash="dash"),
             )
         )
 
-    fig.update_layout(
-        margin=dict(l=20, r=20, t=30, b=30),
-        plot_bgcolor="white",
-        height=100,
-        hovermode="x unified",
-        showlegend=False,
+    return figure_spec(
+        traces,
+        dict(
+            margin=dict(l=20, r=20, t=30, b=30),
+            plot_bgcolor="white",
+            height=100,
+            hovermode="x unified",
+            showlegend=False,
+        ),
     )
-
-    return fig
@@ -0,0 +1,52 @@
+"""Gunicorn settings for serving the dashboard with several worker processes.
+
+Run with:
+
+    gunicorn -c gunicorn.conf.py
+
+`preload_app` imports `app.py` once in the master, so the data is loaded,
+the default view pre-rendered and (with `SQLITE_IN_MEMORY=true`) the database
+copied into memory before the workers fork. Workers then share those pages
+copy-on-write instead of each repeating the work and holding their own copy.
+Each worker logs its memory use after forking and after its first request.
+"""
+
+import os
+from pathlib import Path
+
+wsgi_app = "app:server"
+preload_app = True
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8050")
+workers = int(os.getenv("GUNICORN_WORKERS", "4"))
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+timeout = 120
+
+
+def memory_usage() -> str:
+    """Return the current process' resident and proportional set sizes.
+
+    RSS counts shared pages in full for every worker; PSS divides them between
+    the processes sharing them, so summing PSS over workers gives the real
+    total. Only available on Linux.
+    """
+    smaps = Path("/proc/self/smaps_rollup")
+    if not smaps.exists():
+        return "unavailable"
+    sizes = {}
+    for line in smaps.read_text().splitlines()[1:]:
+        key, value = line.split(":", 1)
+        sizes[key] = int(value.split()[0]) / 1024
+    return (
+        f"RSS {sizes['Rss']:.1f} MB, PSS {sizes['Pss']:.1f} MB, "
+        f"private {sizes['Private_Clean'] + sizes['Private_Dirty']:.1f} MB"
+    )
+
+
+def post_fork(server, worker):
+    server.log.info("Worker %s forked: %s", worker.pid, memory_usage())
+
+
+def post_request(worker, req, environ, resp):
+    if not getattr(worker, "memory_logged", False):
+        worker.memory_logged = True
+        worker.log.info("Worker %s after first request: %s", worker.pid, memory_usage())
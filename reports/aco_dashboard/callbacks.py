@@ -1,20 +1,37 @@
 from datetime import datetime
 
 import pandas as pd
-from dash import Input, Output, callback
+from dash import (
+    ClientsideFunction,
+    Input,
+    Output,
+    State,
+    callback,
+    clientside_callback,
+    ctx,
+)
 
 from components.bar_chart import horizontal_bar_chart, stacked_percentage_bar
+from components.box_plot import box_plot
 from components.demographics_card import demographics_card
+from components.header import DEFAULT_COMPARISON_PERIOD, default_date_range
 from components.kpi_card import kpi_card
+from components.member_table import top_members_table
 from components.no_data_figure import no_data_figure
 from components.trend_chart import trend_chart
+from services.admission import cancel_superseded
+from services.figure_cache import prerendered
+from services.figure_patch import delta_figure
+from services.progressive import progressive
+from services.settings import CCSR_PAGE_SIZE, TOP_MEMBERS_PAGE_SIZE
 from services.utils import (
+    ROLLUP_VALUE,
     dt_to_yyyymm,
     extract_sql_filters,
     format_large_number,
     get_comparison_offset,
     get_comparison_period,
-    truncate_text,
+    truncate_series,
 )
 
 from .data import (
@@ -23,25 +40,41 @@ from .data import (
     get_condition_ccsr_data,
     get_demographic_data,
     get_pmpm_performance_vs_expected_data,
+    get_risk_score_distribution,
+    get_top_members,
     get_trends_data,
 )
 
-
-@callback(
-    Output("comparison-pmpm", "children"), Input("comparison-period-dropdown", "value")
+# Presentation-only updates run in the browser (assets/clientside.js), without
+# a server request.
+clientside_callback(
+    ClientsideFunction(namespace="dashboard", function_name="comparisonText"),
+    Output("comparison-pmpm", "children"),
+    Input("comparison-period-dropdown", "value"),
 )
-def update_comparison_text(comparison_period):
-    return comparison_period
+
+for chart_id in ("encounter-group-chart", "condition-ccsr-chart"):
+    clientside_callback(
+        ClientsideFunction(namespace="dashboard", function_name="highlightSelected"),
+        Output(chart_id, "figure", allow_duplicate=True),
+        Input(chart_id, "selectedData"),
+        Input(chart_id, "figure"),
+        prevent_initial_call=True,
+    )
 
 
 @callback(
     Output("pmpm-cost-card", "children"),
+    Output("pmpm-cost-card-refine", "data"),
     Input("date-picker-input", "start_date"),
     Input("date-picker-input", "end_date"),
     Input("comparison-period-dropdown", "value"),
     Input("encounter-group-chart", "selectedData"),
     Input("condition-ccsr-chart", "selectedData"),
 )
+@cancel_superseded
+@progressive
+@prerendered
 def update_kpi_cards(start_date, end_date, comparison_period, group_click, ccsr_click):
     start_date = datetime.strptime(start_date, "%Y-%m-%d")
     end_date = datetime.strptime(end_date, "%Y-%m-%d")
@@ -60,14 +93,31 @@ def update_kpi_cards(start_date, end_date, comparison_period, group_click, ccsr_
     return (kpi_card("PMPM Cost", pmpm_main, pmpm_comp, expected, "comparison-pmpm"),)
 
 
+@callback(
+    Output("pmpm-cost-card", "children", allow_duplicate=True),
+    Input("pmpm-cost-card-refine", "data"),
+    prevent_initial_call=True,
+)
+@cancel_superseded
+def refine_kpi_cards(refine):
+    return update_kpi_cards.refine(refine)
+
+
 @callback(
     Output("pmpm-trend", "figure"),
+    Output("pmpm-trend-structure", "data"),
+    Output("pmpm-trend-refine", "data"),
     Input("date-picker-input", "start_date"),
     Input("date-picker-input", "end_date"),
     Input("comparison-period-dropdown", "value"),
     Input("encounter-group-chart", "selectedData"),
     Input("condition-ccsr-chart", "selectedData"),
+    State("pmpm-trend-structure", "data"),
 )
+@cancel_superseded
+@progressive
+@prerendered
+@delta_figure
 def update_pmpm_trend(start_date, end_date, comparison_period, group_click, ccsr_click):
     filters = extract_sql_filters(group_click=group_click, ccsr_click=ccsr_click)
 
@@ -78,10 +128,12 @@ def update_pmpm_trend(start_date, end_date, comparison_period, group_click, ccsr
     selected_months = pd.date_range(start=start, end=end, freq="MS")
 
     current_data = []
+    current_margins = None
     if not df.empty:
-        df["YEAR_MONTH"] = pd.to_datetime(df["YEAR_MONTH"].astype(str), format="%Y%m")
         current_df = df[df["YEAR_MONTH"].isin(selected_months)]
         current_data = list(zip(current_df["YEAR_MONTH"], current_df["PMPM"]))
+        if "PMPM_MARGIN" in current_df:
+            current_margins = current_df["PMPM_MARGIN"].tolist()
 
     comparison_data = []
     for month in selected_months:
@@ -92,41 +144,105 @@ def update_pmpm_trend(start_date, end_date, comparison_period, group_click, ccsr
 
         avg_pmpm = total_paid / total_members if total_members > 0 else 0
         comparison_data.append((month, avg_pmpm))
-    return trend_chart(current_data, comparison_data)
+    return trend_chart(current_data, comparison_data, current_margins)
+
+
+@callback(
+    Output("pmpm-trend", "figure", allow_duplicate=True),
+    Output("pmpm-trend-structure", "data", allow_duplicate=True),
+    Input("pmpm-trend-refine", "data"),
+    State("pmpm-trend-structure", "data"),
+    prevent_initial_call=True,
+)
+@cancel_superseded
+def refine_pmpm_trend(refine, structure):
+    return update_pmpm_trend.refine(refine, structure)
+
+
+clientside_callback(
+    ClientsideFunction(namespace="dashboard", function_name="ccsrPages"),
+    Output("condition-ccsr-pages", "data"),
+    Input("condition-ccsr-load-more", "n_clicks"),
+    Input("date-picker-input", "start_date"),
+    Input("date-picker-input", "end_date"),
+    Input("encounter-group-chart", "selectedData"),
+    State("condition-ccsr-pages", "data"),
+    prevent_initial_call=True,
+)
 
 
 @callback(
     Output("condition-ccsr-chart", "figure"),
+    Output("condition-ccsr-chart-structure", "data"),
+    Output("condition-ccsr-load-more", "style"),
+    Output("condition-ccsr-refine", "data"),
     Input("date-picker-input", "start_date"),
     Input("date-picker-input", "end_date"),
     Input("encounter-group-chart", "selectedData"),
+    Input("condition-ccsr-pages", "data"),
+    State("condition-ccsr-chart-structure", "data"),
 )
-def update_condition_ccsr_cost_driver_graph(start_date, end_date, group_click):
+@cancel_superseded
+@progressive
+@prerendered
+@delta_figure
+def update_condition_ccsr_cost_driver_graph(start_date, end_date, group_click, pages):
     try:
         # Convert date strings to YYYYMM format for filtering
         start_yyyymm = dt_to_yyyymm(datetime.strptime(start_date, "%Y-%m-%d"))
         end_yyyymm = dt_to_yyyymm(datetime.strptime(end_date, "%Y-%m-%d"))
         filters = extract_sql_filters(group_click=group_click)
-        ccsr_data = get_condition_ccsr_data(start_yyyymm, end_yyyymm, filters)
+        ccsr_data = get_condition_ccsr_data(
+            start_yyyymm, end_yyyymm, filters, top_n=(pages or 1) * CCSR_PAGE_SIZE
+        )
 
-        ccsr_data["TRUNCATED_CATEGORY"] = ccsr_data["CCSR_CATEGORY_DESCRIPTION"].apply(
-            lambda x: truncate_text(x, 35)
+        is_rollup = ccsr_data["CCSR_CATEGORY_DESCRIPTION"] == ROLLUP_VALUE
+        ccsr_data["TRUNCATED_CATEGORY"] = truncate_series(
+            ccsr_data["CCSR_CATEGORY_DESCRIPTION"], 35
+        ).mask(
+            is_rollup,
+            ROLLUP_VALUE + " (" + ccsr_data["CATEGORY_COUNT"].astype(str) + ")",
         )
-        return horizontal_bar_chart(
+        text = [f"${v:,.0f}" for v in ccsr_data["PMPM"]]
+        error = None
+        if "PMPM_MARGIN" in ccsr_data:
+            # Estimated from the sample: show the 95% confidence interval.
+            text = [f"{t} ± ${m:,.0f}" for t, m in zip(text, ccsr_data["PMPM_MARGIN"])]
+            error = "PMPM_MARGIN"
+        figure = horizontal_bar_chart(
             data=ccsr_data,
             x="PMPM",
             y="TRUNCATED_CATEGORY",
-            text_fn=[f"${v:,.0f}" for v in ccsr_data["PMPM"]],
+            text_fn=text,
             show_tick_labels=False,
+            drag_mode="select",
             custom_data=ccsr_data["CCSR_CATEGORY_DESCRIPTION"],
             hover_template=(
                 "CCSR Category: %{customdata}<br>PMPM: %{text}<br><extra></extra>"
             ),
+            error=error,
         )
+        return figure, {"display": "block" if is_rollup.any() else "none"}
 
     except Exception as e:
         print(f"Error in update_condition_ccsr_cost_driver_graph: {e}")
-        return f"Error loading data: {str(e)}"
+        return (
+            no_data_figure(message=f"Error loading data: {str(e)}"),
+            {"display": "none"},
+        )
+
+
+@callback(
+    Output("condition-ccsr-chart", "figure", allow_duplicate=True),
+    Output("condition-ccsr-chart-structure", "data", allow_duplicate=True),
+    Output("condition-ccsr-load-more", "style", allow_duplicate=True),
+    Input("condition-ccsr-refine", "data"),
+    State("condition-ccsr-chart-structure", "data"),
+    prevent_initial_call=True,
+)
+@cancel_superseded
+def refine_condition_ccsr_cost_driver_graph(refine, structure):
+    return update_condition_ccsr_cost_driver_graph.refine(refine, structure)
 
 
 @callback(
@@ -137,6 +253,8 @@ def update_condition_ccsr_cost_driver_graph(start_date, end_date, group_click):
     Input("date-picker-input", "end_date"),
     Input("comparison-period-dropdown", "value"),
 )
+@cancel_superseded
+@prerendered
 def update_demographic_data(start_date, end_date, comparison_period):
     try:
         start_date = datetime.strptime(start_date, "%Y-%m-%d")
@@ -176,12 +294,40 @@ def update_demographic_data(start_date, end_date, comparison_period):
         return no_data_figure(message=f"Error loading data: {str(e)}")
 
 
+@callback(
+    Output("risk-score-distribution", "figure"),
+    Output("risk-score-distribution-structure", "data"),
+    Input("date-picker-input", "start_date"),
+    Input("date-picker-input", "end_date"),
+    State("risk-score-distribution-structure", "data"),
+)
+@cancel_superseded
+@prerendered
+@delta_figure
+def update_risk_score_distribution(start_date, end_date):
+    try:
+        start_date = datetime.strptime(start_date, "%Y-%m-%d")
+        end_date = datetime.strptime(end_date, "%Y-%m-%d")
+
+        stats = get_risk_score_distribution(start_date, end_date)
+        return box_plot(stats, name="Risk Score")
+
+    except Exception as e:
+        print(f"Error in update_risk_score_distribution: {e}")
+        return no_data_figure(message=f"Error loading data: {str(e)}")
+
+
 @callback(
     Output("encounter-group-chart", "figure"),
+    Output("encounter-group-chart-structure", "data"),
     Input("date-picker-input", "start_date"),
     Input("date-picker-input", "end_date"),
     Input("condition-ccsr-chart", "selectedData"),
+    State("encounter-group-chart-structure", "data"),
 )
+@cancel_superseded
+@prerendered
+@delta_figure
 def update_pmpm_performance_vs_expected(start_date, end_date, selected_ccsr):
     try:
         # Convert date strings to YYYYMM format for filtering
@@ -199,6 +345,7 @@ def update_pmpm_performance_vs_expected(start_date, end_date, selected_ccsr):
             show_tick_labels=False,
             plot_bgcolor="white",
             click_mode="event+select",
+            drag_mode="select",
             custom_data=data["ENCOUNTER_GROUP"],
             text_position="outside",
             hover_template=(
@@ -215,9 +362,14 @@ def update_pmpm_performance_vs_expected(start_date, end_date, selected_ccsr):
 
 @callback(
     Output("encounter-group-percentage-chart", "figure"),
+    Output("encounter-group-percentage-chart-structure", "data"),
     Input("date-picker-input", "start_date"),
     Input("date-picker-input", "end_date"),
+    State("encounter-group-percentage-chart-structure", "data"),
 )
+@cancel_superseded
+@prerendered
+@delta_figure
 def update_encounter_group_percentage_chart(start_date, end_date):
     try:
         # Convert date strings to YYYYMM format for filtering
@@ -240,11 +392,16 @@ def update_encounter_group_percentage_chart(start_date, end_date):
 
 @callback(
     Output("paid-by-cohort-chart", "figure"),
+    Output("paid-by-cohort-chart-structure", "data"),
     Input("date-picker-input", "start_date"),
     Input("date-picker-input", "end_date"),
     Input("encounter-group-chart", "selectedData"),
     Input("condition-ccsr-chart", "selectedData"),
+    State("paid-by-cohort-chart-structure", "data"),
 )
+@cancel_superseded
+@prerendered
+@delta_figure
 def update_cohort_data(start_date, end_date, group_click, ccsr):
     try:
         # Convert date strings to YYYYMM format for filtering
@@ -276,3 +433,92 @@ def update_cohort_data(start_date, end_date, group_click, ccsr):
     except Exception as e:
         print(f"Error in update_cohort_data: {e}")
         return no_data_figure(message=f"Error loading data: {str(e)}")
+
+
+@callback(
+    Output("top-members-table", "children"),
+    Output("top-members-pages", "data"),
+    Output("top-members-previous", "disabled"),
+    Output("top-members-next", "disabled"),
+    Input("date-picker-input", "start_date"),
+    Input("date-picker-input", "end_date"),
+    Input("encounter-group-chart", "selectedData"),
+    Input("condition-ccsr-chart", "selectedData"),
+    Input("top-members-previous", "n_clicks"),
+    Input("top-members-next", "n_clicks"),
+    State("top-members-pages", "data"),
+)
+@cancel_superseded
+def update_top_members(
+    start_date, end_date, group_click, ccsr, previous_clicks, next_clicks, pages
+):
+    # `pages` keeps the keyset cursor of every page up to the shown one, and
+    # the cursor following it. Any change other than paging starts over.
+    pages = pages or {"starts": [None], "next": None}
+    starts = pages["starts"]
+    if ctx.triggered_id == "top-members-next" and pages["next"] is not None:
+        starts = starts + [pages["next"]]
+    elif ctx.triggered_id == "top-members-previous" and len(starts) > 1:
+        starts = starts[:-1]
+    elif ctx.triggered_id not in ("top-members-next", "top-members-previous"):
+        starts = [None]
+
+    try:
+        start_yyyymm = dt_to_yyyymm(datetime.strptime(start_date, "%Y-%m-%d"))
+        end_yyyymm = dt_to_yyyymm(datetime.strptime(end_date, "%Y-%m-%d"))
+        filters = extract_sql_filters(group_click=group_click, ccsr_click=ccsr)
+
+        # One extra row tells whether there is a next page.
+        data = get_top_members(
+            start_yyyymm,
+            end_yyyymm,
+            filters,
+            after=starts[-1],
+            page_size=TOP_MEMBERS_PAGE_SIZE + 1,
+        )
+        has_next = len(data) > TOP_MEMBERS_PAGE_SIZE
+        data = data.head(TOP_MEMBERS_PAGE_SIZE)
+        next_start = None
+        if has_next:
+            last = data.iloc[-1]
+            next_start = (float(last["TOTAL_PAID"]), int(last["PERSON_ID"]))
+
+        table = top_members_table(
+            data, first_rank=(len(starts) - 1) * TOP_MEMBERS_PAGE_SIZE + 1
+        )
+        return (
+            table,
+            {"starts": starts, "next": next_start},
+            len(starts) == 1,
+            not has_next,
+        )
+
+    except Exception as e:
+        print(f"Error in update_top_members: {e}")
+        return (
+            f"Error loading data: {str(e)}",
+            {"starts": [None], "next": None},
+            True,
+            True,
+        )
+
+
+def warm_up_default_view():
+    """Pre-render the dashboard for the default period and comparison.
+
+    New sessions land on this state, so their first paint is served without
+    running queries or building figures.
+    """
+    _, _, start, end = default_date_range()
+    start_date, end_date = start.isoformat(), end.isoformat()
+    comparison_period = DEFAULT_COMPARISON_PERIOD
+
+    update_kpi_cards.warm(start_date, end_date, comparison_period, None, None)
+    update_pmpm_trend.warm(start_date, end_date, comparison_period, None, None, None)
+    update_condition_ccsr_cost_driver_graph.warm(start_date, end_date, None, 1, None)
+    update_demographic_data.warm(start_date, end_date, comparison_period)
+    update_risk_score_distribution.warm(start_date, end_date, None)
+    update_pmpm_performance_vs_expected.warm(start_date, end_date, None, None)
+    update_encounter_group_percentage_chart.warm(start_date, end_date, None)
+    update_cohort_data.warm(start_date, end_date, None, None, None)
+    print("Default dashboard view pre-rendered")
@@ -1,46 +1,351 @@
+import math
 from datetime import datetime
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 from services.database import sqlite_manager
-from services.utils import build_filter_clause, dt_to_yyyymm
+from services.dimensions import DIMENSIONS, dimension_joins, prune_joins
+from services.encounters import ENCOUNTERS_TABLE
+from services.member_paid import MEMBER_PAID_TABLE
+from services.parallel import FORK_AVAILABLE, chunk_periods
+from services.partitions import WINDOW_PARAMS
+from services.progressive import estimating, mark_estimated
+from services.query_registry import query_registry
+from services.sampling import CONFIDENCE_Z, SAMPLE_TABLE, Estimate, margin
+from services.settings import (
+    DISTINCT_MODE,
+    PARALLEL_CHUNK,
+    PARALLEL_MIN_ROWS,
+    PARALLEL_WORKERS,
+    QUERY_BACKEND,
+    RISK_EXACT_MAX_ROWS,
+    TOP_MEMBERS_PAGE_SIZE,
+)
+from services.sketches import KLLSketch, box_statistics, merge_counts
+from services.utils import ROLLUP_VALUE, build_filter_clause, dt_to_yyyymm
+
+from .queries import (
+    CALC_KPIS,
+    COHORT_DATA,
+    CONDITION_CCSR_DATA,
+    DEMOGRAPHIC_DATA,
+    ENCOUNTER_SKETCHES,
+    ESTIMATE_CONDITION_CCSR_DATA,
+    ESTIMATE_KPIS,
+    ESTIMATE_TRENDS_DATA,
+    MEMBER_MONTHS,
+    PARTIAL_CCSR_PAID,
+    PARTIAL_ENCOUNTER_GROUP_PAID,
+    PARTIAL_MEMBER_PAID,
+    PMPM_PERFORMANCE_VS_EXPECTED_DATA,
+    RISK_SCORE_SKETCHES,
+    RISK_SCORES,
+    TOP_MEMBERS,
+    TRENDS_DATA,
+)
+
+
+def _sketched() -> bool:
+    """Return whether distinct counts come from the tables built at load time."""
+    return DISTINCT_MODE == "approximate" and QUERY_BACKEND == "sqlite"
+
+
+def _claims_source(filters: Optional[dict] = None) -> tuple[str, str]:
+    """Return the claims table and encounter-count expression for `DISTINCT_MODE`.
+
+    In approximate mode claims are read from their per-month sketches built
+    at load time, and the expression is NULL: encounters are counted by
+    merging the HyperLogLog sketches in Python (see `_sketched_encounters`).
+    In exact mode they are counted on the encounter grain (`FACT_ENCOUNTERS`)
+    when it is loaded and answers every column in `filters` exactly, and
+    with `COUNT(DISTINCT)` over the claim lines otherwise. Pushdown mode
+    always counts exactly in the warehouse.
+    """
+    if _sketched():
+        return "FACT_CLAIMS_SKETCH", "NULL"
+    exact_filters = sqlite_manager.encounter_filters()
+    if exact_filters is not None and exact_filters.issuperset(filters or {}):
+        return ENCOUNTERS_TABLE, "COUNT(clm.ENCOUNTER_ID)"
+    return "FACT_CLAIMS", "COUNT(DISTINCT clm.ENCOUNTER_ID)"
+
+
+def _members_source() -> tuple[str, str]:
+    """Return the member-months table and per-month member-count expression.
+
+    In approximate mode, the exact member counts of each month stored at load
+    time are read instead of the member months.
+    """
+    if _sketched():
+        return "FACT_MEMBER_MONTHS_COUNTS", "SUM(MEMBERS_COUNT)"
+    return "FACT_MEMBER_MONTHS", "COUNT(DISTINCT PERSON_ID)"
+
+
+def _source_fragments(
+    params: Optional[dict] = None, filters: Optional[dict] = None
+) -> dict[str, str]:
+    """Return the table and count-expression SQL fragments of the templates.
+
+    Tables are routed to the partitions overlapping the `start_yyyymm` to
+    `end_yyyymm` period bound in `params` (with the same text for every
+    period), or read whole when there is no period. The claims source
+    depends on the columns in `filters`; per-member paid amounts come from
+    the `FACT_MEMBER_PAID` summary when it is loaded.
+    """
+    windowed = all(name in (params or {}) for name in WINDOW_PARAMS)
+    claims_table, encounters_count = _claims_source(filters)
+    members_table, members_count = _members_source()
+    if MEMBER_PAID_TABLE in sqlite_manager.tables():
+        member_paid = MEMBER_PAID_TABLE
+    else:
+        member_paid = "FACT_CLAIMS"
+    return {
+        "claims_table": sqlite_manager.route(claims_table, windowed),
+        "encounters_count": encounters_count,
+        "members_table": sqlite_manager.route(members_table, windowed),
+        "members_count": members_count,
+        "fact_claims": sqlite_manager.route("FACT_CLAIMS", windowed),
+        "fact_member_months": sqlite_manager.route("FACT_MEMBER_MONTHS", windowed),
+        "member_paid": sqlite_manager.route(member_paid, windowed),
+        "claims_sample": sqlite_manager.route(SAMPLE_TABLE, windowed),
+    }
+
+
+def _filter_fragments(
+    filters: Optional[dict], alias: str, keyword: str = "AND"
+) -> tuple[dict[str, str], dict]:
+    """Return the `filter_clause` and `dimension_joins` fragments, and their params.
+
+    Dimension-label filters are rewritten as filters on the surrogate keys of
+    the fact table aliased `alias`, from the cached dimension lookups, so a
+    dimension is only joined when one of its label filters cannot be (see
+    `services.dimensions.prune_joins`). The condition is prefixed by
+    `keyword`. Pushdown queries bind every list as an `IN` list, since the
+    warehouse has no `json_each`.
+    """
+    filters, joined = prune_joins(filters, sqlite_manager.dimension_keys)
+    expressions = {key: f"{alias}.{key}" for _, _, key in DIMENSIONS.values()}
+    if QUERY_BACKEND == "snowflake":
+        filter_clause, params = build_filter_clause(
+            filters, max_in_list=None, expressions=expressions
+        )
+    else:
+        filter_clause, params = build_filter_clause(filters, expressions=expressions)
+    if filter_clause:
+        filter_clause = f" {keyword} {filter_clause}"
+    fragments = {
+        "filter_clause": filter_clause,
+        "dimension_joins": dimension_joins(alias, joined),
+    }
+    return fragments, params
+
+
+def _period_params(start_yyyymm: int, end_yyyymm: int) -> dict:
+    return {"start_yyyymm": int(start_yyyymm), "end_yyyymm": int(end_yyyymm)}
+
+
+def _from_sample() -> bool:
+    """Return whether to answer from the member sample instead of exactly.
+
+    That is inside a `progressive` callback's estimating phase, when the
+    sample is loaded; the caller then reports it with `mark_estimated`.
+    """
+    return estimating() and SAMPLE_TABLE in sqlite_manager.tables()
+
+
+def _pmpm_margins(df: pd.DataFrame) -> pd.DataFrame:
+    """Replace the PMPM_VARIANCE of sample estimates by the PMPM_MARGIN of their 95% interval."""
+    margins = CONFIDENCE_Z * np.sqrt(df["PMPM_VARIANCE"].clip(lower=0))
+    return df.drop(columns="PMPM_VARIANCE").assign(PMPM_MARGIN=margins)
+
+
+def _parallel_chunks(
+    start_yyyymm: int, end_yyyymm: int
+) -> Optional[list[tuple[int, int]]]:
+    """Return the chunks to map-reduce an aggregation of a period over, or None.
+
+    Aggregations are split (see `services.parallel`) with `PARALLEL_WORKERS`
+    above 1, on the local SQLite backend, when the period spans several
+    `PARALLEL_CHUNK`s and at least `PARALLEL_MIN_ROWS` claim lines; smaller
+    ones run faster as one statement.
+    """
+    if PARALLEL_WORKERS <= 1 or QUERY_BACKEND != "sqlite" or not FORK_AVAILABLE:
+        return None
+    chunks = chunk_periods(start_yyyymm, end_yyyymm, PARALLEL_CHUNK)
+    if len(chunks) < 2:
+        return None
+    if sqlite_manager.window_rows("FACT_CLAIMS", start_yyyymm, end_yyyymm) < (
+        PARALLEL_MIN_ROWS
+    ):
+        return None
+    return chunks
+
+
+def _map_reduce(
+    name: str,
+    chunks: list[tuple[int, int]],
+    filters: Optional[dict],
+    alias: str,
+    key: str,
+) -> pd.DataFrame:
+    """Run partial aggregate `name` per chunk in parallel and sum its TOTAL_PAID by `key`."""
+    fragments, filter_params = _filter_fragments(filters, alias)
+    statements = []
+    for start_yyyymm, end_yyyymm in chunks:
+        params = {**filter_params, **_period_params(start_yyyymm, end_yyyymm)}
+        statements.append((params, {**fragments, **_source_fragments(params)}))
+    partials = query_registry.query_chunks(name, statements)
+    return (
+        pd.concat(partials, ignore_index=True)
+        .groupby(key, dropna=False, sort=False)["TOTAL_PAID"]
+        .sum(min_count=1)
+        .reset_index()
+    )
+
+
+def _member_months(start_yyyymm: int, end_yyyymm: int) -> int:
+    params = _period_params(start_yyyymm, end_yyyymm)
+    result = query_registry.query(MEMBER_MONTHS, params, **_source_fragments(params))
+    return int(result.iloc[0]["MEMBER_MONTHS_COUNT"] or 0)
+
+
+def _sketched_encounters(trends: pd.DataFrame, filters: Optional[dict]) -> pd.DataFrame:
+    """Fill the monthly encounter counts and rates of `trends` from the sketches.
+
+    The encounter sketches of the filtered claims are merged per month in one
+    pass (see `services.sketches.merge_counts`).
+    """
+    fragments, params = _filter_fragments(filters, "clm")
+    sketches = query_registry.query(
+        ENCOUNTER_SKETCHES, params, **fragments, **_source_fragments(filters=filters)
+    )
+    counts = merge_counts(sketches["ENCOUNTER_SKETCH"], sketches[["YEAR_MONTH"]])
+    encounters = trends["YEAR_MONTH"].map(counts.set_index("YEAR_MONTH")["COUNT"])
+    members = trends["MEMBERS_COUNT"]
+    return trends.assign(
+        ENCOUNTERS_COUNT=encounters.astype("float64"),
+        # Integer division, as TRENDS_DATA computes it from exact counts.
+        PKPY=(encounters.fillna(0) * 12000 // members.where(members > 0)).fillna(0),
+        COST_PER_ENCOUNTER=(
+            trends["TOTAL_PAID"].fillna(0) / encounters.where(encounters > 0)
+        ).fillna(0),
+    )
+
+
+def _pmpm(total_paid: pd.Series, member_months: int) -> pd.Series:
+    if member_months > 0:
+        return total_paid / member_months
+    return pd.Series(0.0, index=total_paid.index)
+
+
+def _rank_categories(
+    category_paid: pd.DataFrame, member_months: int, top_n: Optional[int]
+) -> pd.DataFrame:
+    """Finish `get_condition_ccsr_data` from the paid amount of each category.
+
+    Categories are ranked like `CATEGORY_RANK` in the query: by paid amount,
+    then by name among equal amounts, with nulls last.
+    """
+    ranked = category_paid.sort_values(
+        ["TOTAL_PAID", "CCSR_CATEGORY_DESCRIPTION"],
+        ascending=[False, True],
+        na_position="last",
+    ).reset_index(drop=True)
+    rank = pd.Series(np.arange(1, len(ranked) + 1))
+    groups = ranked.groupby(rank if top_n is None else rank.clip(upper=top_n + 1))
+    labels = groups["CCSR_CATEGORY_DESCRIPTION"].first().fillna("other")
+    if top_n is not None:
+        labels = labels.where(labels.index <= top_n, ROLLUP_VALUE)
+    total_paid = groups["TOTAL_PAID"].sum(min_count=1)
+    return pd.DataFrame(
+        {
+            "CCSR_CATEGORY_DESCRIPTION": labels.astype(object),
+            "TOTAL_PAID": total_paid.astype("float64"),
+            "PMPM": _pmpm(total_paid, member_months).astype("float64"),
+            "CATEGORY_COUNT": groups.size().astype("int64"),
+        }
+    ).reset_index(drop=True)
+
+
+def _encounter_group_pmpm(group_paid: pd.DataFrame, member_months: int) -> pd.DataFrame:
+    """Finish `get_pmpm_performance_vs_expected_data` from the paid amount per group key."""
+    labels = {
+        sk: label
+        for label, sks in sqlite_manager.dimension_keys("ENCOUNTER_GROUP").items()
+        for sk in sks
+    }
+    total_paid = group_paid.groupby(
+        group_paid["ENCOUNTER_GROUP_SK"].map(labels).rename("ENCOUNTER_GROUP"),
+        dropna=False,
+    )["TOTAL_PAID"].sum(min_count=1)
+    pmpm = _pmpm(total_paid, member_months).astype("float64")
+    pmpm = pmpm.sort_values(ascending=False, na_position="last", kind="stable")
+    groups = pmpm.index.to_series().astype(object)
+    return pd.DataFrame(
+        {
+            "ENCOUNTER_GROUP": groups.where(groups.notna(), None).to_numpy(),
+            "PMPM": pmpm.to_numpy(),
+        }
+    )
+
+
+def _cohort_rows(member_paid: pd.DataFrame) -> pd.DataFrame:
+    """Finish `get_cohort_data` from the paid amount of each member."""
+    totals = member_paid["TOTAL_PAID"].sort_values(ascending=False, na_position="last")
+    member_count = len(totals)
+    all_total = totals.sum(min_count=1)
+
+    def percent(total_paid: float) -> float:
+        if pd.isna(all_total) or all_total == 0:
+            return np.nan
+        return round(100.0 * total_paid / all_total, 2)
+
+    rows = []
+    for label, share in (("Top 1%", 0.01), ("Top 5%", 0.05), ("Top 20%", 0.20)):
+        top = totals.iloc[: math.ceil(member_count * share)]
+        total_paid = float(top.sum())
+        rows.append((label, total_paid, len(top), percent(total_paid)))
+    rows.append(("All Members", all_total, member_count, 100.0))
+    return pd.DataFrame(
+        rows,
+        columns=[
+            "percent_group",
+            "total_paid_amount",
+            "member_count",
+            "percent_of_total",
+        ],
+    ).astype({"total_paid_amount": "float64", "member_count": "int64"})
 
 
 def calc_kpis(
     start_date: datetime, end_date: datetime, filters: Optional[dict] = None
 ) -> float:
-    start_yyyymm = dt_to_yyyymm(start_date)
-    end_yyyymm = dt_to_yyyymm(end_date)
+    """Compute the PMPM paid amount of a period.
 
-    filter_clause, params = build_filter_clause(filters)
-    if filter_clause:
-        filter_clause = f" AND {filter_clause}"
-    query = f"""
-        WITH claims_agg AS (
-            SELECT
-                SUM(PAID_AMOUNT) AS paid,
-                COUNT(DISTINCT ENCOUNTER_ID) AS encounters
-            FROM FACT_CLAIMS clm
-            LEFT JOIN DIM_ENCOUNTER_GROUP grp
-                ON clm.ENCOUNTER_GROUP_SK = grp.ENCOUNTER_GROUP_SK
-            LEFT JOIN DIM_ENCOUNTER_TYPE type
-                ON clm.ENCOUNTER_TYPE_SK = type.ENCOUNTER_TYPE_SK
-            WHERE YEAR_MONTH BETWEEN {start_yyyymm} AND {end_yyyymm}
-            {filter_clause}
-        ),
-        member_months AS (
-            SELECT COUNT(DISTINCT PERSON_ID || '-' || YEAR_MONTH) AS mm
-            FROM FACT_MEMBER_MONTHS
-            WHERE YEAR_MONTH BETWEEN {start_yyyymm} AND {end_yyyymm}
-        )
-        SELECT
-            claims_agg.paid,
-            claims_agg.encounters,
-            member_months.mm
-        FROM claims_agg, member_months
+    Returns:
+        float: The PMPM; from the member sample, an `Estimate` carrying the
+            margin of its 95% confidence interval.
     """
-    result = sqlite_manager.query(query, params)
+    if _from_sample():
+        fragments, params = _filter_fragments(filters, "s")
+        params.update(_period_params(dt_to_yyyymm(start_date), dt_to_yyyymm(end_date)))
+        row = query_registry.query(
+            ESTIMATE_KPIS, params, **fragments, **_source_fragments(params)
+        ).iloc[0]
+        mark_estimated()
+        mm = row.get("mm") or 0
+        if mm:
+            return Estimate(
+                (row.get("paid") or 0) / mm, margin(row["paid_variance"]) / mm
+            )
+        return Estimate(0, 0)
+
+    fragments, params = _filter_fragments(filters, "clm")
+    params.update(_period_params(dt_to_yyyymm(start_date), dt_to_yyyymm(end_date)))
+    result = query_registry.query(
+        CALC_KPIS, params, **fragments, **_source_fragments(params, filters)
+    )
     row = result.iloc[0]
     paid = row.get("paid") or 0
     mm = row.get("mm") or 0
@@ -50,251 +355,200 @@ def calc_kpis(
 
 
 def get_demographic_data(start_date: datetime, end_date: datetime) -> pd.DataFrame:
-    start_yyyymm = dt_to_yyyymm(start_date)
-    end_yyyymm = dt_to_yyyymm(end_date)
-
-    query = f"""
-        WITH member_month_details AS (
-            SELECT 
-                f.PERSON_ID,
-                f.YEAR_MONTH,
-                d.SEX,
-                d.AGE,
-                f.NORMALIZED_RISK_SCORE,
-                CAST(f.PERSON_ID AS TEXT) || '-' || CAST(f.YEAR_MONTH AS TEXT) AS MEMBER_MONTH_ID
-            FROM FACT_MEMBER_MONTHS AS f
-            LEFT JOIN DIM_MEMBER AS d
-                ON f.PERSON_ID = d.PERSON_ID
-            WHERE f.YEAR_MONTH BETWEEN {start_yyyymm} AND {end_yyyymm}
-        ),
-        member_month_counts AS (
-            SELECT
-                COUNT(DISTINCT MEMBER_MONTH_ID) AS TOTAL_MEMBER_MONTHS
-            FROM member_month_details
-        )
-        SELECT 
-            COALESCE(mmc.TOTAL_MEMBER_MONTHS, 0) AS TOTAL_MEMBER_MONTHS,
-            CASE WHEN mmc.TOTAL_MEMBER_MONTHS > 0 
-                THEN 100.0 * SUM(CASE WHEN LOWER(mmd.SEX) = 'female' THEN 1 ELSE 0 END) 
-                    / mmc.TOTAL_MEMBER_MONTHS
-                ELSE 0 
-            END AS PERCENT_FEMALE,
-            COALESCE(AVG(mmd.NORMALIZED_RISK_SCORE), 0) AS AVG_RISK_SCORE
-        FROM member_month_details mmd
-        CROSS JOIN member_month_counts mmc;
+    params = _period_params(dt_to_yyyymm(start_date), dt_to_yyyymm(end_date))
+    return query_registry.query(DEMOGRAPHIC_DATA, params, **_source_fragments(params))
+
+
+def get_risk_score_distribution(
+    start_date: datetime, end_date: datetime
+) -> pd.DataFrame:
+    """Compute box plot statistics of member-month risk scores in a period.
+
+    Windows of up to `RISK_EXACT_MAX_ROWS` scored member months are summarized
+    exactly from the raw scores; larger ones merge the per-month KLL sketches
+    built at load time, so the cost does not grow with the member count.
+
+    Returns:
+        pandas.DataFrame: One row with the `BOX_STATISTICS` columns and IS_EXACT.
     """
-    return sqlite_manager.query(query)
+    params = _period_params(dt_to_yyyymm(start_date), dt_to_yyyymm(end_date))
+    sketches = query_registry.query(RISK_SCORE_SKETCHES, params)
+
+    is_exact = sketches["RISK_COUNT"].sum() <= RISK_EXACT_MAX_ROWS
+    if is_exact:
+        scores = query_registry.query(RISK_SCORES, params, **_source_fragments(params))
+        stats = box_statistics(scores["NORMALIZED_RISK_SCORE"].to_numpy())
+    else:
+        sketch = KLLSketch()
+        for blob in sketches["RISK_SKETCH"]:
+            sketch.merge(KLLSketch.from_bytes(blob))
+        stats = sketch.box_statistics()
+    return pd.DataFrame([{**stats, "IS_EXACT": is_exact}])
 
 
 def get_trends_data(filters: Optional[dict] = None) -> pd.DataFrame:
-    filter_clause, params = build_filter_clause(filters)
-    if filter_clause:
-        filter_clause = f" WHERE {filter_clause}"
-
-    query = f"""
-        WITH member_counts_by_month AS (
-            SELECT 
-                YEAR_MONTH,
-                COUNT(DISTINCT PERSON_ID) AS MEMBERS_COUNT
-            FROM FACT_MEMBER_MONTHS
-            GROUP BY YEAR_MONTH
-        ),
-        claim_aggregates_by_month AS (
-            SELECT 
-                clm.YEAR_MONTH,
-                COUNT(DISTINCT clm.ENCOUNTER_ID) AS ENCOUNTERS_COUNT,
-                SUM(clm.PAID_AMOUNT) AS TOTAL_PAID
-            FROM FACT_CLAIMS clm
-            LEFT JOIN DIM_ENCOUNTER_GROUP grp
-                ON clm.ENCOUNTER_GROUP_SK = grp.ENCOUNTER_GROUP_SK
-            LEFT JOIN DIM_ENCOUNTER_TYPE type
-                ON clm.ENCOUNTER_TYPE_SK = type.ENCOUNTER_TYPE_SK
-            {filter_clause}
-            GROUP BY clm.YEAR_MONTH
-        )
-        SELECT 
-            m.YEAR_MONTH,
-            m.MEMBERS_COUNT,
-            e.ENCOUNTERS_COUNT,
-            e.TOTAL_PAID,
-
-            CASE WHEN m.MEMBERS_COUNT > 0
-                THEN COALESCE(e.TOTAL_PAID, 0) / m.MEMBERS_COUNT
-                ELSE 0 END AS PMPM,
-
-            CASE WHEN m.MEMBERS_COUNT > 0
-                THEN COALESCE(e.ENCOUNTERS_COUNT, 0) * 12000 / m.MEMBERS_COUNT
-                ELSE 0 END AS PKPY,
-
-            CASE WHEN e.ENCOUNTERS_COUNT > 0
-                THEN COALESCE(e.TOTAL_PAID, 0) / e.ENCOUNTERS_COUNT
-                ELSE 0 END AS COST_PER_ENCOUNTER
-
-        FROM member_counts_by_month m
-        LEFT JOIN claim_aggregates_by_month e
-            ON m.YEAR_MONTH = e.YEAR_MONTH
-        ORDER BY m.YEAR_MONTH;
+    """Load monthly members, encounters, paid amounts and per-member rates.
+
+    Returns:
+        pandas.DataFrame: One row per YEAR_MONTH (datetime64, first of the month)
+            with MEMBERS_COUNT, ENCOUNTERS_COUNT, TOTAL_PAID, PMPM, PKPY and
+            COST_PER_ENCOUNTER. From the member sample, MEMBERS_COUNT and the
+            estimated TOTAL_PAID and PMPM, with PMPM_MARGIN (half-width of the
+            95% confidence interval).
     """
-    return sqlite_manager.query(query, params)
+    if _from_sample():
+        fragments, params = _filter_fragments(filters, "s", keyword="WHERE")
+        estimates = query_registry.query(
+            ESTIMATE_TRENDS_DATA, params, **fragments, **_source_fragments()
+        )
+        mark_estimated()
+        return _pmpm_margins(estimates)
+
+    fragments, params = _filter_fragments(filters, "clm", keyword="WHERE")
+    trends = query_registry.query(
+        TRENDS_DATA, params, **fragments, **_source_fragments(filters=filters)
+    )
+    if _sketched():
+        trends = _sketched_encounters(trends, filters)
+    return trends
 
 
 def get_condition_ccsr_data(
-    start_yyyymm: int, end_yyyymm: int, filters: Optional[dict] = None
+    start_yyyymm: int,
+    end_yyyymm: int,
+    filters: Optional[dict] = None,
+    top_n: Optional[int] = None,
 ) -> pd.DataFrame:
-    """Load condition CCSR data using efficient CTE-based query."""
-    filter_clause, params = build_filter_clause(filters)
-    if filter_clause:
-        filter_clause = f" AND {filter_clause}"
-
-    query = f"""
-        WITH
-        category_claims AS (
-            SELECT 
-                fc.CCSR_CATEGORY_DESCRIPTION, 
-                SUM(fc.PAID_AMOUNT) AS TOTAL_PAID 
-            FROM FACT_CLAIMS AS fc 
-            LEFT JOIN DIM_ENCOUNTER_GROUP grp
-                ON fc.ENCOUNTER_GROUP_SK = grp.ENCOUNTER_GROUP_SK
-            WHERE fc.YEAR_MONTH BETWEEN {start_yyyymm} AND {end_yyyymm}
-            {filter_clause}
-            GROUP BY fc.CCSR_CATEGORY_DESCRIPTION
-        ),
-        member_months AS (
-            SELECT COUNT(DISTINCT PERSON_ID || '-' || YEAR_MONTH) AS member_months_count
-            FROM FACT_MEMBER_MONTHS 
-            WHERE YEAR_MONTH BETWEEN {start_yyyymm} AND {end_yyyymm}
-        )
-        SELECT 
-            CASE WHEN cc.CCSR_CATEGORY_DESCRIPTION IS NULL THEN 'other' ELSE cc.CCSR_CATEGORY_DESCRIPTION END AS CCSR_CATEGORY_DESCRIPTION,
-            cc.TOTAL_PAID,
-            CASE 
-                WHEN mm.MEMBER_MONTHS_COUNT > 0 
-                THEN cc.TOTAL_PAID / mm.MEMBER_MONTHS_COUNT 
-                ELSE 0 
-            END AS PMPM
-        FROM category_claims AS cc
-        CROSS JOIN member_months AS mm
-        ORDER BY PMPM DESC
+    """Load condition CCSR data using efficient CTE-based query.
+
+    Args:
+        start_yyyymm (int): Start of the period in YYYYMM format.
+        end_yyyymm (int): End of the period in YYYYMM format.
+        filters (dict, optional): Column-value filters for `build_filter_clause`.
+        top_n (int, optional): Number of highest-paid categories to return. The
+            remaining categories are summed into a single `ROLLUP_VALUE` row at the
+            end. Defaults to None, which returns every category.
+
+    Returns:
+        pandas.DataFrame: CCSR_CATEGORY_DESCRIPTION, TOTAL_PAID, PMPM and
+            CATEGORY_COUNT (number of categories in the row), ordered by PMPM.
+            From the member sample, estimates with PMPM_MARGIN (half-width of
+            the 95% confidence interval), ordered by estimated PMPM.
     """
+    from_sample = _from_sample()
+    fragments, params = _filter_fragments(filters, "s" if from_sample else "fc")
+    params.update(_period_params(start_yyyymm, end_yyyymm))
 
-    return sqlite_manager.query(query, params)
+    if top_n is None:
+        group_key = "CATEGORY_RANK"
+        rollup_case = ""
+    else:
+        # Every category ranked after top_n shares the same group.
+        group_key = (
+            "CASE WHEN CATEGORY_RANK > :top_n THEN :top_n + 1 ELSE CATEGORY_RANK END"
+        )
+        rollup_case = "WHEN MIN(cc.CATEGORY_RANK) > :top_n THEN :rollup_value"
+        params.update(top_n=int(top_n), rollup_value=ROLLUP_VALUE)
+
+    if from_sample:
+        estimates = query_registry.query(
+            ESTIMATE_CONDITION_CCSR_DATA,
+            params,
+            group_key=group_key,
+            rollup_case=rollup_case,
+            **fragments,
+            **_source_fragments(params),
+        )
+        mark_estimated()
+        return _pmpm_margins(estimates)
+
+    chunks = _parallel_chunks(start_yyyymm, end_yyyymm)
+    if chunks is not None:
+        category_paid = _map_reduce(
+            PARTIAL_CCSR_PAID, chunks, filters, "fc", "CCSR_CATEGORY_DESCRIPTION"
+        )
+        return _rank_categories(
+            category_paid, _member_months(start_yyyymm, end_yyyymm), top_n
+        )
+    return query_registry.query(
+        CONDITION_CCSR_DATA,
+        params,
+        group_key=group_key,
+        rollup_case=rollup_case,
+        **fragments,
+        **_source_fragments(params),
+    )
 
 
 def get_pmpm_performance_vs_expected_data(
     start_yyyymm: int, end_yyyymm: int, filters: Optional[dict] = None
 ) -> pd.DataFrame:
-    filter_clause, params = build_filter_clause(filters)
-    if filter_clause:
-        filter_clause = f" AND {filter_clause}"
-    query = f"""
-        WITH claims_by_encounter_group AS (
-            SELECT
-                grp.ENCOUNTER_GROUP,
-                SUM(PAID_AMOUNT) as TOTAL_PAID
-            FROM FACT_CLAIMS clm
-            LEFT JOIN DIM_ENCOUNTER_GROUP grp
-                ON clm.ENCOUNTER_GROUP_SK = grp.ENCOUNTER_GROUP_SK
-            WHERE clm.YEAR_MONTH BETWEEN {start_yyyymm} AND {end_yyyymm}
-            {filter_clause}
-            GROUP BY grp.ENCOUNTER_GROUP
-        ),
-        member_months AS (
-            SELECT COUNT(DISTINCT PERSON_ID || '-' || YEAR_MONTH) AS MEMBER_MONTHS_COUNT
-            FROM FACT_MEMBER_MONTHS
-            WHERE year_month BETWEEN {start_yyyymm} AND {end_yyyymm}
+    chunks = _parallel_chunks(start_yyyymm, end_yyyymm)
+    if chunks is not None:
+        group_paid = _map_reduce(
+            PARTIAL_ENCOUNTER_GROUP_PAID, chunks, filters, "clm", "ENCOUNTER_GROUP_SK"
+        )
+        return _encounter_group_pmpm(
+            group_paid, _member_months(start_yyyymm, end_yyyymm)
         )
 
-        SELECT
-            clm.ENCOUNTER_GROUP,
-            CASE 
-                WHEN mm.MEMBER_MONTHS_COUNT > 0 
-                THEN clm.TOTAL_PAID / mm.MEMBER_MONTHS_COUNT 
-                ELSE 0 
-            END AS PMPM
-        FROM claims_by_encounter_group clm
-        CROSS JOIN member_months AS MM
-        ORDER BY PMPM DESC
-    """
-    return sqlite_manager.query(query, params)
+    fragments, params = _filter_fragments(filters, "clm")
+    params.update(_period_params(start_yyyymm, end_yyyymm))
+    return query_registry.query(
+        PMPM_PERFORMANCE_VS_EXPECTED_DATA,
+        params,
+        **fragments,
+        **_source_fragments(params),
+    )
 
 
 def get_cohort_data(start_yyyymm, end_yyyymm, filters) -> pd.DataFrame:
-    filter_clause, params = build_filter_clause(filters)
-    if filter_clause:
-        filter_clause = f" AND {filter_clause}"
-
-    query = f"""
-        WITH member_totals AS (
-            SELECT 
-                person_id,
-                SUM(fc.PAID_AMOUNT) AS total_paid
-            FROM fact_claims fc
-            LEFT JOIN DIM_ENCOUNTER_GROUP grp
-                ON fc.ENCOUNTER_GROUP_SK = grp.ENCOUNTER_GROUP_SK
-            LEFT JOIN DIM_ENCOUNTER_TYPE type
-                ON fc.ENCOUNTER_TYPE_SK = type.ENCOUNTER_TYPE_SK
-            WHERE year_month BETWEEN {start_yyyymm} AND {end_yyyymm}
-            {filter_clause}
-            GROUP BY person_id
-        ),
-
-        total_person_count AS (
-            SELECT COUNT(*) AS total_person_count
-            FROM member_totals
-        ),
-
-        ranked_members AS (
-            SELECT
-                mt.person_id,
-                mt.total_paid,
-                ROW_NUMBER() OVER(ORDER BY mt.total_paid DESC) AS rn,
-                tpc.total_person_count
-            FROM member_totals mt
-            CROSS JOIN total_person_count tpc
-        ),
-
-        group_summary AS (
-            SELECT
-                COALESCE(SUM(CASE WHEN rn <= CEIL(total_person_count * 0.01) THEN total_paid END), 0) AS top_1_total,
-                COALESCE(COUNT(CASE WHEN rn <= CEIL(total_person_count * 0.01) THEN 1 END), 0) AS top_1_count,
-
-                COALESCE(SUM(CASE WHEN rn <= CEIL(total_person_count * 0.05) THEN total_paid END), 0) AS top_5_total,
-                COALESCE(COUNT(CASE WHEN rn <= CEIL(total_person_count * 0.05) THEN 1 END), 0) AS top_5_count,
-
-                COALESCE(SUM(CASE WHEN rn <= CEIL(total_person_count * 0.20) THEN total_paid END), 0) AS top_20_total,
-                COALESCE(COUNT(CASE WHEN rn <= CEIL(total_person_count * 0.20) THEN 1 END), 0) AS top_20_count,
-
-                SUM(total_paid) AS all_total,
-                COUNT(*) AS all_count
-            FROM ranked_members
+    chunks = _parallel_chunks(start_yyyymm, end_yyyymm)
+    if chunks is not None:
+        return _cohort_rows(
+            _map_reduce(PARTIAL_MEMBER_PAID, chunks, filters, "fc", "PERSON_ID")
         )
-        
-        SELECT
-            'Top 1%' AS percent_group,
-            top_1_total AS total_paid_amount,
-            top_1_count AS member_count,
-            ROUND(100.0 * top_1_total / all_total, 2) AS percent_of_total
-        FROM group_summary 
-        UNION ALL
-        SELECT
-            'Top 5%' AS percent_group,
-            top_5_total AS total_paid_amount,
-            top_5_count AS member_count,
-            ROUND(100.0 * top_5_total / all_total, 2) AS percent_of_total
-        FROM group_summary
-        UNION ALL
-        SELECT
-            'Top 20%' AS percent_group,
-            top_20_total AS total_paid_amount,
-            top_20_count AS member_count,
-            ROUND(100.0 * top_20_total / all_total, 2) AS percent_of_total
-        FROM group_summary
-        UNION ALL
-        SELECT
-            'All Members' AS percent_group,
-            all_total AS total_paid_amount,
-            all_count AS member_count,
-            100.0 AS percent_of_total
-        FROM group_summary
+
+    fragments, params = _filter_fragments(filters, "fc")
+    params.update(_period_params(start_yyyymm, end_yyyymm))
+    return query_registry.query(
+        COHORT_DATA, params, **fragments, **_source_fragments(params)
+    )
+
+
+def get_top_members(
+    start_yyyymm: int,
+    end_yyyymm: int,
+    filters: Optional[dict] = None,
+    after: Optional[tuple[float, int]] = None,
+    page_size: int = TOP_MEMBERS_PAGE_SIZE,
+) -> pd.DataFrame:
+    """Load one page of the members with the highest paid amount in a period.
+
+    Pages are read by keyset: pass the (TOTAL_PAID, PERSON_ID) of the last row
+    of a page as `after` to get the next one.
+
+    Args:
+        start_yyyymm (int): Start of the period in YYYYMM format.
+        end_yyyymm (int): End of the period in YYYYMM format.
+        filters (dict, optional): Column-value filters for `build_filter_clause`.
+        after (tuple[float, int], optional): Key of the row preceding the page,
+            None for the first page.
+        page_size (int, optional): Number of members per page.
+
+    Returns:
+        pandas.DataFrame: PERSON_ID, SEX, AGE, TOTAL_PAID and PERCENT_OF_TOTAL
+            (share of the period's paid amount), by descending TOTAL_PAID.
     """
-    return sqlite_manager.query(query, params)
+    fragments, params = _filter_fragments(filters, "mp")
+    params.update(_period_params(start_yyyymm, end_yyyymm))
+    after_paid, after_person_id = after if after is not None else (None, None)
+    params.update(
+        after_paid=after_paid, after_person_id=after_person_id, page_size=page_size
+    )
+    return query_registry.query(
+        TOP_MEMBERS,
+        params,
+        **fragments,
+        **_source_fragments(params),
+    )
@@ -17,6 +17,7 @@ layout = (
                                 width=12,
                                 className="w-100",
                             ),
+                            dcc.Store(id="pmpm-cost-card-refine"),
                             dbc.Card(
                                 dbc.CardBody(
                                     [
@@ -25,6 +26,8 @@ layout = (
                                             className="text-teal-blue",
                                         ),
                                         dcc.Graph(id="pmpm-trend"),
+                                        dcc.Store(id="pmpm-trend-structure"),
+                                        dcc.Store(id="pmpm-trend-refine"),
                                     ]
                                 ),
                             ),
@@ -55,6 +58,15 @@ layout = (
                                             ],
                                             className="d-flex flex-column gap-3",
                                         ),
+                                        html.H6(
+                                            "Risk Score Distribution",
+                                            className="text-teal-blue mt-3",
+                                            style={"font-size": "18px"},
+                                        ),
+                                        dcc.Graph(id="risk-score-distribution"),
+                                        dcc.Store(
+                                            id="risk-score-distribution-structure"
+                                        ),
                                     ]
                                 )
                             ),
@@ -87,6 +99,9 @@ layout = (
                                                                     "height": "270px"
                                                                 },
                                                             ),
+                                                            dcc.Store(
+                                                                id="encounter-group-chart-structure"
+                                                            ),
                                                         ],
                                                     )
                                                 ],
@@ -108,6 +123,9 @@ layout = (
                                                                     "height": "270px"
                                                                 },
                                                             ),
+                                                            dcc.Store(
+                                                                id="paid-by-cohort-chart-structure"
+                                                            ),
                                                         ],
                                                     )
                                                 ],
@@ -126,6 +144,9 @@ layout = (
                                             dcc.Graph(
                                                 id="encounter-group-percentage-chart",
                                             ),
+                                            dcc.Store(
+                                                id="encounter-group-percentage-chart-structure"
+                                            ),
                                         ]
                                     )
                                 ),
@@ -139,13 +160,59 @@ layout = (
                                             dcc.Graph(
                                                 id="condition-ccsr-chart",
                                             ),
+                                            dcc.Store(
+                                                id="condition-ccsr-chart-structure"
+                                            ),
+                                            dcc.Store(id="condition-ccsr-refine"),
+                                            dcc.Store(
+                                                id="condition-ccsr-pages",
+                                                data=1,
+                                            ),
+                                            dbc.Button(
+                                                "Load more categories",
+                                                id="condition-ccsr-load-more",
+                                                color="link",
+                                                size="sm",
+                                                style={"display": "none"},
+                                            ),
                                         ],
+                                        id="condition-ccsr-container",
                                         style={
                                             "overflowY": "auto",
                                             "maxHeight": "400px",
                                         },
                                     )
                                 ),
+                                dbc.Card(
+                                    dbc.CardBody(
+                                        [
+                                            html.H5(
+                                                "Top Members by Total Paid",
+                                                className="mb-2 text-teal-blue",
+                                            ),
+                                            html.Div(id="top-members-table"),
+                                            dcc.Store(id="top-members-pages"),
+                                            dbc.ButtonGroup(
+                                                [
+                                                    dbc.Button(
+                                                        "Previous",
+                                                        id="top-members-previous",
+                                                        color="link",
+                                                        size="sm",
+                                                        disabled=True,
+                                                    ),
+                                                    dbc.Button(
+                                                        "Next",
+                                                        id="top-members-next",
+                                                        color="link",
+                                                        size="sm",
+                                                        disabled=True,
+                                                    ),
+                                                ]
+                                            ),
+                                        ]
+                                    )
+                                ),
                             ],
                             gap=3,
                         )
@@ -0,0 +1,651 @@
+"""SQL templates of the ACO dashboard, registered in `query_registry`.
+
+Placeholders in braces are structural fragments supplied by `data.py`:
+
+- `claims_table`, `encounters_count`: claims source for `DISTINCT_MODE`: the
+  claim lines, their encounter grain or their sketches.
+- `members_table`, `members_count`: member-months source for `DISTINCT_MODE`:
+  the member months or their per-month member counts.
+- `fact_claims`, `fact_member_months`: the raw fact tables.
+- `member_paid`: paid amounts per member and month, the `FACT_MEMBER_PAID`
+  summary or the claim lines.
+- `claims_sample`: the stratified member sample `FACT_CLAIMS_SAMPLE` of the
+  `estimate_*` queries (see `services.sampling`).
+- `filter_clause`: conditions from `build_filter_clause`, with their leading
+  `AND`/`WHERE` keyword, or empty. Dimension labels are filtered on the fact
+  table's surrogate keys (see `services.dimensions`).
+- `dimension_joins`: joins of the dimensions whose label filters could not
+  be rewritten as key filters, or empty.
+
+Table fragments are routed by `SQLiteManager.route` to the partitions
+overlapping the period bound as `:start_yyyymm` and `:end_yyyymm`, with the
+same text for every period.
+
+Values are always bound as `:name` parameters. Queries returning more than
+one row declare the types of their result columns (see `services.columnar`).
+"""
+
+from services.query_registry import query_registry
+
+# Member months in the window: distinct members summed per month.
+_MEMBER_MONTHS = """
+            SELECT COALESCE(SUM(MEMBERS_COUNT), 0) AS MEMBER_MONTHS_COUNT
+            FROM (
+                SELECT {members_count} AS MEMBERS_COUNT
+                FROM {members_table}
+                WHERE YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+                GROUP BY YEAR_MONTH
+            )"""
+
+
+def _sample_strata(keys: list[str], condition: str) -> str:
+    """Return CTEs estimating the paid total and its variance per stratum and `keys`.
+
+    `sample_strata` holds one row per YEAR_MONTH, encounter group and `keys`
+    (further `FACT_CLAIMS_SAMPLE` columns) of the sampled rows matching
+    `condition`.
+    """
+    columns = ["YEAR_MONTH", "ENCOUNTER_GROUP_SK", *keys]
+    sample_columns = ", ".join(f"s.{column}" for column in columns)
+    return f"""
+        sampled_members AS (
+            SELECT
+                {sample_columns},
+                s.PERSON_ID,
+                MAX(s.STRATUM_MEMBERS) AS STRATUM_MEMBERS,
+                MAX(s.STRATUM_SAMPLE) AS STRATUM_SAMPLE,
+                SUM(s.PAID_AMOUNT) AS PAID
+            FROM {{claims_sample}} s
+            {{dimension_joins}}
+            {condition}
+            GROUP BY {sample_columns}, s.PERSON_ID
+        ),
+        sample_strata AS (
+            SELECT
+                {", ".join(columns)},
+                1.0 * MAX(STRATUM_MEMBERS) * SUM(PAID) / MAX(STRATUM_SAMPLE)
+                    AS TOTAL_PAID,
+                CASE WHEN MAX(STRATUM_SAMPLE) > 1
+                    THEN 1.0 * MAX(STRATUM_MEMBERS)
+                        * (MAX(STRATUM_MEMBERS) - MAX(STRATUM_SAMPLE))
+                        / MAX(STRATUM_SAMPLE)
+                        * MAX(
+                            SUM(PAID * PAID)
+                                - 1.0 * SUM(PAID) * SUM(PAID) / MAX(STRATUM_SAMPLE),
+                            0
+                        )
+                        / (MAX(STRATUM_SAMPLE) - 1)
+                    ELSE 0 END AS PAID_VARIANCE
+            FROM sampled_members
+            GROUP BY {", ".join(columns)}
+        )"""
+
+
+CALC_KPIS = query_registry.register(
+    "calc_kpis",
+    """
+        WITH claims_agg AS (
+            SELECT
+                SUM(PAID_AMOUNT) AS paid,
+                {encounters_count} AS encounters
+            FROM {claims_table} clm
+            {dimension_joins}
+            WHERE YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+            {filter_clause}
+        ),
+        member_months AS ("""
+    + _MEMBER_MONTHS
+    + """
+        )
+        SELECT
+            claims_agg.paid,
+            claims_agg.encounters,
+            member_months.MEMBER_MONTHS_COUNT AS mm
+        FROM claims_agg, member_months
+    """,
+)
+
+# Sample estimate of the `calc_kpis` paid amount, with its variance, over the
+# exact member months.
+ESTIMATE_KPIS = query_registry.register(
+    "estimate_kpis",
+    """
+        WITH"""
+    + _sample_strata(
+        [],
+        """WHERE s.YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+            {filter_clause}""",
+    )
+    + """,
+        claims_estimate AS (
+            SELECT
+                SUM(TOTAL_PAID) AS paid,
+                SUM(PAID_VARIANCE) AS paid_variance
+            FROM sample_strata
+        ),
+        member_months AS ("""
+    + _MEMBER_MONTHS
+    + """
+        )
+        SELECT
+            claims_estimate.paid,
+            claims_estimate.paid_variance,
+            member_months.MEMBER_MONTHS_COUNT AS mm
+        FROM claims_estimate, member_months
+    """,
+)
+
+DEMOGRAPHIC_DATA = query_registry.register(
+    "get_demographic_data",
+    """
+        WITH member_month_details AS (
+            SELECT
+                f.PERSON_ID,
+                f.YEAR_MONTH,
+                d.SEX,
+                d.AGE,
+                f.NORMALIZED_RISK_SCORE,
+                CAST(f.PERSON_ID AS TEXT) || '-' || CAST(f.YEAR_MONTH AS TEXT) AS MEMBER_MONTH_ID
+            FROM {fact_member_months} AS f
+            LEFT JOIN DIM_MEMBER AS d
+                ON f.PERSON_ID = d.PERSON_ID
+            WHERE f.YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+        ),
+        member_month_counts AS (
+            SELECT
+                COUNT(DISTINCT MEMBER_MONTH_ID) AS TOTAL_MEMBER_MONTHS
+            FROM member_month_details
+        )
+        SELECT
+            COALESCE(mmc.TOTAL_MEMBER_MONTHS, 0) AS TOTAL_MEMBER_MONTHS,
+            CASE WHEN mmc.TOTAL_MEMBER_MONTHS > 0
+                THEN 100.0 * SUM(CASE WHEN LOWER(mmd.SEX) = 'female' THEN 1 ELSE 0 END)
+                    / mmc.TOTAL_MEMBER_MONTHS
+                ELSE 0
+            END AS PERCENT_FEMALE,
+            COALESCE(AVG(mmd.NORMALIZED_RISK_SCORE), 0) AS AVG_RISK_SCORE
+        FROM member_month_details mmd
+        CROSS JOIN member_month_counts mmc;
+    """,
+)
+
+RISK_SCORE_SKETCHES = query_registry.register(
+    "get_risk_score_sketches",
+    """
+        SELECT YEAR_MONTH, RISK_COUNT, RISK_SKETCH
+        FROM FACT_MEMBER_MONTHS_RISK_SKETCH
+        WHERE YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+    """,
+    schema={"YEAR_MONTH": "int32", "RISK_COUNT": "int64", "RISK_SKETCH": "binary"},
+)
+
+RISK_SCORES = query_registry.register(
+    "get_risk_scores",
+    """
+        SELECT NORMALIZED_RISK_SCORE
+        FROM {fact_member_months}
+        WHERE YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+            AND NORMALIZED_RISK_SCORE IS NOT NULL
+    """,
+    schema={"NORMALIZED_RISK_SCORE": "float64"},
+)
+
+TRENDS_DATA = query_registry.register(
+    "get_trends_data",
+    """
+        WITH member_counts_by_month AS (
+            SELECT
+                YEAR_MONTH,
+                {members_count} AS MEMBERS_COUNT
+            FROM {members_table}
+            GROUP BY YEAR_MONTH
+        ),
+        claim_aggregates_by_month AS (
+            SELECT
+                clm.YEAR_MONTH,
+                {encounters_count} AS ENCOUNTERS_COUNT,
+                SUM(clm.PAID_AMOUNT) AS TOTAL_PAID
+            FROM {claims_table} clm
+            {dimension_joins}
+            {filter_clause}
+            GROUP BY clm.YEAR_MONTH
+        )
+        SELECT
+            m.YEAR_MONTH,
+            m.MEMBERS_COUNT,
+            e.ENCOUNTERS_COUNT,
+            e.TOTAL_PAID,
+
+            CASE WHEN m.MEMBERS_COUNT > 0
+                THEN COALESCE(e.TOTAL_PAID, 0) / m.MEMBERS_COUNT
+                ELSE 0 END AS PMPM,
+
+            CASE WHEN m.MEMBERS_COUNT > 0
+                THEN COALESCE(e.ENCOUNTERS_COUNT, 0) * 12000 / m.MEMBERS_COUNT
+                ELSE 0 END AS PKPY,
+
+            CASE WHEN e.ENCOUNTERS_COUNT > 0
+                THEN COALESCE(e.TOTAL_PAID, 0) / e.ENCOUNTERS_COUNT
+                ELSE 0 END AS COST_PER_ENCOUNTER
+
+        FROM member_counts_by_month m
+        LEFT JOIN claim_aggregates_by_month e
+            ON m.YEAR_MONTH = e.YEAR_MONTH
+        ORDER BY m.YEAR_MONTH;
+    """,
+    schema={
+        "YEAR_MONTH": "month",
+        "MEMBERS_COUNT": "int64",
+        "ENCOUNTERS_COUNT": "float64",
+        "TOTAL_PAID": "float64",
+        "PMPM": "float64",
+        "PKPY": "float64",
+        "COST_PER_ENCOUNTER": "float64",
+    },
+)
+
+# Encounter sketches of the filtered claims, merged per month in Python into
+# the encounter counts of `get_trends_data` in approximate mode.
+ENCOUNTER_SKETCHES = query_registry.register(
+    "get_encounter_sketches",
+    """
+        SELECT clm.YEAR_MONTH, clm.ENCOUNTER_SKETCH
+        FROM {claims_table} clm
+        {dimension_joins}
+        WHERE clm.ENCOUNTER_SKETCH IS NOT NULL
+        {filter_clause}
+    """,
+    schema={"YEAR_MONTH": "month", "ENCOUNTER_SKETCH": "binary"},
+)
+
+# Sample estimate of the monthly paid amounts and PMPM of `get_trends_data`,
+# with the variance of the PMPM.
+ESTIMATE_TRENDS_DATA = query_registry.register(
+    "estimate_trends_data",
+    """
+        WITH member_counts_by_month AS (
+            SELECT
+                YEAR_MONTH,
+                {members_count} AS MEMBERS_COUNT
+            FROM {members_table}
+            GROUP BY YEAR_MONTH
+        ),"""
+    + _sample_strata([], "{filter_clause}")
+    + """,
+        paid_by_month AS (
+            SELECT
+                YEAR_MONTH,
+                SUM(TOTAL_PAID) AS TOTAL_PAID,
+                SUM(PAID_VARIANCE) AS PAID_VARIANCE
+            FROM sample_strata
+            GROUP BY YEAR_MONTH
+        )
+        SELECT
+            m.YEAR_MONTH,
+            m.MEMBERS_COUNT,
+            e.TOTAL_PAID,
+            CASE WHEN m.MEMBERS_COUNT > 0
+                THEN COALESCE(e.TOTAL_PAID, 0) / m.MEMBERS_COUNT
+                ELSE 0 END AS PMPM,
+            CASE WHEN m.MEMBERS_COUNT > 0
+                THEN COALESCE(e.PAID_VARIANCE, 0)
+                    / (1.0 * m.MEMBERS_COUNT * m.MEMBERS_COUNT)
+                ELSE 0 END AS PMPM_VARIANCE
+        FROM member_counts_by_month m
+        LEFT JOIN paid_by_month e
+            ON m.YEAR_MONTH = e.YEAR_MONTH
+        ORDER BY m.YEAR_MONTH;
+    """,
+    schema={
+        "YEAR_MONTH": "month",
+        "MEMBERS_COUNT": "int64",
+        "TOTAL_PAID": "float64",
+        "PMPM": "float64",
+        "PMPM_VARIANCE": "float64",
+    },
+)
+
+# `group_key` and `rollup_case` switch between one row per category and the
+# top :top_n categories followed by a single :rollup_value row. Categories with
+# equal paid amounts rank by name, as in `data._rank_categories`.
+CONDITION_CCSR_DATA = query_registry.register(
+    "get_condition_ccsr_data",
+    """
+        WITH
+        category_claims AS (
+            SELECT
+                fc.CCSR_CATEGORY_DESCRIPTION,
+                SUM(fc.PAID_AMOUNT) AS TOTAL_PAID
+            FROM {fact_claims} AS fc
+            {dimension_joins}
+            WHERE fc.YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+            {filter_clause}
+            GROUP BY fc.CCSR_CATEGORY_DESCRIPTION
+        ),
+        ranked_claims AS (
+            SELECT
+                CCSR_CATEGORY_DESCRIPTION,
+                TOTAL_PAID,
+                ROW_NUMBER() OVER (
+                    ORDER BY TOTAL_PAID DESC NULLS LAST,
+                        CCSR_CATEGORY_DESCRIPTION NULLS LAST
+                ) AS CATEGORY_RANK
+            FROM category_claims
+        ),
+        member_months AS ("""
+    + _MEMBER_MONTHS
+    + """
+        )
+        SELECT
+            CASE
+                {rollup_case}
+                WHEN MIN(cc.CCSR_CATEGORY_DESCRIPTION) IS NULL THEN 'other'
+                ELSE MIN(cc.CCSR_CATEGORY_DESCRIPTION)
+            END AS CCSR_CATEGORY_DESCRIPTION,
+            SUM(cc.TOTAL_PAID) AS TOTAL_PAID,
+            CASE
+                WHEN mm.MEMBER_MONTHS_COUNT > 0
+                THEN SUM(cc.TOTAL_PAID) / mm.MEMBER_MONTHS_COUNT
+                ELSE 0
+            END AS PMPM,
+            COUNT(*) AS CATEGORY_COUNT
+        FROM ranked_claims AS cc
+        CROSS JOIN member_months AS mm
+        GROUP BY {group_key}
+        ORDER BY MIN(cc.CATEGORY_RANK)
+    """,
+    schema={
+        "CCSR_CATEGORY_DESCRIPTION": "string",
+        "TOTAL_PAID": "float64",
+        "PMPM": "float64",
+        "CATEGORY_COUNT": "int64",
+    },
+)
+
+# Sample estimate of `get_condition_ccsr_data`, with the variance of each
+# row's PMPM. Variances of rolled-up categories are summed.
+ESTIMATE_CONDITION_CCSR_DATA = query_registry.register(
+    "estimate_condition_ccsr_data",
+    """
+        WITH"""
+    + _sample_strata(
+        ["CCSR_CATEGORY_DESCRIPTION"],
+        """WHERE s.YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+            {filter_clause}""",
+    )
+    + """,
+        category_claims AS (
+            SELECT
+                CCSR_CATEGORY_DESCRIPTION,
+                SUM(TOTAL_PAID) AS TOTAL_PAID,
+                SUM(PAID_VARIANCE) AS PAID_VARIANCE
+            FROM sample_strata
+            GROUP BY CCSR_CATEGORY_DESCRIPTION
+        ),
+        ranked_claims AS (
+            SELECT
+                CCSR_CATEGORY_DESCRIPTION,
+                TOTAL_PAID,
+                PAID_VARIANCE,
+                ROW_NUMBER() OVER (
+                    ORDER BY TOTAL_PAID DESC NULLS LAST,
+                        CCSR_CATEGORY_DESCRIPTION NULLS LAST
+                ) AS CATEGORY_RANK
+            FROM category_claims
+        ),
+        member_months AS ("""
+    + _MEMBER_MONTHS
+    + """
+        )
+        SELECT
+            CASE
+                {rollup_case}
+                WHEN MIN(cc.CCSR_CATEGORY_DESCRIPTION) IS NULL THEN 'other'
+                ELSE MIN(cc.CCSR_CATEGORY_DESCRIPTION)
+            END AS CCSR_CATEGORY_DESCRIPTION,
+            SUM(cc.TOTAL_PAID) AS TOTAL_PAID,
+            CASE
+                WHEN mm.MEMBER_MONTHS_COUNT > 0
+                THEN SUM(cc.TOTAL_PAID) / mm.MEMBER_MONTHS_COUNT
+                ELSE 0
+            END AS PMPM,
+            CASE
+                WHEN mm.MEMBER_MONTHS_COUNT > 0
+                THEN SUM(cc.PAID_VARIANCE)
+                    / (1.0 * mm.MEMBER_MONTHS_COUNT * mm.MEMBER_MONTHS_COUNT)
+                ELSE 0
+            END AS PMPM_VARIANCE,
+            COUNT(*) AS CATEGORY_COUNT
+        FROM ranked_claims AS cc
+        CROSS JOIN member_months AS mm
+        GROUP BY {group_key}
+        ORDER BY MIN(cc.CATEGORY_RANK)
+    """,
+    schema={
+        "CCSR_CATEGORY_DESCRIPTION": "string",
+        "TOTAL_PAID": "float64",
+        "PMPM": "float64",
+        "PMPM_VARIANCE": "float64",
+        "CATEGORY_COUNT": "int64",
+    },
+)
+
+PMPM_PERFORMANCE_VS_EXPECTED_DATA = query_registry.register(
+    "get_pmpm_performance_vs_expected_data",
+    """
+        WITH claims_by_encounter_group_sk AS (
+            SELECT
+                clm.ENCOUNTER_GROUP_SK,
+                SUM(PAID_AMOUNT) as TOTAL_PAID
+            FROM {fact_claims} clm
+            {dimension_joins}
+            WHERE clm.YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+            {filter_clause}
+            GROUP BY clm.ENCOUNTER_GROUP_SK
+        ),
+        claims_by_encounter_group AS (
+            SELECT
+                grp.ENCOUNTER_GROUP,
+                SUM(sk.TOTAL_PAID) as TOTAL_PAID
+            FROM claims_by_encounter_group_sk sk
+            LEFT JOIN DIM_ENCOUNTER_GROUP grp
+                ON sk.ENCOUNTER_GROUP_SK = grp.ENCOUNTER_GROUP_SK
+            GROUP BY grp.ENCOUNTER_GROUP
+        ),
+        member_months AS ("""
+    + _MEMBER_MONTHS
+    + """
+        )
+
+        SELECT
+            clm.ENCOUNTER_GROUP,
+            CASE
+                WHEN mm.MEMBER_MONTHS_COUNT > 0
+                THEN clm.TOTAL_PAID / mm.MEMBER_MONTHS_COUNT
+                ELSE 0
+            END AS PMPM
+        FROM claims_by_encounter_group clm
+        CROSS JOIN member_months AS MM
+        ORDER BY PMPM DESC
+    """,
+    schema={"ENCOUNTER_GROUP": "string", "PMPM": "float64"},
+)
+
+# Partial aggregates summed over the month chunks of a window by the
+# map-reduce versions of the queries above (see `services.parallel`).
+MEMBER_MONTHS = query_registry.register("get_member_months", _MEMBER_MONTHS)
+
+PARTIAL_CCSR_PAID = query_registry.register(
+    "partial_ccsr_paid",
+    """
+        SELECT
+            fc.CCSR_CATEGORY_DESCRIPTION,
+            SUM(fc.PAID_AMOUNT) AS TOTAL_PAID
+        FROM {fact_claims} AS fc
+        {dimension_joins}
+        WHERE fc.YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+        {filter_clause}
+        GROUP BY fc.CCSR_CATEGORY_DESCRIPTION
+    """,
+    schema={"CCSR_CATEGORY_DESCRIPTION": "string", "TOTAL_PAID": "float64"},
+)
+
+PARTIAL_ENCOUNTER_GROUP_PAID = query_registry.register(
+    "partial_encounter_group_paid",
+    """
+        SELECT
+            clm.ENCOUNTER_GROUP_SK,
+            SUM(PAID_AMOUNT) AS TOTAL_PAID
+        FROM {fact_claims} clm
+        {dimension_joins}
+        WHERE clm.YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+        {filter_clause}
+        GROUP BY clm.ENCOUNTER_GROUP_SK
+    """,
+    schema={"ENCOUNTER_GROUP_SK": "int64", "TOTAL_PAID": "float64"},
+)
+
+PARTIAL_MEMBER_PAID = query_registry.register(
+    "partial_member_paid",
+    """
+        SELECT
+            PERSON_ID,
+            SUM(fc.PAID_AMOUNT) AS TOTAL_PAID
+        FROM {member_paid} fc
+        {dimension_joins}
+        WHERE YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+        {filter_clause}
+        GROUP BY PERSON_ID
+    """,
+    schema={"PERSON_ID": "int64", "TOTAL_PAID": "float64"},
+)
+
+COHORT_DATA = query_registry.register(
+    "get_cohort_data",
+    """
+        WITH member_totals AS (
+            SELECT
+                person_id,
+                SUM(fc.PAID_AMOUNT) AS total_paid
+            FROM {member_paid} fc
+            {dimension_joins}
+            WHERE year_month BETWEEN :start_yyyymm AND :end_yyyymm
+            {filter_clause}
+            GROUP BY person_id
+        ),
+
+        total_person_count AS (
+            SELECT COUNT(*) AS total_person_count
+            FROM member_totals
+        ),
+
+        ranked_members AS (
+            SELECT
+                mt.person_id,
+                mt.total_paid,
+                ROW_NUMBER() OVER(ORDER BY mt.total_paid DESC) AS rn,
+                tpc.total_person_count
+            FROM member_totals mt
+            CROSS JOIN total_person_count tpc
+        ),
+
+        group_summary AS (
+            SELECT
+                COALESCE(SUM(CASE WHEN rn <= CEIL(total_person_count * 0.01) THEN total_paid END), 0) AS top_1_total,
+                COALESCE(COUNT(CASE WHEN rn <= CEIL(total_person_count * 0.01) THEN 1 END), 0) AS top_1_count,
+
+                COALESCE(SUM(CASE WHEN rn <= CEIL(total_person_count * 0.05) THEN total_paid END), 0) AS top_5_total,
+                COALESCE(COUNT(CASE WHEN rn <= CEIL(total_person_count * 0.05) THEN 1 END), 0) AS top_5_count,
+
+                COALESCE(SUM(CASE WHEN rn <= CEIL(total_person_count * 0.20) THEN total_paid END), 0) AS top_20_total,
+                COALESCE(COUNT(CASE WHEN rn <= CEIL(total_person_count * 0.20) THEN 1 END), 0) AS top_20_count,
+
+                SUM(total_paid) AS all_total,
+                COUNT(*) AS all_count
+            FROM ranked_members
+        )
+
+        SELECT
+            'Top 1%' AS percent_group,
+            top_1_total AS total_paid_amount,
+            top_1_count AS member_count,
+            ROUND(100.0 * top_1_total / all_total, 2) AS percent_of_total
+        FROM group_summary
+        UNION ALL
+        SELECT
+            'Top 5%' AS percent_group,
+            top_5_total AS total_paid_amount,
+            top_5_count AS member_count,
+            ROUND(100.0 * top_5_total / all_total, 2) AS percent_of_total
+        FROM group_summary
+        UNION ALL
+        SELECT
+            'Top 20%' AS percent_group,
+            top_20_total AS total_paid_amount,
+            top_20_count AS member_count,
+            ROUND(100.0 * top_20_total / all_total, 2) AS percent_of_total
+        FROM group_summary
+        UNION ALL
+        SELECT
+            'All Members' AS percent_group,
+            all_total AS total_paid_amount,
+            all_count AS member_count,
+            100.0 AS percent_of_total
+        FROM group_summary
+    """,
+    schema={
+        "percent_group": "string",
+        "total_paid_amount": "float64",
+        "member_count": "int64",
+        "percent_of_total": "float64",
+    },
+)
+
+# One page of members by descending paid amount. Pages continue after the
+# (:after_paid, :after_person_id) key of the previous page's last row, or
+# start at the top when it is null, so deep pages cost no OFFSET scan.
+TOP_MEMBERS = query_registry.register(
+    "get_top_members",
+    """
+        WITH member_totals AS (
+            SELECT
+                mp.PERSON_ID,
+                SUM(mp.PAID_AMOUNT) AS TOTAL_PAID
+            FROM {member_paid} mp
+            {dimension_joins}
+            WHERE mp.YEAR_MONTH BETWEEN :start_yyyymm AND :end_yyyymm
+                AND mp.PERSON_ID IS NOT NULL
+            {filter_clause}
+            GROUP BY mp.PERSON_ID
+            HAVING SUM(mp.PAID_AMOUNT) IS NOT NULL
+        ),
+        page AS (
+            SELECT
+                PERSON_ID,
+                TOTAL_PAID,
+                100.0 * TOTAL_PAID / SUM(TOTAL_PAID) OVER () AS PERCENT_OF_TOTAL
+            FROM member_totals
+        )
+        SELECT
+            page.PERSON_ID,
+            d.SEX,
+            d.AGE,
+            page.TOTAL_PAID,
+            page.PERCENT_OF_TOTAL
+        FROM page
+        LEFT JOIN DIM_MEMBER d
+            ON page.PERSON_ID = d.PERSON_ID
+        WHERE :after_paid IS NULL
+            OR page.TOTAL_PAID < :after_paid
+            OR (page.TOTAL_PAID = :after_paid AND page.PERSON_ID > :after_person_id)
+        ORDER BY page.TOTAL_PAID DESC, page.PERSON_ID
+        LIMIT :page_size
+    """,
+    schema={
+        "PERSON_ID": "int64",
+        "SEX": "string",
+        "AGE": "int64",
+        "TOTAL_PAID": "float64",
+        "PERCENT_OF_TOTAL": "float64",
+    },
+)
@@ -0,0 +1,269 @@
+"""Deadlines, cancellation and admission control of SQLite queries.
+
+Every query gets a deadline `QUERY_TIMEOUT` seconds after it is issued. A
+SQLite progress handler interrupts it once the deadline passes, or once the
+callback request that issued it is superseded by a newer request for the
+same callback from the same browser tab (see `cancel_superseded`).
+
+Queries are admitted through one of two lanes: "expensive" ones, reading
+more than `EXPENSIVE_QUERY_ROWS` rows, run at most `MAX_EXPENSIVE_QUERIES`
+at a time, so a few full-range scans cannot hold up the cheap queries of
+other users, which have their own `MAX_CHEAP_QUERIES` slots. Queries beyond
+a lane's limit wait in line; they are rejected when `MAX_QUEUED_QUERIES`
+already wait or when their deadline passes first. Limits and counters are
+per process.
+"""
+
+import contextlib
+import functools
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+import flask
+from dash.exceptions import PreventUpdate
+
+# Request header carrying the browser tab id set by `assets/tab_id.js`.
+TAB_HEADER = "X-Dashboard-Tab"
+
+# SQLite virtual machine instructions between two checks of the deadline and
+# of cancellation.
+PROGRESS_STEPS = 10_000
+
+# Longest wait in line between two checks for cancellation, in seconds.
+_QUEUE_POLL_SECONDS = 0.05
+
+
+class QueryCancelled(Exception):
+    """The request that issued the query was superseded."""
+
+
+class QueryTimeout(TimeoutError):
+    """The query ran past its deadline and was interrupted."""
+
+
+class QueryRejected(TimeoutError):
+    """The query was not admitted: its lane's line was full or its deadline passed."""
+
+
+class RequestScope:
+    """Queries issued by one callback request, cancelled when it is superseded."""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+
+
+_current_scope: ContextVar[Optional[RequestScope]] = ContextVar(
+    "query_request_scope", default=None
+)
+_latest_scopes: dict[tuple[str, str], RequestScope] = {}
+_latest_lock = threading.Lock()
+
+
+def current_scope() -> Optional[RequestScope]:
+    """Return the scope of the callback request running in this context, if any."""
+    return _current_scope.get()
+
+
+def cancel_superseded(func):
+    """Cancel the queries of a callback's previous request from the same tab.
+
+    Requests are identified by the `TAB_HEADER` of the browser tab and the
+    callback. When a new request arrives while an earlier one is still
+    running, the earlier one's queries are interrupted and its update is
+    dropped (`PreventUpdate`): the browser discards it anyway. Calls outside
+    a request, or without the header, run as usual.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        tab = (
+            flask.request.headers.get(TAB_HEADER)
+            if flask.has_request_context()
+            else None
+        )
+        if tab is None:
+            return func(*args)
+
+        key = (tab, func.__qualname__)
+        scope = RequestScope()
+        with _latest_lock:
+            previous = _latest_scopes.get(key)
+            _latest_scopes[key] = scope
+        if previous is not None:
+            previous.cancelled.set()
+
+        token = _current_scope.set(scope)
+        try:
+            result = func(*args)
+        except QueryCancelled:
+            raise PreventUpdate
+        finally:
+            _current_scope.reset(token)
+            with _latest_lock:
+                if _latest_scopes.get(key) is scope:
+                    del _latest_scopes[key]
+        # Callbacks may catch the cancellation and return an error output.
+        if scope.cancelled.is_set():
+            raise PreventUpdate
+        return result
+
+    return wrapper
+
+
+class AdmissionControl:
+    """Per-lane concurrency limits, deadlines and cancellation of queries.
+
+    Args:
+        limits (dict[str, int]): Maximum concurrent queries per lane.
+        max_queued (int): Maximum queries waiting per lane; further ones are
+            rejected at once.
+    """
+
+    def __init__(self, limits: dict[str, int], max_queued: int):
+        self.limits = limits
+        self.max_queued = max_queued
+        # One condition per lane on a shared lock, so a freed slot wakes a
+        # query waiting for that lane rather than one of the other lane.
+        self._lock = threading.Lock()
+        self._conds = {lane: threading.Condition(self._lock) for lane in limits}
+        self._counters = {
+            lane: {
+                "running": 0,
+                "queued": 0,
+                "admitted": 0,
+                "rejected": 0,
+                "timeouts": 0,
+                "cancelled": 0,
+                "wait_seconds": 0.0,
+                "max_wait_seconds": 0.0,
+            }
+            for lane in limits
+        }
+
+    @contextlib.contextmanager
+    def admit(
+        self, lane: str, deadline: Optional[float], scope: Optional[RequestScope]
+    ) -> Iterator[None]:
+        """Hold a slot of `lane` for the duration of the `with` block.
+
+        Args:
+            lane (str): Lane of the query, a key of `limits`.
+            deadline (float, optional): `time.monotonic()` time by which the
+                query must be done, None for no deadline.
+            scope (RequestScope, optional): Request issuing the query.
+
+        Raises:
+            QueryRejected: If the lane's line is full or the deadline passes
+                while waiting.
+            QueryCancelled: If the request is superseded while waiting.
+        """
+        counters = self._counters[lane]
+        cond = self._conds[lane]
+        started = time.monotonic()
+        with cond:
+            if counters["running"] >= self.limits[lane]:
+                if counters["queued"] >= self.max_queued:
+                    counters["rejected"] += 1
+                    raise QueryRejected(
+                        f"{counters['queued']} {lane} queries already waiting"
+                    )
+                counters["queued"] += 1
+                try:
+                    while counters["running"] >= self.limits[lane]:
+                        if scope is not None and scope.cancelled.is_set():
+                            counters["cancelled"] += 1
+                            raise QueryCancelled("Superseded while waiting")
+                        wait = _QUEUE_POLL_SECONDS
+                        if deadline is not None:
+                            wait = min(wait, deadline - time.monotonic())
+                            if wait <= 0:
+                                counters["rejected"] += 1
+                                raise QueryRejected(
+                                    f"No {lane} query slot free before the deadline"
+                                )
+                        cond.wait(wait)
+                finally:
+                    counters["queued"] -= 1
+            waited = time.monotonic() - started
+            counters["running"] += 1
+            counters["admitted"] += 1
+            counters["wait_seconds"] += waited
+            counters["max_wait_seconds"] = max(counters["max_wait_seconds"], waited)
+        try:
+            yield
+        finally:
+            with cond:
+                counters["running"] -= 1
+                cond.notify()
+
+    @contextlib.contextmanager
+    def interruptible(
+        self,
+        conn: sqlite3.Connection,
+        lane: str,
+        deadline: Optional[float],
+        scope: Optional[RequestScope],
+    ) -> Iterator[None]:
+        """Interrupt the queries run on `conn` in the block at the deadline or on cancellation.
+
+        Raises:
+            QueryTimeout: If the deadline passed.
+            QueryCancelled: If the request was superseded.
+        """
+        if deadline is None and scope is None:
+            yield
+            return
+
+        def progress() -> int:
+            if scope is not None and scope.cancelled.is_set():
+                return 1
+            return int(deadline is not None and time.monotonic() > deadline)
+
+        conn.set_progress_handler(progress, PROGRESS_STEPS)
+        try:
+            yield
+        except Exception as e:
+            if scope is not None and scope.cancelled.is_set():
+                self._count(lane, "cancelled")
+                raise QueryCancelled("Superseded while running") from e
+            if deadline is not None and time.monotonic() > deadline:
+                self._count(lane, "timeouts")
+                raise QueryTimeout("Query interrupted at its deadline") from e
+            raise
+        finally:
+            conn.set_progress_handler(None, 0)
+
+    def _count(self, lane: str, counter: str):
+        with self._lock:
+            self._counters[lane][counter] += 1
+
+    def stats(self) -> dict[str, dict]:
+        """Return the usage counters of each lane.
+
+        Returns:
+            dict[str, dict]: By lane, `limit`, `running` and `queued` queries,
+                `admitted`, `rejected` (line full or deadline passed while
+                waiting), `timeouts` (interrupted at the deadline) and
+                `cancelled` (superseded) counts, and `avg_wait_ms` and
+                `max_wait_ms` (time waiting for a slot).
+        """
+        with self._lock:
+            return {
+                lane: {
+                    "limit": self.limits[lane],
+                    "running": counters["running"],
+                    "queued": counters["queued"],
+                    "admitted": counters["admitted"],
+                    "rejected": counters["rejected"],
+                    "timeouts": counters["timeouts"],
+                    "cancelled": counters["cancelled"],
+                    "avg_wait_ms": 1000
+                    * counters["wait_seconds"]
+                    / max(counters["admitted"], 1),
+                    "max_wait_ms": 1000 * counters["max_wait_seconds"],
+                }
+                for lane, counters in self._counters.items()
+            }
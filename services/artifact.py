@@ -0,0 +1,139 @@
+"""Versioned, checksummed database artifacts built offline by `services.build`.
+
+An artifact is the dashboard's SQLite database, fully loaded, indexed and
+with its derived tables, plus:
+
+- `PRAGMA user_version` set to `ARTIFACT_FORMAT`, bumped whenever the tables
+  the app expects change, so an app never opens an artifact of another
+  format;
+- a `BUILD_INFO` table recording the data version, build time and the
+  settings it was built with;
+- a `WARM_RESULTS` table of query results of the default view, seeded into
+  each node's result cache;
+- a `<artifact>.sha256` file next to it (`sha256sum` format) holding its
+  SHA-256, checked before the artifact is opened.
+
+Artifacts are named after their format and data version, so a new build
+never overwrites the file a node is serving.
+"""
+
+import hashlib
+import os
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+from services.settings import (
+    CLUSTERED_LAYOUT,
+    COLUMNAR_SNAPSHOT,
+    DISTINCT_MODE,
+    ENCOUNTER_GRAIN,
+    HLL_RELATIVE_ERROR,
+    PARTITION_GRAIN,
+    PROGRESSIVE_MIN_STRATUM_MEMBERS,
+    PROGRESSIVE_RESULTS,
+    PROGRESSIVE_SAMPLE_RATE,
+    QUERY_BACKEND,
+)
+
+ARTIFACT_FORMAT = 1
+
+# Settings an artifact was built with; the ones in `SERVING_SETTINGS` decide
+# which tables queries read, so the app must run with the same values.
+BUILD_SETTINGS = {
+    "CLUSTERED_LAYOUT": CLUSTERED_LAYOUT,
+    "COLUMNAR_SNAPSHOT": COLUMNAR_SNAPSHOT,
+    "DISTINCT_MODE": DISTINCT_MODE,
+    "ENCOUNTER_GRAIN": ENCOUNTER_GRAIN,
+    "HLL_RELATIVE_ERROR": HLL_RELATIVE_ERROR,
+    "PARTITION_GRAIN": PARTITION_GRAIN,
+    "PROGRESSIVE_MIN_STRATUM_MEMBERS": PROGRESSIVE_MIN_STRATUM_MEMBERS,
+    "PROGRESSIVE_RESULTS": PROGRESSIVE_RESULTS,
+    "PROGRESSIVE_SAMPLE_RATE": PROGRESSIVE_SAMPLE_RATE,
+    "QUERY_BACKEND": QUERY_BACKEND,
+}
+SERVING_SETTINGS = ("DISTINCT_MODE", "QUERY_BACKEND")
+
+_CHUNK_BYTES = 1024 * 1024
+
+
+def artifact_name(data_version: str) -> str:
+    """Return the file name of the artifact of a data version."""
+    return f"app_data-v{ARTIFACT_FORMAT}-{data_version[:12]}.db"
+
+
+def read_only_uri(path: str) -> str:
+    """Return the URI opening `path` read-only, without locking (artifacts never change)."""
+    return Path(path).resolve().as_uri() + "?mode=ro&immutable=1"
+
+
+def file_checksum(path: str) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_build_info(conn: sqlite3.Connection, data_version: str):
+    """Stamp a built database with `ARTIFACT_FORMAT` and its `BUILD_INFO`."""
+    rows = {
+        "DATA_VERSION": data_version,
+        "BUILT_AT": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **{name: str(value) for name, value in BUILD_SETTINGS.items()},
+    }
+    conn.execute("DROP TABLE IF EXISTS BUILD_INFO")
+    conn.execute("CREATE TABLE BUILD_INFO (NAME TEXT PRIMARY KEY, VALUE TEXT)")
+    conn.executemany("INSERT INTO BUILD_INFO VALUES (?, ?)", rows.items())
+    conn.execute(f"PRAGMA user_version = {ARTIFACT_FORMAT}")
+    conn.commit()
+
+
+def write_checksum(path: str) -> str:
+    """Write the `<path>.sha256` file of an artifact and return the digest."""
+    checksum = file_checksum(path)
+    with open(f"{path}.sha256", "w") as f:
+        f.write(f"{checksum}  {os.path.basename(path)}\n")
+    return checksum
+
+
+def verify(path: str) -> dict[str, str]:
+    """Check an artifact's checksum, format and settings before it is opened.
+
+    Returns:
+        dict[str, str]: Its BUILD_INFO values by name.
+
+    Raises:
+        RuntimeError: If the checksum file is missing or does not match, the
+            format differs from `ARTIFACT_FORMAT`, or a `SERVING_SETTINGS`
+            value differs from the app's.
+    """
+    try:
+        with open(f"{path}.sha256") as f:
+            expected = f.read().split()[0]
+    except (OSError, IndexError):
+        raise RuntimeError(f"❌ No checksum file next to artifact {path}")
+    if file_checksum(path) != expected:
+        raise RuntimeError(f"❌ Artifact {path} does not match its checksum")
+
+    conn = sqlite3.connect(read_only_uri(path), uri=True)
+    try:
+        (artifact_format,) = conn.execute("PRAGMA user_version").fetchone()
+        build_info = dict(conn.execute("SELECT NAME, VALUE FROM BUILD_INFO"))
+    except sqlite3.DatabaseError as e:
+        raise RuntimeError(f"❌ Artifact {path} is not a dashboard build: {e}")
+    finally:
+        conn.close()
+    if artifact_format != ARTIFACT_FORMAT:
+        raise RuntimeError(
+            f"❌ Artifact {path} has format {artifact_format}, "
+            f"the app reads format {ARTIFACT_FORMAT}"
+        )
+    for name in SERVING_SETTINGS:
+        if build_info.get(name) != str(BUILD_SETTINGS[name]):
+            raise RuntimeError(
+                f"❌ Artifact {path} was built with {name}={build_info.get(name)}, "
+                f"the app runs with {name}={BUILD_SETTINGS[name]}"
+            )
+    return build_info
@@ -0,0 +1,78 @@
+"""Offline build of the database artifact served by the web nodes.
+
+`python -m services.build [output_dir]` does all the data preparation the
+app would otherwise do at startup: it loads the data (from Snowflake when
+`.env` exists, otherwise from the CSV sample), derives the rollups,
+sketches and indexes, runs the default view's queries to warm their
+results, and writes everything as one versioned, checksummed artifact (see
+`services.artifact`) into `output_dir` (default `artifacts/`). The settings
+it runs with are the ones the artifact is built for.
+
+Web nodes serve it with `ARTIFACT_PATH=<artifact>`: they only verify and
+open the file, so scaling out means copying the artifact and its `.sha256`
+file (and, built with `COLUMNAR_SNAPSHOT`, its `.columns` snapshot).
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from services import artifact
+from services.database import sqlite_manager
+from services.result_cache import result_cache
+from services.snapshot import snapshot_path
+
+DEFAULT_OUTPUT_DIR = "artifacts"
+
+
+def build(output_dir: str = DEFAULT_OUTPUT_DIR) -> str:
+    """Build an artifact into `output_dir` and return its path.
+
+    The database is built under a temporary name and only renamed to its
+    versioned name once complete, so a failed build leaves no artifact.
+    """
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    building = os.path.join(output_dir, "building.db")
+    for leftover in (building, f"{building}-journal"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+    sqlite_manager.db_path = building
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Warm into a scratch result cache, not the local app's.
+        result_cache.path = os.path.join(cache_dir, "result_cache.db")
+        sqlite_manager.initialize()
+
+        # Imported here: the callbacks import the whole dashboard.
+        from reports.aco_dashboard.callbacks import warm_up_default_view
+
+        warm_up_default_view()
+        data_version = sqlite_manager.data_version
+        conn = sqlite3.connect(building)
+        try:
+            warmed = result_cache.export(conn, data_version)
+            artifact.write_build_info(conn, data_version)
+        finally:
+            conn.close()
+
+    path = os.path.join(output_dir, artifact.artifact_name(data_version))
+    os.replace(building, path)
+    columns = snapshot_path(building)
+    if columns.exists():
+        shutil.rmtree(snapshot_path(path), ignore_errors=True)
+        os.replace(columns, snapshot_path(path))
+    checksum = artifact.write_checksum(path)
+    print(
+        f"Artifact {path} built in {time.perf_counter() - started:.1f}s: "
+        f"{os.path.getsize(path) / 1024 / 1024:.1f} MB, {warmed} warm query "
+        f"results, sha256 {checksum}"
+    )
+    return path
+
+
+if __name__ == "__main__":
+    build(*sys.argv[1:2])
@@ -0,0 +1,111 @@
+"""Typed, column-oriented query results.
+
+A query may declare the type of each result column as a schema such as
+`{"YEAR_MONTH": "month", "PMPM": "float64"}`. Its rows are then collected into
+one typed Arrow array per column and handed to pandas without a per-value
+conversion: numeric columns without nulls become NumPy-backed DataFrame
+columns sharing Arrow's buffers. YYYYMM columns declared "month" arrive as
+datetime64 first-of-month values, so callbacks do not convert them again.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from services.settings import COLUMNAR_RESULTS
+
+# Declared column types and their Arrow type; "month" columns hold YYYYMM
+# integers converted to timestamps of the first day of the month.
+COLUMN_TYPES = {
+    "int32": pa.int32(),
+    "int64": pa.int64(),
+    "float64": pa.float64(),
+    "string": pa.string(),
+    "binary": pa.binary(),
+    "month": pa.int32(),
+}
+
+# Row tuples converted to columns at a time when the driver returns rows.
+FETCH_BATCH_ROWS = 50_000
+
+
+def arrow_schema(names: list[str], schema: dict[str, str]) -> pa.Schema:
+    """Return the Arrow schema of result columns `names` under a declared `schema`.
+
+    Raises:
+        ValueError: If a result column has no declared type.
+    """
+    missing = [name for name in names if name not in schema]
+    if missing:
+        raise ValueError(f"No declared type for result columns {missing}")
+    return pa.schema([(name, COLUMN_TYPES[schema[name]]) for name in names])
+
+
+def fetch_table(cursor, schema: dict[str, str], names: list[str]) -> pa.Table:
+    """Fetch the rows of an executed DB-API cursor as a typed Arrow table.
+
+    Drivers with native Arrow results (Snowflake's `fetch_arrow_all`) are
+    read directly and cast; the row tuples of others are converted to columns
+    by Arrow, a batch at a time.
+
+    Args:
+        cursor: Cursor on which the query was executed.
+        schema (dict[str, str]): Declared type of each result column.
+        names (list[str]): Result column names, as spelled in `schema`.
+    """
+    target = arrow_schema(names, schema)
+    if hasattr(cursor, "fetch_arrow_all"):
+        table = cursor.fetch_arrow_all()
+        if table is None:
+            return target.empty_table()
+        return table.rename_columns(names).cast(target)
+
+    row_type = pa.struct(list(target))
+    batches = []
+    while rows := cursor.fetchmany(FETCH_BATCH_ROWS):
+        batches.append(pa.RecordBatch.from_struct_array(pa.array(rows, type=row_type)))
+    return pa.Table.from_batches(batches, schema=target)
+
+
+def _month_starts(column: pa.ChunkedArray) -> pa.Array:
+    """Convert YYYYMM integers to timestamps of the first day of their month."""
+    yyyymm = column.fill_null(197001).to_numpy().astype(np.int64)
+    months = (yyyymm // 100 - 1970) * 12 + yyyymm % 100 - 1
+    return pa.array(
+        months.astype("datetime64[M]").astype("datetime64[ns]"),
+        mask=column.is_null().to_numpy(),
+    )
+
+
+def to_dataframe(table: pa.Table, schema: dict[str, str]) -> pd.DataFrame:
+    """Hand a typed Arrow table to pandas, converting "month" columns.
+
+    Numeric columns without nulls are not copied; Arrow releases each
+    column's buffers as soon as pandas owns them.
+    """
+    for name, column_type in schema.items():
+        if column_type == "month" and name in table.column_names:
+            index = table.column_names.index(name)
+            table = table.set_column(index, name, _month_starts(table.column(name)))
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def read_typed(conn, sql: str, params, schema: dict[str, str]) -> pd.DataFrame:
+    """Run `sql` on a DB-API connection and return its rows with the declared types.
+
+    With `COLUMNAR_RESULTS` off the rows are read by `pandas.read_sql_query`
+    and converted afterwards, producing the same dtypes.
+    """
+    if not COLUMNAR_RESULTS:
+        df = pd.read_sql_query(sql, conn, params=params)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        return to_dataframe(table.cast(arrow_schema(list(df.columns), schema)), schema)
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params or ())
+        names = [column[0] for column in cursor.description]
+        table = fetch_table(cursor, schema, names)
+    finally:
+        cursor.close()
+    return to_dataframe(table, schema)
@@ -0,0 +1,220 @@
+import contextlib
+import math
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+
+def _is_closed(conn) -> bool:
+    """Return whether `conn` reports itself closed (drivers without `is_closed` never do)."""
+    is_closed = getattr(conn, "is_closed", None)
+    return bool(is_closed()) if callable(is_closed) else False
+
+
+def _ping(conn):
+    """Run a trivial query on `conn`, raising if the connection is unusable."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of DB-API connections.
+
+    At most `max_size` connections are open at once. `connection()` lends one,
+    waiting up to `timeout` seconds while all are in use, and takes it back
+    afterwards. Each borrowed connection is validated first: closed ones are
+    replaced, and ones idle for over `validate_after` seconds, or returned
+    after an error, must also answer a `SELECT 1`. Opening a connection is
+    retried `retries` times with exponential backoff. Connections opened
+    before a fork are forgotten (not closed) in the child, since their
+    sessions belong to the parent.
+
+    Args:
+        connect (Callable[[], Any]): Opens a new connection.
+        max_size (int): Maximum number of open connections.
+        timeout (float, optional): Seconds to wait for a free connection.
+        retries (int, optional): Retries after a failed connection attempt.
+        backoff (float, optional): Delay before the first retry in seconds,
+            doubled after each further failure up to `max_backoff`.
+        max_backoff (float, optional): Longest delay between attempts.
+        validate_after (float, optional): Idle seconds after which a connection
+            is pinged before being lent.
+        retry_on (tuple, optional): Exception types worth retrying a connection on.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        max_size: int,
+        timeout: float = 30.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        validate_after: float = 60.0,
+        retry_on: tuple = (Exception,),
+    ):
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.validate_after = validate_after
+        self.retry_on = retry_on
+        self._idle: list[tuple[Any, float]] = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self._pid = os.getpid()
+        self._borrows = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._connects = 0
+        self._connect_failures = 0
+        self._discarded = 0
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Lend a validated connection for the duration of the `with` block."""
+        conn = self.acquire()
+        healthy = False
+        try:
+            yield conn
+            healthy = True
+        finally:
+            self.release(conn, healthy=healthy)
+
+    def acquire(self):
+        """Borrow a validated connection; pair with `release`.
+
+        Raises:
+            TimeoutError: If no connection becomes free within `timeout` seconds.
+        """
+        started = time.monotonic()
+        conn, last_used = None, 0.0
+        with self._cond:
+            self._forget_after_fork()
+            while True:
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = started + self.timeout - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"No connection free within {self.timeout}s "
+                        f"({self.max_size} in use)"
+                    )
+                self._cond.wait(remaining)
+            waited = time.monotonic() - started
+            self._borrows += 1
+            self._wait_seconds += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+
+        # The slot is ours: validate the idle connection or open a new one
+        # without holding the lock.
+        if conn is not None:
+            if self._is_valid(conn, last_used):
+                return conn
+            with self._cond:
+                self._discarded += 1
+            with contextlib.suppress(Exception):
+                conn.close()
+        try:
+            return self._open()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn, healthy: bool = True):
+        """Return a borrowed connection; unhealthy ones are pinged before reuse."""
+        with self._cond:
+            if os.getpid() != self._pid:
+                return
+            if _is_closed(conn):
+                self._size -= 1
+                self._discarded += 1
+            else:
+                self._idle.append((conn, time.monotonic() if healthy else -math.inf))
+            self._cond.notify()
+
+    def close(self):
+        """Close the idle connections; borrowed ones are closed when returned later."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            with contextlib.suppress(Exception):
+                conn.close()
+
+    def stats(self) -> dict:
+        """Return the pool size and usage counters.
+
+        Returns:
+            dict: `size` (open connections), `in_use`, `idle`, `max_size`,
+                `borrows`, `avg_wait_ms` and `max_wait_ms` (time waiting for a
+                free connection), `connects`, `connect_failures` and
+                `discarded` (connections found closed or failing validation).
+        """
+        with self._cond:
+            return {
+                "size": self._size,
+                "in_use": self._size - len(self._idle),
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "borrows": self._borrows,
+                "avg_wait_ms": 1000 * self._wait_seconds / max(self._borrows, 1),
+                "max_wait_ms": 1000 * self._max_wait_seconds,
+                "connects": self._connects,
+                "connect_failures": self._connect_failures,
+                "discarded": self._discarded,
+            }
+
+    def _is_valid(self, conn, last_used: float) -> bool:
+        if _is_closed(conn):
+            return False
+        if time.monotonic() - last_used < self.validate_after:
+            return True
+        try:
+            _ping(conn)
+            return True
+        except Exception:
+            return False
+
+    def _open(self):
+        """Open a connection, retrying failures with exponential backoff and jitter."""
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                conn = self._connect()
+            except self.retry_on as e:
+                with self._cond:
+                    self._connect_failures += 1
+                if attempt == self.retries:
+                    raise
+                print(
+                    f"❌ Connection attempt {attempt + 1} failed ({e}), "
+                    f"retrying in {delay:.1f}s"
+                )
+                time.sleep(delay * random.uniform(0.5, 1.0))
+                delay = min(delay * 2, self.max_backoff)
+            else:
+                with self._cond:
+                    self._connects += 1
+                return conn
+
+    def _forget_after_fork(self):
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._idle = []
+            self._size = 0
@@ -1,23 +1,142 @@
+import hashlib
 import os
+import re
+import shutil
 import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
 from typing import Optional
 
 import pandas as pd
-import snowflake.connector
 from dotenv import load_dotenv
-from flask import abort
 
-from services.queries import sqlite_path, table_list
+from services.admission import (
+    AdmissionControl,
+    QueryCancelled,
+    QueryTimeout,
+    current_scope,
+)
+from services.artifact import read_only_uri, verify
+from services.columnar import read_typed
+from services.connection_pool import ConnectionPool
+from services.dimensions import read_dimension_keys
+from services.encounters import ENCOUNTERS_TABLE, build_encounters, exact_filters
+from services.member_paid import (
+    MEMBER_PAID_INDEX,
+    MEMBER_PAID_TABLE,
+    build_member_paid,
+)
+from services.parallel import chunk_pool
+from services.partitions import (
+    PARTITIONED_TABLES,
+    WINDOW_PARAMS,
+    empty_partition_name,
+    guarded_source,
+    overlapping,
+    partition_end,
+    partition_name,
+    partition_starts,
+    split_partitions,
+)
+from services.queries import PUSHDOWN_TABLES, sqlite_path, table_list
+from services.result_cache import ResultCache, result_cache
+from services.sampling import SAMPLE_INDEX, SAMPLE_TABLE, build_sample
+from services.settings import (
+    CLUSTERED_LAYOUT,
+    COLUMNAR_SNAPSHOT,
+    DISTINCT_MODE,
+    ENCOUNTER_GRAIN,
+    EXPENSIVE_QUERY_ROWS,
+    HLL_RELATIVE_ERROR,
+    MAX_CHEAP_QUERIES,
+    MAX_EXPENSIVE_QUERIES,
+    MAX_QUEUED_QUERIES,
+    PARTITION_GRAIN,
+    PROGRESSIVE_MIN_STRATUM_MEMBERS,
+    PROGRESSIVE_RESULTS,
+    PROGRESSIVE_SAMPLE_RATE,
+    QUERY_BACKEND,
+    QUERY_TIMEOUT,
+    SQLITE_IN_MEMORY,
+    WAREHOUSE_CONNECT_RETRIES,
+    WAREHOUSE_MAX_CONNECTIONS,
+    WAREHOUSE_POOL_TIMEOUT,
+    WAREHOUSE_STANDIN_PATH,
+    WAREHOUSE_VALIDATE_AFTER,
+)
+from services.sketches import (
+    build_quantile_sketches,
+    build_sketches,
+    precision_for_error,
+)
+from services.snapshot import (
+    SNAPSHOT_COLUMNS,
+    ColumnarSnapshot,
+    open_snapshot,
+    snapshot_path,
+    write_snapshot,
+)
+from services.warehouse import WarehouseExecutor, referenced_tables
+
+_ENV_FILE = Path(__file__).resolve().parent.parent / ".env"
+_CSV_FOLDER = Path(__file__).resolve().parent.parent / "csv_sample"
+
+_NOT_READ = object()
+
+# Tables derived from FACT_CLAIMS at load time, partitioned like it, and their
+# builders; a builder returns None when the claims do not fit its grain.
+CLAIMS_DERIVED_TABLES = {
+    ENCOUNTERS_TABLE: build_encounters,
+    MEMBER_PAID_TABLE: build_member_paid,
+    SAMPLE_TABLE: build_sample,
+}
+
+# Settings the stored tables are derived with: they are part of the data
+# version, so results cached from tables derived otherwise are not served.
+DERIVED_TABLE_SETTINGS = {
+    "DISTINCT_MODE": DISTINCT_MODE,
+    "ENCOUNTER_GRAIN": ENCOUNTER_GRAIN,
+    "HLL_RELATIVE_ERROR": HLL_RELATIVE_ERROR,
+    "PROGRESSIVE_MIN_STRATUM_MEMBERS": PROGRESSIVE_MIN_STRATUM_MEMBERS,
+    "PROGRESSIVE_RESULTS": PROGRESSIVE_RESULTS,
+    "PROGRESSIVE_SAMPLE_RATE": PROGRESSIVE_SAMPLE_RATE,
+    "QUERY_BACKEND": QUERY_BACKEND,
+}
+
+# Groups of the FACT_CLAIMS sketches (see `SQLiteManager._build_sketches`).
+CLAIM_SKETCH_KEYS = [
+    "YEAR_MONTH",
+    "ENCOUNTER_GROUP_SK",
+    "ENCOUNTER_TYPE_SK",
+    "CCSR_CATEGORY_DESCRIPTION",
+]
+
+# Columns indexed in every partition of a table.
+TABLE_INDEXES = {MEMBER_PAID_TABLE: MEMBER_PAID_INDEX, SAMPLE_TABLE: SAMPLE_INDEX}
+
+# Fact tables written physically sorted by, and indexed on, these columns with
+# `CLUSTERED_LAYOUT`, so a YEAR_MONTH window reads adjacent pages.
+CLUSTER_KEYS = {
+    "FACT_CLAIMS": ("YEAR_MONTH", "ENCOUNTER_GROUP_SK"),
+    "FACT_MEMBER_MONTHS": ("YEAR_MONTH", "PERSON_ID"),
+}
 
 
 class SnowflakeManager:
-    """Manages connection to Snowflake."""
+    """Manages a pool of connections to Snowflake.
 
-    _connection: Optional[snowflake.connector.connection.SnowflakeConnection] = None
+    Args:
+        connector (module, optional): DB-API module providing `connect()` and
+            `Error`. Defaults to `snowflake.connector`, imported on first
+            connection so the CSV path never loads it; a fake module can be
+            passed to exercise the pool without a Snowflake account.
+    """
 
-    def __init__(self):
+    def __init__(self, connector=None):
         load_dotenv()
+        self._connector = connector
         self.config = {
             "user": os.getenv("SNOWFLAKE_USER"),
             "password": os.getenv("SNOWFLAKE_PASSWORD"),
@@ -27,65 +146,635 @@ class SnowflakeManager:
             "schema": os.getenv("SNOWFLAKE_SCHEMA"),
             "auth_method": os.getenv("SNOWFLAKE_AUTH_METHOD"),
         }
+        self.pool = ConnectionPool(
+            self.connect,
+            WAREHOUSE_MAX_CONNECTIONS,
+            timeout=WAREHOUSE_POOL_TIMEOUT,
+            retries=WAREHOUSE_CONNECT_RETRIES,
+            validate_after=WAREHOUSE_VALIDATE_AFTER,
+        )
 
-    def get_connection(self):
-        """Return a singleton Snowflake connection."""
-        if SnowflakeManager._connection is None:
-            try:
-                connect_args = {
-                    "user": self.config["user"],
-                    "account": self.config["account"],
-                    "warehouse": self.config["warehouse"],
-                    "database": self.config["database"],
-                    "schema": self.config["schema"],
-                    "autocommit": True,
-                    "client_session_keep_alive": True,
-                }
+    def _connect_args(self) -> dict:
+        connect_args = {
+            "user": self.config["user"],
+            "account": self.config["account"],
+            "warehouse": self.config["warehouse"],
+            "database": self.config["database"],
+            "schema": self.config["schema"],
+            "autocommit": True,
+            "client_session_keep_alive": True,
+        }
 
-                if self.config.get("auth_method", "").lower() == "externalbrowser":
-                    connect_args["authenticator"] = "externalbrowser"
-                else:
-                    connect_args["password"] = self.config["password"]
+        if self.config.get("auth_method", "").lower() == "externalbrowser":
+            connect_args["authenticator"] = "externalbrowser"
+        else:
+            connect_args["password"] = self.config["password"]
+        return connect_args
 
-                SnowflakeManager._connection = snowflake.connector.connect(
-                    **connect_args
-                )
-                print("Snowflake connection established successfully")
+    @property
+    def connector(self):
+        if self._connector is None:
+            import snowflake.connector
 
-            except snowflake.connector.Error as e:
-                print(f"❌ Error connecting to Snowflake: {e}")
-                abort(500, description="Error connecting to Snowflake")
+            self._connector = snowflake.connector
+        return self._connector
 
-        return SnowflakeManager._connection
+    def connect(self):
+        """Open a new Snowflake connection owned by the caller."""
+        try:
+            conn = self.connector.connect(**self._connect_args())
+        except self.connector.Error as e:
+            print(f"❌ Error connecting to Snowflake: {e}")
+            raise
+        print("Snowflake connection established successfully")
+        return conn
+
+    def connection(self):
+        """Borrow a pooled connection for a `with` block."""
+        return self.pool.connection()
 
     def close(self):
-        """Close the Snowflake connection if open."""
-        if SnowflakeManager._connection:
-            SnowflakeManager._connection.close()
-            SnowflakeManager._connection = None
-            print("Snowflake connection closed")
+        """Close the idle pooled connections."""
+        self.pool.close()
+        print(f"Snowflake connections closed (pool stats: {self.pool.stats()})")
+
+
+def _claim_sketches(claims: pd.DataFrame) -> pd.DataFrame:
+    """Sum paid amounts and sketch ENCOUNTER_IDs per `CLAIM_SKETCH_KEYS` group."""
+    paid = (
+        claims.groupby(CLAIM_SKETCH_KEYS, dropna=False)["PAID_AMOUNT"]
+        .sum(min_count=1)
+        .reset_index()
+    )
+    precision = precision_for_error(HLL_RELATIVE_ERROR)
+    return paid.merge(
+        build_sketches(claims, CLAIM_SKETCH_KEYS, "ENCOUNTER_ID", precision),
+        on=CLAIM_SKETCH_KEYS,
+        how="left",
+    ).rename(columns={"SKETCH": "ENCOUNTER_SKETCH"})
+
+
+def _member_counts(members: pd.DataFrame) -> pd.DataFrame:
+    """Count distinct PERSON_IDs per YEAR_MONTH.
+
+    Member months add up across months, so exact counts are as cheap to
+    combine as sketches.
+    """
+    return (
+        members.groupby("YEAR_MONTH", dropna=False)["PERSON_ID"]
+        .nunique()
+        .reset_index(name="MEMBERS_COUNT")
+    )
+
+
+def _risk_sketches(members: pd.DataFrame) -> pd.DataFrame:
+    """Count and sketch non-null NORMALIZED_RISK_SCOREs per YEAR_MONTH."""
+    return build_quantile_sketches(
+        members, ["YEAR_MONTH"], "NORMALIZED_RISK_SCORE"
+    ).rename(columns={"COUNT": "RISK_COUNT", "SKETCH": "RISK_SKETCH"})
+
+
+# Per-month sketch and count tables summarizing each partitioned table, and
+# their builders; the rows of a partition's months are rebuilt when it changes.
+SKETCH_TABLES = {
+    "FACT_CLAIMS": {"FACT_CLAIMS_SKETCH": _claim_sketches},
+    "FACT_MEMBER_MONTHS": {
+        "FACT_MEMBER_MONTHS_COUNTS": _member_counts,
+        "FACT_MEMBER_MONTHS_RISK_SKETCH": _risk_sketches,
+    },
+}
 
 
 class SQLiteManager:
-    """Handles SQLite queries and initialization from CSV or Snowflake."""
+    """Handles SQLite queries and initialization from CSV or Snowflake.
+
+    Queries run under the deadlines and per-lane concurrency limits of
+    `admission` (see `services.admission`).
+    """
 
     def __init__(self, db_path: str = sqlite_path):
         self.db_path = db_path
+        self.read_only = False
+        self._data_version: Optional[str] = None
+        self._table_hashes: dict[str, str] = {}
+        self._memory_conn: Optional[sqlite3.Connection] = None
+        self._memory_lock = threading.Lock()
+        self._local = threading.local()
+        self._partitions: Optional[dict[str, pd.DataFrame]] = None
+        self._encounter_filters = _NOT_READ
+        self._tables = None
+        self._dimension_keys: dict[str, dict[str, tuple]] = {}
+        self._table_rows: Optional[dict[str, int]] = None
+        self.snapshot: Optional[ColumnarSnapshot] = None
+        self.admission = AdmissionControl(
+            {"cheap": MAX_CHEAP_QUERIES, "expensive": MAX_EXPENSIVE_QUERIES},
+            MAX_QUEUED_QUERIES,
+        )
 
-    def query(self, sql_query: str, params: tuple | list = None) -> pd.DataFrame:
-        """Run a SQL query against the SQLite database."""
-        conn = sqlite3.connect(self.db_path)
-        try:
+    @property
+    def data_version(self) -> Optional[str]:
+        """Content fingerprint of the loaded data, as written by `initialize`."""
+        if self._data_version is None:
+            conn = self._open()
+            try:
+                row = conn.execute("SELECT VERSION FROM DATA_VERSION").fetchone()
+                self._data_version = row[0] if row else None
+            except sqlite3.OperationalError:
+                pass
+            finally:
+                conn.close()
+        return self._data_version
+
+    def query(
+        self,
+        sql_query: str,
+        params: tuple | list | dict = None,
+        name: str = "query",
+        schema: Optional[dict[str, str]] = None,
+    ) -> pd.DataFrame:
+        """Run a SQL query against the SQLite database.
+
+        Results are served from the shared on-disk result cache when the same
+        query already ran against the same data version, in any worker.
+        Otherwise the query waits for a slot of its lane ("expensive" when it
+        reads more than `EXPENSIVE_QUERY_ROWS` rows) and is interrupted
+        `QUERY_TIMEOUT` seconds after being issued, or when the callback
+        request issuing it is superseded.
+
+        Args:
+            sql_query (str): SQL text.
+            params (tuple | list | dict, optional): Bound positional or named parameters.
+            name (str, optional): Data function name for cache hit-rate stats.
+            schema (dict[str, str], optional): Declared result column types, see
+                `services.columnar`. Without one, pandas infers the dtypes.
+
+        Raises:
+            services.admission.QueryRejected: If no slot was free in time.
+            services.admission.QueryTimeout: If the query ran past its deadline.
+            services.admission.QueryCancelled: If its request was superseded.
+        """
+        data_version = self.data_version
+        use_cache = result_cache.enabled and data_version is not None
+        if use_cache:
+            key = ResultCache.make_key(sql_query, params, data_version)
+            cached = result_cache.get(key, name)
+            if cached is not None:
+                return cached
+
+        scope = current_scope()
+        deadline = time.monotonic() + QUERY_TIMEOUT if QUERY_TIMEOUT > 0 else None
+        lane = self._lane(sql_query, params)
+        with self.admission.admit(lane, deadline, scope):
+            if self._memory_conn is not None:
+                conn = self._memory_conn
+                with self._memory_lock:
+                    with self.admission.interruptible(conn, lane, deadline, scope):
+                        result = self._read(conn, sql_query, params, schema)
+            else:
+                conn = self._connection()
+                with self.admission.interruptible(conn, lane, deadline, scope):
+                    result = self._read(conn, sql_query, params, schema)
+
+        if use_cache:
+            result_cache.set(key, data_version, result)
+        return result
+
+    def query_chunks(
+        self,
+        statements: list[tuple[str, dict]],
+        name: str = "query",
+        schema: Optional[dict[str, str]] = None,
+    ) -> list[pd.DataFrame]:
+        """Run the partial aggregates of a map-reduce query on `chunk_pool`.
+
+        Each statement's result is served from the result cache like `query`'s;
+        the others run in parallel in the pool's worker processes, together
+        holding one "expensive" slot, until `QUERY_TIMEOUT` seconds after
+        being issued or until the issuing request is superseded.
+
+        Args:
+            statements (list[tuple[str, dict]]): SQL text and bound parameters
+                of each chunk's partial aggregate.
+            name (str, optional): Data function name for cache hit-rate stats.
+            schema (dict[str, str], optional): Declared result column types.
+
+        Returns:
+            list[pandas.DataFrame]: The result of each statement, in order.
+
+        Raises:
+            services.admission.QueryRejected: If no slot was free in time.
+            services.admission.QueryTimeout: If a chunk ran past the deadline.
+            services.admission.QueryCancelled: If its request was superseded.
+        """
+        data_version = self.data_version
+        use_cache = result_cache.enabled and data_version is not None
+        results: list[Optional[pd.DataFrame]] = [None] * len(statements)
+        keys = [
+            ResultCache.make_key(sql, params, data_version)
+            for sql, params in statements
+        ]
+        if use_cache:
+            results = [result_cache.get(key, name) for key in keys]
+        missing = [index for index, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+
+        scope = current_scope()
+        timeout = QUERY_TIMEOUT if QUERY_TIMEOUT > 0 else None
+        deadline = time.monotonic() + timeout if timeout else None
+        with self.admission.admit("expensive", deadline, scope):
+            futures = {
+                index: chunk_pool.submit(
+                    self._uri(),
+                    *statements[index],
+                    schema,
+                    time.time() + timeout if timeout else None,
+                )
+                for index in missing
+            }
+            pending = set(futures.values())
+            try:
+                while pending:
+                    done, pending = wait(pending, 0.05, FIRST_EXCEPTION)
+                    for future in done:
+                        error = future.exception()
+                        if error is None:
+                            continue
+                        if isinstance(error, sqlite3.OperationalError) and (
+                            deadline is not None and time.monotonic() > deadline
+                        ):
+                            raise QueryTimeout("Query interrupted at its deadline")
+                        raise error
+                    if scope is not None and scope.cancelled.is_set():
+                        raise QueryCancelled("Superseded while running")
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        for index, future in futures.items():
+            results[index] = future.result()
+            if use_cache:
+                result_cache.set(keys[index], data_version, results[index])
+        return results
+
+    @staticmethod
+    def _read(conn: sqlite3.Connection, sql_query: str, params, schema):
+        if schema is None:
             return pd.read_sql_query(sql_query, conn, params=params)
-        finally:
-            conn.close()
+        return read_typed(conn, sql_query, params, schema)
+
+    def _lane(self, sql_query: str, params=None) -> str:
+        """Return the admission lane of a query from the rows of the tables it reads.
+
+        Partitions outside the YEAR_MONTH window bound in `params` are
+        skipped by the query (see `route`), so their rows do not count.
+        """
+        table_rows = self.table_rows()
+        skipped = self._partitions_outside(params)
+        rows = sum(
+            table_rows.get(name, 0)
+            for name in referenced_tables(sql_query)
+            if name not in skipped
+        )
+        return "expensive" if rows > EXPENSIVE_QUERY_ROWS else "cheap"
+
+    def _partitions_outside(self, params) -> set[str]:
+        """Return the dated partitions outside the window of `WINDOW_PARAMS` in `params`."""
+        if not isinstance(params, dict) or not all(
+            name in params for name in WINDOW_PARAMS
+        ):
+            return set()
+        start_yyyymm, end_yyyymm = (params[name] for name in WINDOW_PARAMS)
+        outside = set()
+        for partitions in self.partitions().values():
+            dated = partitions.loc[partitions["START_YYYYMM"].notna(), "PARTITION_NAME"]
+            inside = overlapping(partitions, start_yyyymm, end_yyyymm)
+            outside.update(set(dated) - set(inside))
+        return outside
+
+    def _open(self) -> sqlite3.Connection:
+        """Open a connection to the database file, read-only when serving an artifact."""
+        if self.read_only:
+            return sqlite3.connect(read_only_uri(self.db_path), uri=True)
+        return sqlite3.connect(self.db_path)
+
+    def _uri(self) -> str:
+        """Return the URI opening the database file read-only from another process."""
+        if self.read_only:
+            return read_only_uri(self.db_path)
+        return Path(self.db_path).resolve().as_uri() + "?mode=ro"
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's read-only connection to the database file.
+
+        Connections stay open so their statement cache keeps compiled queries
+        between calls. A forked worker opens its own instead of using the one
+        inherited from the parent.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._open()
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def partitions(self) -> dict[str, pd.DataFrame]:
+        """Return the loaded partitions of each partitioned fact table.
+
+        Returns:
+            dict[str, pandas.DataFrame]: Rows of the PARTITIONS table
+                (PARTITION_NAME, START_YYYYMM, END_YYYYMM, ROW_COUNT) by table.
+        """
+        if self._partitions is None:
+            conn = self._open()
+            try:
+                rows = pd.read_sql_query(
+                    "SELECT * FROM PARTITIONS ORDER BY TABLE_NAME, START_YYYYMM", conn
+                )
+            except pd.errors.DatabaseError:
+                rows = pd.DataFrame(columns=["TABLE_NAME"])
+            finally:
+                conn.close()
+            self._partitions = {
+                table_name: part.reset_index(drop=True)
+                for table_name, part in rows.groupby("TABLE_NAME")
+            }
+        return self._partitions
+
+    def tables(self) -> frozenset:
+        """Return the names of the tables and views in the database."""
+        if self._tables is None:
+            conn = self._open()
+            try:
+                self._tables = frozenset(
+                    name
+                    for (name,) in conn.execute(
+                        "SELECT name FROM sqlite_master WHERE type IN ('table', 'view')"
+                    )
+                )
+            finally:
+                conn.close()
+        return self._tables
+
+    def table_rows(self) -> dict[str, int]:
+        """Return the number of rows of each table, by upper-cased name.
+
+        Tables are counted by their largest rowid, which is exact for tables
+        written once. Partitioned tables count the rows of their partitions.
+        """
+        if self._table_rows is None:
+            conn = self._open()
+            try:
+                names = conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                ).fetchall()
+                table_rows = {
+                    name.upper(): conn.execute(
+                        f'SELECT MAX(_ROWID_) FROM "{name}"'
+                    ).fetchone()[0]
+                    or 0
+                    for (name,) in names
+                }
+            finally:
+                conn.close()
+            for table_name, partitions in self.partitions().items():
+                table_rows[table_name.upper()] = int(partitions["ROW_COUNT"].sum())
+            self._table_rows = table_rows
+        return self._table_rows
+
+    def window_rows(self, table_name: str, start_yyyymm: int, end_yyyymm: int) -> int:
+        """Return the rows of the partitions of `table_name` overlapping a period.
+
+        Unpartitioned tables count all their rows.
+        """
+        partitions = self.partitions().get(table_name)
+        if partitions is None:
+            return self.table_rows().get(table_name.upper(), 0)
+        names = overlapping(partitions, start_yyyymm, end_yyyymm)
+        rows = partitions.loc[partitions["PARTITION_NAME"].isin(names), "ROW_COUNT"]
+        return int(rows.sum())
+
+    def encounter_filters(self) -> Optional[frozenset]:
+        """Return the filter columns answered exactly by `FACT_ENCOUNTERS`.
+
+        Returns:
+            frozenset | None: Filter column names (see
+                `services.encounters.exact_filters`), or None when the
+                encounter-grain table is not loaded.
+        """
+        if self._encounter_filters is _NOT_READ:
+            conn = self._open()
+            try:
+                (max_ccsr_categories,) = conn.execute(
+                    f"SELECT MAX(CCSR_CATEGORY_COUNT) FROM {ENCOUNTERS_TABLE}"
+                ).fetchone()
+                self._encounter_filters = exact_filters(max_ccsr_categories)
+            except sqlite3.OperationalError:
+                self._encounter_filters = None
+            finally:
+                conn.close()
+        return self._encounter_filters
+
+    def dimension_keys(self, column: str) -> dict[str, tuple]:
+        """Return the surrogate keys of each label of dimension column `column`.
+
+        Lookups are read once per loaded data (see
+        `services.dimensions.read_dimension_keys`); a missing dimension table
+        has no labels.
+        """
+        if column not in self._dimension_keys:
+            conn = self._open()
+            try:
+                self._dimension_keys[column] = read_dimension_keys(conn, column)
+            except sqlite3.OperationalError:
+                self._dimension_keys[column] = {}
+            finally:
+                conn.close()
+        return self._dimension_keys[column]
+
+    def route(self, table_name: str, windowed: bool = False) -> str:
+        """Return the FROM source for the rows of `table_name`.
+
+        Partitioned tables read in a YEAR_MONTH window are pruned to the
+        partitions overlapping the window bound as the `WINDOW_PARAMS` of the
+        query (see `services.partitions.guarded_source`); without a window,
+        or for other tables, the table itself.
+
+        Args:
+            table_name (str): Table queried.
+            windowed (bool, optional): Whether the query binds a YEAR_MONTH
+                window and only reads rows inside it.
+        """
+        partitions = self.partitions().get(table_name)
+        if partitions is None or not windowed:
+            return table_name
+        return guarded_source(table_name, partitions)
+
+    def _drop_partitions(self, conn: sqlite3.Connection, table_name: str):
+        """Drop a partitioned table's view, partitions and their metadata."""
+        # DROP VIEW fails on a table of the same name (a table stored unpartitioned).
+        if conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = ?",
+            (table_name,),
+        ).fetchone():
+            conn.execute(f"DROP VIEW {table_name}")
+        tables = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ?",
+            (f"{table_name}_P*",),
+        ).fetchall()
+        for (name,) in tables:
+            conn.execute(f"DROP TABLE {name}")
+        conn.execute("DELETE FROM PARTITIONS WHERE TABLE_NAME = ?", (table_name,))
+
+    def _write_partition(
+        self,
+        conn: sqlite3.Connection,
+        table_name: str,
+        name: str,
+        bounds: tuple[Optional[int], Optional[int]],
+        rows: pd.DataFrame,
+    ):
+        conn.execute(f"DROP TABLE IF EXISTS {name}")
+        conn.execute("DELETE FROM PARTITIONS WHERE PARTITION_NAME = ?", (name,))
+        self._write_rows(conn, table_name, name, rows)
+        conn.execute(
+            "INSERT INTO PARTITIONS VALUES (?, ?, ?, ?, ?)",
+            (table_name, name, *bounds, len(rows)),
+        )
+
+    def _write_rows(
+        self, conn: sqlite3.Connection, table_name: str, name: str, rows: pd.DataFrame
+    ):
+        """Write rows of `table_name` as table `name`, replacing it, with its indexes.
+
+        With `CLUSTERED_LAYOUT`, tables in `CLUSTER_KEYS` are inserted sorted by
+        their key, so rows of one month sit in adjacent pages, and the key is
+        indexed to range-scan them.
+        """
+        cluster_key = CLUSTER_KEYS.get(table_name) if CLUSTERED_LAYOUT else None
+        if cluster_key:
+            rows = rows.sort_values(list(cluster_key), kind="stable")
+        rows.to_sql(name, conn, if_exists="replace", index=False)
+        for suffix, columns in (
+            ("IDX", TABLE_INDEXES.get(table_name)),
+            ("CLUSTER", cluster_key),
+        ):
+            if columns:
+                conn.execute(
+                    f"CREATE INDEX {name}_{suffix} ON {name} ({', '.join(columns)})"
+                )
+
+    def _create_partition_view(self, conn: sqlite3.Connection, table_name: str):
+        """(Re)create the view reading every loaded partition of `table_name`."""
+        names = [
+            name
+            for (name,) in conn.execute(
+                """
+                SELECT PARTITION_NAME FROM PARTITIONS
+                WHERE TABLE_NAME = ?
+                ORDER BY START_YYYYMM IS NULL, START_YYYYMM
+                """,
+                (table_name,),
+            )
+        ] or [empty_partition_name(table_name)]
+        conn.execute(f"DROP VIEW IF EXISTS {table_name}")
+        conn.execute(
+            f"CREATE VIEW {table_name} AS "
+            + " UNION ALL ".join(f"SELECT * FROM {name}" for name in names)
+        )
+
+    def _store_partitions(
+        self, conn: sqlite3.Connection, table_name: str, df: pd.DataFrame
+    ):
+        """Write a fact table as one table per YEAR_MONTH partition behind a view."""
+        conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+        df.head(0).to_sql(empty_partition_name(table_name), conn, index=False)
+        partitions = split_partitions(df, table_name, PARTITION_GRAIN)
+        for name, start, end, rows in partitions:
+            self._write_partition(conn, table_name, name, (start, end), rows)
+        self._create_partition_view(conn, table_name)
+        conn.commit()
+        print(f"{table_name} split into {len(partitions)} {PARTITION_GRAIN} partitions")
+
+    def _store_table(self, conn: sqlite3.Connection, table_name: str, df: pd.DataFrame):
+        """Write a loaded table to SQLite and record its content hash.
+
+        Tables in `PARTITIONED_TABLES` are stored as partitions unless
+        `PARTITION_GRAIN` is "none".
+        """
+        self._create_partitions_table(conn)
+        self._drop_partitions(conn, table_name)
+        if table_name in PARTITIONED_TABLES and PARTITION_GRAIN != "none":
+            self._store_partitions(conn, table_name, df)
+        else:
+            self._write_rows(conn, table_name, table_name, df)
+        self._table_hashes[table_name] = hashlib.sha1(
+            pd.util.hash_pandas_object(df, index=False).values.tobytes()
+        ).hexdigest()
+
+    def _create_partitions_table(self, conn: sqlite3.Connection):
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS PARTITIONS (
+                TABLE_NAME TEXT NOT NULL,
+                PARTITION_NAME TEXT PRIMARY KEY,
+                START_YYYYMM INTEGER,
+                END_YYYYMM INTEGER,
+                ROW_COUNT INTEGER NOT NULL
+            )
+            """
+        )
+
+    def _write_data_version(self, conn: sqlite3.Connection):
+        """Store a fingerprint of the loaded tables and derived-table settings."""
+        digest = hashlib.sha1()
+        for table_name, table_hash in sorted(self._table_hashes.items()):
+            digest.update(f"{table_name}:{table_hash};".encode())
+        for name, value in sorted(DERIVED_TABLE_SETTINGS.items()):
+            digest.update(f"{name}={value};".encode())
+        self._data_version = digest.hexdigest()
+        self._save_data_version(conn)
+
+    def _bump_data_version(self, conn: sqlite3.Connection, change: str):
+        """Derive a new data version after changing the loaded data in place."""
+        self._data_version = hashlib.sha1(
+            f"{self.data_version}:{change}".encode()
+        ).hexdigest()
+        self._save_data_version(conn)
+
+    def _save_data_version(self, conn: sqlite3.Connection):
+        pd.DataFrame({"VERSION": [self._data_version]}).to_sql(
+            "DATA_VERSION", conn, if_exists="replace", index=False
+        )
+        if result_cache.enabled:
+            result_cache.purge(self._data_version)
+
+    def _tables_to_load(self) -> list[dict]:
+        """Return the `table_list` entries copied into SQLite.
+
+        In pushdown mode the `PUSHDOWN_TABLES` stay in the warehouse, whole,
+        instead of being copied (and truncated by the `LIMIT` of their query).
+        """
+        if QUERY_BACKEND == "snowflake":
+            return [
+                info for info in table_list if info["table_name"] not in PUSHDOWN_TABLES
+            ]
+        return table_list
+
+    def _drop_table(self, conn: sqlite3.Connection, table_name: str):
+        """Drop a table, or a partitioned table's view and partitions, if loaded."""
+        self._create_partitions_table(conn)
+        self._drop_partitions(conn, table_name)
+        conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+        self._table_hashes.pop(table_name, None)
 
     def _load_from_csv(self, conn: sqlite3.Connection, csv_folder: str):
         """Load data from CSV files into SQLite."""
         print("Loading data from CSV files...")
         csv_path = Path(csv_folder)
 
-        for table_info in table_list:
+        for table_info in self._tables_to_load():
             table_name = table_info["table_name"]
             csv_file = csv_path / f"{table_name}.csv"
 
@@ -96,7 +785,7 @@ class SQLiteManager:
 
             try:
                 df = pd.read_csv(csv_file)
-                df.to_sql(table_name, conn, if_exists="replace", index=False)
+                self._store_table(conn, table_name, df)
                 print(f"{len(df)} records loaded into {table_name} from CSV")
             except Exception as e:
                 raise RuntimeError(f"❌ Error loading {table_name} from CSV: {e}")
@@ -104,49 +793,460 @@ class SQLiteManager:
     def _load_from_snowflake(
         self, conn: sqlite3.Connection, sf_manager: SnowflakeManager
     ):
-        """Load data from Snowflake into SQLite."""
-        sf_conn = sf_manager.get_connection()
+        """Load data from Snowflake into SQLite.
+
+        Tables are pulled in parallel, each on its own pooled connection, and
+        written to SQLite one at a time as they arrive.
+        """
+        try:
+            with ThreadPoolExecutor(max_workers=sf_manager.pool.max_size) as executor:
+                futures = {
+                    executor.submit(
+                        self._fetch_from_snowflake,
+                        sf_manager,
+                        table_info["table_name"],
+                        table_info["query"],
+                    ): table_info["table_name"]
+                    for table_info in self._tables_to_load()
+                }
+                for future in as_completed(futures):
+                    table_name = futures[future]
+                    try:
+                        df = future.result()
+                        self._store_table(conn, table_name, df)
+                        print(
+                            f"{len(df)} records loaded into {table_name} from Snowflake"
+                        )
+                    except Exception as e:
+                        print(f"❌ Error loading {table_name} from Snowflake: {e}")
+        finally:
+            sf_manager.close()
+
+    @staticmethod
+    def _fetch_from_snowflake(
+        sf_manager: SnowflakeManager, table_name: str, query: str
+    ) -> pd.DataFrame:
+        print(f"Loading {table_name} from Snowflake...")
+        with sf_manager.connection() as sf_conn:
+            cursor = sf_conn.cursor()
+            try:
+                cursor.execute(query)
+                return cursor.fetch_pandas_all()
+            finally:
+                cursor.close()
+
+    def _build_sketches(self, conn: sqlite3.Connection):
+        """Build the per-month summary tables of approximate distinct counts.
+
+        - `FACT_CLAIMS_SKETCH`: paid amount and an ENCOUNTER_ID HyperLogLog
+          sketch per (YEAR_MONTH, encounter group, encounter type, CCSR
+          category).
+        - `FACT_MEMBER_MONTHS_COUNTS`: the exact member count per YEAR_MONTH.
+        """
+        print(
+            "Building HLL sketches "
+            f"(precision {precision_for_error(HLL_RELATIVE_ERROR)})..."
+        )
+        claim_sketches = _claim_sketches(
+            pd.read_sql_query(
+                f"SELECT {', '.join(CLAIM_SKETCH_KEYS)}, ENCOUNTER_ID, PAID_AMOUNT "
+                "FROM FACT_CLAIMS",
+                conn,
+            )
+        )
+        claim_sketches.to_sql(
+            "FACT_CLAIMS_SKETCH", conn, if_exists="replace", index=False
+        )
+        member_counts = _member_counts(
+            pd.read_sql_query(
+                "SELECT YEAR_MONTH, PERSON_ID FROM FACT_MEMBER_MONTHS", conn
+            )
+        )
+        member_counts.to_sql(
+            "FACT_MEMBER_MONTHS_COUNTS", conn, if_exists="replace", index=False
+        )
+        print(
+            f"{len(claim_sketches)} claim sketches and "
+            f"{len(member_counts)} monthly member counts built"
+        )
+
+    def _build_derived(self, conn: sqlite3.Connection, table_name: str):
+        """Derive a `CLAIMS_DERIVED_TABLES` table from FACT_CLAIMS.
+
+        It is partitioned like the claims. A builder returning None (the
+        claims do not fit the table's grain) leaves no table, and queries keep
+        reading the claim lines.
+        """
+        self._drop_table(conn, table_name)
+        derived = CLAIMS_DERIVED_TABLES[table_name](
+            pd.read_sql_query("SELECT * FROM FACT_CLAIMS", conn)
+        )
+        if derived is None:
+            print(f"❌ {table_name} not built: the claim lines do not fit its grain")
+            return
+        if PARTITION_GRAIN != "none":
+            self._store_partitions(conn, table_name, derived)
+        else:
+            self._write_rows(conn, table_name, table_name, derived)
+        print(f"{len(derived)} rows derived into {table_name}")
+
+    def _update_derived_partitions(
+        self,
+        conn: sqlite3.Connection,
+        claims_partition: str,
+        bounds: tuple[Optional[int], Optional[int]],
+        claims: Optional[pd.DataFrame],
+    ):
+        """Rebuild (or, without `claims`, drop) the derived partitions of a claims partition."""
+        for table_name, build in CLAIMS_DERIVED_TABLES.items():
+            loaded = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = ?", (table_name,)
+            ).fetchone()
+            if not loaded:
+                continue
+            name = table_name + claims_partition[len("FACT_CLAIMS") :]
+            if claims is None:
+                conn.execute(f"DROP TABLE IF EXISTS {name}")
+                conn.execute("DELETE FROM PARTITIONS WHERE PARTITION_NAME = ?", (name,))
+            else:
+                derived = build(claims)
+                if derived is None:
+                    print(
+                        f"❌ {table_name} dropped: {claims_partition} does not fit it"
+                    )
+                    self._drop_table(conn, table_name)
+                    continue
+                self._write_partition(conn, table_name, name, bounds, derived)
+            self._create_partition_view(conn, table_name)
+
+    def _update_sketches(
+        self,
+        conn: sqlite3.Connection,
+        table_name: str,
+        bounds: tuple[Optional[int], Optional[int]],
+        rows: Optional[pd.DataFrame],
+    ):
+        """Rebuild (or, without `rows`, delete) the sketch rows of a partition's months."""
+        for sketch_table, build in SKETCH_TABLES.get(table_name, {}).items():
+            loaded = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = ?", (sketch_table,)
+            ).fetchone()
+            if not loaded:
+                continue
+            if bounds == (None, None):
+                conn.execute(f"DELETE FROM {sketch_table} WHERE YEAR_MONTH IS NULL")
+            else:
+                conn.execute(
+                    f"DELETE FROM {sketch_table} WHERE YEAR_MONTH BETWEEN ? AND ?",
+                    bounds,
+                )
+            if rows is not None and not rows.empty:
+                build(rows).to_sql(sketch_table, conn, if_exists="append", index=False)
+
+    def _compact(self, conn: sqlite3.Connection):
+        """Gather query planner statistics and rewrite the file in table order.
 
+        VACUUM drops the free pages left by replaced tables and stores each
+        table's pages contiguously, in the order its rows were inserted.
+        """
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+        conn.execute("VACUUM")
+        print(f"SQLite database analyzed and vacuumed: {self.db_path}")
+
+    def load_into_memory(self):
+        """Copy the database file into a read-only in-memory database used by `query`.
+
+        The copy lives in SQLite's own (non-Python) memory, so when it is made
+        before gunicorn forks its workers they share its pages copy-on-write
+        instead of each holding a private copy. Queries on the shared
+        connection are serialized per process.
+        """
+        memory_conn = sqlite3.connect(":memory:", check_same_thread=False)
+        disk_conn = self._open()
         try:
-            for table_info in table_list:
-                table_name = table_info["table_name"]
-                query = table_info["query"]
+            disk_conn.backup(memory_conn)
+        finally:
+            disk_conn.close()
+        memory_conn.execute("PRAGMA query_only = ON")
 
+        if self._memory_conn is not None:
+            self._memory_conn.close()
+        self._memory_conn = memory_conn
+        print(f"SQLite database copied into memory: {self.db_path}")
+
+    def _write_snapshot(self, conn: sqlite3.Connection):
+        """Write the columnar snapshot of the fact tables (see `services.snapshot`).
+
+        Without `COLUMNAR_SNAPSHOT`, or in pushdown mode, where the fact
+        tables are not stored locally, any previous snapshot is removed.
+        """
+        path = snapshot_path(self.db_path)
+        if not COLUMNAR_SNAPSHOT or QUERY_BACKEND == "snowflake":
+            shutil.rmtree(path, ignore_errors=True)
+            return
+        tables = {
+            table_name: pd.read_sql_query(
+                f"SELECT {', '.join(columns)} FROM {table_name}", conn
+            )
+            for table_name, columns in SNAPSHOT_COLUMNS.items()
+        }
+        manifest = write_snapshot(tables, path, self._data_version)
+        rows = ", ".join(
+            f"{info['rows']} {table_name} rows"
+            for table_name, info in manifest["tables"].items()
+        )
+        print(f"Columnar snapshot written to {path}: {rows}")
+
+    def _open_snapshot(self):
+        """Map the columnar snapshot of the current data version, if there is one."""
+        self.snapshot = (
+            open_snapshot(self.db_path, self.data_version)
+            if COLUMNAR_SNAPSHOT
+            else None
+        )
+
+    def _build_risk_sketches(self, conn: sqlite3.Connection):
+        """Build per-month KLL quantile sketches of member risk scores.
+
+        `FACT_MEMBER_MONTHS_RISK_SKETCH` holds the number of non-null
+        NORMALIZED_RISK_SCORE values and their sketch per YEAR_MONTH. In
+        pushdown mode the scores are read from the warehouse.
+        """
+        sql = "SELECT YEAR_MONTH, NORMALIZED_RISK_SCORE FROM FACT_MEMBER_MONTHS"
+        if QUERY_BACKEND == "snowflake":
+            members = warehouse.query(sql)
+        else:
+            members = pd.read_sql_query(sql, conn)
+        sketches = _risk_sketches(members)
+        sketches.to_sql(
+            "FACT_MEMBER_MONTHS_RISK_SKETCH", conn, if_exists="replace", index=False
+        )
+        print(f"{len(sketches)} risk score sketches built")
+
+    def _read_source_rows(
+        self, table_name: str, start_yyyymm: int, end_yyyymm: int
+    ) -> pd.DataFrame:
+        """Read the rows of `table_name` in a YEAR_MONTH range from the data source.
+
+        From Snowflake, the range is filtered in the table's query instead of
+        its `LIMIT`, which would otherwise keep arbitrary rows of the whole
+        table before the filter: a reloaded partition holds all its rows.
+        """
+        if _ENV_FILE.exists():
+            query = next(
+                info["query"] for info in table_list if info["table_name"] == table_name
+            )
+            query = re.sub(r"\s+LIMIT\s+\d+\s*$", "", query)
+            with snowflake_manager.connection() as sf_conn:
+                cursor = sf_conn.cursor()
                 try:
-                    print(f"Loading {table_name} from Snowflake...")
-                    cursor = sf_conn.cursor()
-                    cursor.execute(query)
-                    df = cursor.fetch_pandas_all()
-                    df.to_sql(table_name, conn, if_exists="replace", index=False)
-                    print(f"{len(df)} records loaded into {table_name} from Snowflake")
-                except Exception as e:
-                    print(f"❌ Error loading {table_name} from Snowflake: {e}")
+                    cursor.execute(
+                        f"{query} WHERE YEAR_MONTH BETWEEN %s AND %s",
+                        (start_yyyymm, end_yyyymm),
+                    )
+                    return cursor.fetch_pandas_all()
                 finally:
                     cursor.close()
+
+        df = pd.read_csv(_CSV_FOLDER / f"{table_name}.csv")
+        return df[df["YEAR_MONTH"].between(start_yyyymm, end_yyyymm)]
+
+    def _after_partition_change(self, conn: sqlite3.Connection, change: str):
+        self._bump_data_version(conn, change)
+        conn.commit()
+        self._write_snapshot(conn)
+        self._open_snapshot()
+        self._partitions = None
+        self._encounter_filters = _NOT_READ
+        self._tables = None
+        self._table_rows = None
+        if self._memory_conn is not None:
+            self.load_into_memory()
+
+    def load_partition(self, table_name: str, year_month: int):
+        """Load (or reload) the partition of `table_name` holding `year_month`.
+
+        Only that partition's rows are read from the data source, so old
+        partitions can be brought back without reloading the whole table.
+        The matching partitions of the `CLAIMS_DERIVED_TABLES`, and the
+        partition's months of the sketch tables, are rebuilt from the loaded
+        rows.
+        """
+        if (
+            table_name not in PARTITIONED_TABLES
+            or PARTITION_GRAIN == "none"
+            or QUERY_BACKEND == "snowflake"
+        ):
+            raise ValueError(f"{table_name} is not partitioned")
+        if self.read_only:
+            raise ValueError(f"{self.db_path} is a read-only artifact")
+        start = int(partition_starts(pd.Series([year_month]), PARTITION_GRAIN)[0])
+        end = partition_end(start, PARTITION_GRAIN)
+        name = partition_name(table_name, start, PARTITION_GRAIN)
+        rows = self._read_source_rows(table_name, start, end)
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self._write_partition(conn, table_name, name, (start, end), rows)
+            self._create_partition_view(conn, table_name)
+            if table_name == "FACT_CLAIMS":
+                self._update_derived_partitions(conn, name, (start, end), rows)
+            self._update_sketches(conn, table_name, (start, end), rows)
+            self._after_partition_change(conn, f"load:{name}:{len(rows)}")
         finally:
-            sf_manager.close()
+            conn.close()
+        print(f"{len(rows)} records loaded into partition {name}")
+
+    def evict_partition(self, partition: str):
+        """Drop a partition from the local database, e.g. to shed old years.
+
+        Queries stop seeing its rows until `load_partition` brings it back.
+        Evicting a FACT_CLAIMS partition also evicts its derived partitions,
+        and the sketch rows of its months are deleted.
+        """
+        if self.read_only:
+            raise ValueError(f"{self.db_path} is a read-only artifact")
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute(
+                "SELECT TABLE_NAME, START_YYYYMM, END_YYYYMM FROM PARTITIONS"
+                " WHERE PARTITION_NAME = ?",
+                (partition,),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Unknown partition {partition}")
+            table_name, bounds = row[0], (row[1], row[2])
+            conn.execute(f"DROP TABLE {partition}")
+            conn.execute(
+                "DELETE FROM PARTITIONS WHERE PARTITION_NAME = ?", (partition,)
+            )
+            self._create_partition_view(conn, table_name)
+            if table_name == "FACT_CLAIMS":
+                self._update_derived_partitions(conn, partition, bounds, None)
+            self._update_sketches(conn, table_name, bounds, None)
+            self._after_partition_change(conn, f"evict:{partition}")
+        finally:
+            conn.close()
+        print(f"Partition {partition} evicted")
 
     def initialize(self):
         """Initialize SQLite database.
 
         - If `.env` exists → load from Snowflake
         - Otherwise → load from CSV files.
+
+        In pushdown mode (`QUERY_BACKEND=snowflake`) only the dimensions and
+        the derived risk sketches are stored; the fact tables are queried in
+        the warehouse. Otherwise the `CLAIMS_DERIVED_TABLES` are derived from
+        the claims: `FACT_MEMBER_PAID` always, in exact mode the
+        encounter-grain `FACT_ENCOUNTERS` (see `ENCOUNTER_GRAIN`) and, with
+        `PROGRESSIVE_RESULTS`, the member sample `FACT_CLAIMS_SAMPLE`. With
+        `COLUMNAR_SNAPSHOT`, the fact columns are also written as a columnar
+        snapshot, mapped as `snapshot`.
         """
         conn = sqlite3.connect(self.db_path)
-        env_file = Path(__file__).resolve().parent.parent / ".env"
         try:
-            if env_file.exists():
+            if _ENV_FILE.exists():
                 print("Using Snowflake as data source...")
-                sf_manager = SnowflakeManager()
-                self._load_from_snowflake(conn, sf_manager)
+                self._load_from_snowflake(conn, snowflake_manager)
             else:
                 print("Using CSV as data source...")
-                csv_folder = Path(__file__).resolve().parent.parent / "csv_sample"
-                self._load_from_csv(conn, str(csv_folder))
+                self._load_from_csv(conn, str(_CSV_FOLDER))
+
+            if QUERY_BACKEND == "snowflake":
+                for table_name in PUSHDOWN_TABLES:
+                    self._drop_table(conn, table_name)
+            elif DISTINCT_MODE == "approximate":
+                self._build_sketches(conn)
+            if (
+                QUERY_BACKEND == "sqlite"
+                and DISTINCT_MODE == "exact"
+                and ENCOUNTER_GRAIN
+            ):
+                self._build_derived(conn, ENCOUNTERS_TABLE)
+            else:
+                self._drop_table(conn, ENCOUNTERS_TABLE)
+            if QUERY_BACKEND == "sqlite":
+                self._build_derived(conn, MEMBER_PAID_TABLE)
+            else:
+                self._drop_table(conn, MEMBER_PAID_TABLE)
+            if QUERY_BACKEND == "sqlite" and PROGRESSIVE_RESULTS:
+                self._build_derived(conn, SAMPLE_TABLE)
+            else:
+                self._drop_table(conn, SAMPLE_TABLE)
+            self._build_risk_sketches(conn)
+
+            self._write_data_version(conn)
+            if CLUSTERED_LAYOUT:
+                self._compact(conn)
+            self._write_snapshot(conn)
         finally:
             conn.close()
+        self._partitions = None
+        self._encounter_filters = _NOT_READ
+        self._tables = None
+        self._table_rows = None
+        self._dimension_keys = {}
+        self._open_snapshot()
 
         print(f"SQLite initialization complete: {self.db_path}")
 
+        if SQLITE_IN_MEMORY:
+            self.load_into_memory()
+
+    def open_artifact(self, path: str):
+        """Serve a database built offline by `python -m services.build`, read-only.
+
+        Nothing is loaded or derived: the artifact is verified (see
+        `services.artifact.verify`) and the query results it carries are
+        seeded into the result cache.
+        """
+        build_info = verify(path)
+        self.db_path = path
+        self.read_only = True
+        self._data_version = None
+        self._partitions = None
+        self._encounter_filters = _NOT_READ
+        self._tables = None
+        self._table_rows = None
+        self._dimension_keys = {}
+        self._open_snapshot()
+
+        if result_cache.enabled:
+            conn = self._open()
+            try:
+                seeded = result_cache.seed(conn)
+            finally:
+                conn.close()
+            result_cache.purge(self.data_version)
+            print(f"{seeded} warm query results seeded into the result cache")
+        print(
+            f"Serving artifact {path}: data version {self.data_version[:12]}, "
+            f"built {build_info['BUILT_AT']}"
+        )
+
+        if SQLITE_IN_MEMORY:
+            self.load_into_memory()
+
+
+def _open_warehouse() -> WarehouseExecutor:
+    """Return the executor of pushdown queries.
+
+    Queries run in Snowflake, or in the SQLite database at
+    `WAREHOUSE_STANDIN_PATH` when one is configured.
+    """
+    if WAREHOUSE_STANDIN_PATH:
+        pool = ConnectionPool(
+            lambda: sqlite3.connect(WAREHOUSE_STANDIN_PATH, check_same_thread=False),
+            WAREHOUSE_MAX_CONNECTIONS,
+            timeout=WAREHOUSE_POOL_TIMEOUT,
+        )
+        return WarehouseExecutor(pool, "named")
+    return WarehouseExecutor(snowflake_manager.pool, "pyformat")
+
 
+snowflake_manager = SnowflakeManager()
 sqlite_manager = SQLiteManager()
+warehouse = _open_warehouse()
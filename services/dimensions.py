@@ -0,0 +1,85 @@
+"""Dimension-label filters rewritten as surrogate-key filters on the fact tables.
+
+Dashboard filters name dimension labels (`ENCOUNTER_GROUP`, `ENCOUNTER_TYPE`)
+while the fact tables only hold the surrogate keys. `prune_joins` rewrites
+each label filter into an `IN` filter on the fact table's key column, using
+the label-to-keys lookup of the dimension, so queries no longer join the
+dimension to every claim line. A dimension is still joined when its filter
+cannot be rewritten: it matches null labels, which also stand for keys
+missing from the dimension, or a label the dimension does not have.
+"""
+
+import sqlite3
+from typing import Callable, Optional
+
+# Filter columns holding dimension labels: the dimension table, its alias in
+# the query templates and the surrogate key shared with the fact tables.
+DIMENSIONS = {
+    "ENCOUNTER_GROUP": ("DIM_ENCOUNTER_GROUP", "grp", "ENCOUNTER_GROUP_SK"),
+    "ENCOUNTER_TYPE": ("DIM_ENCOUNTER_TYPE", "type", "ENCOUNTER_TYPE_SK"),
+}
+
+
+def read_dimension_keys(conn: sqlite3.Connection, column: str) -> dict[str, tuple]:
+    """Return the surrogate keys of each label of dimension column `column`.
+
+    Args:
+        conn (sqlite3.Connection): Database holding the dimension table.
+        column (str): Label column, a key of `DIMENSIONS`.
+
+    Returns:
+        dict[str, tuple]: Sorted surrogate keys by label. Rows with a null
+            label or key are left out, since a join never matches them.
+    """
+    table_name, _, key = DIMENSIONS[column]
+    keys: dict[str, list] = {}
+    for label, sk in conn.execute(
+        f"SELECT {column}, {key} FROM {table_name}"
+        f" WHERE {column} IS NOT NULL AND {key} IS NOT NULL ORDER BY {key}"
+    ):
+        keys.setdefault(label, []).append(sk)
+    return {label: tuple(sks) for label, sks in keys.items()}
+
+
+def prune_joins(
+    filters: Optional[dict], dimension_keys: Callable[[str], dict[str, tuple]]
+) -> tuple[dict, list[str]]:
+    """Rewrite the dimension-label filters of `filters` as surrogate-key filters.
+
+    Args:
+        filters (dict, optional): Column-value filters for `build_filter_clause`.
+        dimension_keys (Callable): Returns the `read_dimension_keys` lookup of
+            a label column.
+
+    Returns:
+        tuple[dict, list[str]]: The filters with rewritten labels replaced by
+            their key column, and the label columns still filtered on, whose
+            dimension must be joined.
+    """
+    rewritten, joined = {}, []
+    for column, values in (filters or {}).items():
+        if column not in DIMENSIONS:
+            rewritten[column] = values
+            continue
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+        keys = dimension_keys(column)
+        if all(value is not None and value in keys for value in values):
+            key = DIMENSIONS[column][2]
+            rewritten[key] = sorted({sk for value in values for sk in keys[value]})
+        else:
+            rewritten[column] = values
+            joined.append(column)
+    return rewritten, joined
+
+
+def dimension_joins(alias: str, columns: list[str]) -> str:
+    """Return the `LEFT JOIN`s of the dimensions of label `columns` to fact `alias`."""
+    joins = []
+    for column in sorted(columns):
+        table_name, dimension_alias, key = DIMENSIONS[column]
+        joins.append(
+            f"LEFT JOIN {table_name} {dimension_alias}"
+            f" ON {alias}.{key} = {dimension_alias}.{key}"
+        )
+    return "\n            ".join(joins)
@@ -0,0 +1,96 @@
+"""Encounter-grain fact table derived from the claim lines.
+
+`FACT_ENCOUNTERS` holds one row per ENCOUNTER_ID with its YEAR_MONTH,
+encounter group and type, member, dominant CCSR category and summed paid
+amount. Encounter counts over it are a plain `COUNT(ENCOUNTER_ID)` instead of
+a `COUNT(DISTINCT ENCOUNTER_ID)` over claim lines, and add up across months
+and filter values.
+"""
+
+from typing import Optional
+
+import pandas as pd
+
+ENCOUNTERS_TABLE = "FACT_ENCOUNTERS"
+
+# Claim-line columns every line of an encounter must share for the table to
+# count encounters exactly.
+ENCOUNTER_ATTRIBUTES = [
+    "YEAR_MONTH",
+    "ENCOUNTER_GROUP_SK",
+    "ENCOUNTER_TYPE_SK",
+    "PERSON_ID",
+]
+
+# Dashboard filter columns answered exactly on the encounter grain. CCSR
+# filters are too only when no encounter spans several CCSR categories.
+ENCOUNTER_FILTERS = frozenset({"ENCOUNTER_GROUP", "ENCOUNTER_TYPE"})
+CCSR_FILTER = "CCSR_CATEGORY_DESCRIPTION"
+
+
+def build_encounters(claims: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Aggregate claim lines to one row per encounter.
+
+    Each encounter takes the CCSR category of its highest-paid line (the
+    first in alphabetical order on ties), and
+    CCSR_CATEGORY_COUNT records how many categories its lines have. Lines
+    without an ENCOUNTER_ID are summed per attributes and CCSR category, with
+    a null ENCOUNTER_ID, so paid totals stay exact.
+
+    Args:
+        claims (pandas.DataFrame): FACT_CLAIMS rows.
+
+    Returns:
+        pandas.DataFrame | None: ENCOUNTER_ID, the `ENCOUNTER_ATTRIBUTES`,
+            CCSR_CATEGORY_DESCRIPTION, CCSR_CATEGORY_COUNT, LINE_COUNT and
+            PAID_AMOUNT; None when an encounter's lines disagree on an
+            attribute, since its count would then depend on the grain.
+    """
+    lines = claims[["ENCOUNTER_ID", *ENCOUNTER_ATTRIBUTES, CCSR_FILTER, "PAID_AMOUNT"]]
+    with_id = lines[lines["ENCOUNTER_ID"].notna()]
+    if (
+        with_id.groupby("ENCOUNTER_ID")[ENCOUNTER_ATTRIBUTES]
+        .nunique(dropna=False)
+        .gt(1)
+        .any(axis=None)
+    ):
+        return None
+
+    dominant = (
+        with_id.sort_values(
+            ["PAID_AMOUNT", CCSR_FILTER], ascending=[False, True], kind="stable"
+        )
+        .drop_duplicates("ENCOUNTER_ID")
+        .set_index("ENCOUNTER_ID")[[*ENCOUNTER_ATTRIBUTES, CCSR_FILTER]]
+    )
+    groups = with_id.groupby("ENCOUNTER_ID")
+    dominant["CCSR_CATEGORY_COUNT"] = groups[CCSR_FILTER].nunique(dropna=False)
+    dominant["LINE_COUNT"] = groups.size()
+    dominant["PAID_AMOUNT"] = groups["PAID_AMOUNT"].sum(min_count=1)
+    encounters = dominant.reset_index()
+
+    without_id = lines[lines["ENCOUNTER_ID"].isna()]
+    if not without_id.empty:
+        keys = [*ENCOUNTER_ATTRIBUTES, CCSR_FILTER]
+        groups = without_id.groupby(keys, dropna=False)["PAID_AMOUNT"]
+        unassigned = pd.DataFrame(
+            {
+                "CCSR_CATEGORY_COUNT": 1,
+                "LINE_COUNT": groups.size(),
+                "PAID_AMOUNT": groups.sum(min_count=1),
+            }
+        ).reset_index()
+        encounters = pd.concat([encounters, unassigned])
+    return encounters.sort_values("YEAR_MONTH", kind="stable").reset_index(drop=True)
+
+
+def exact_filters(max_ccsr_categories: Optional[int]) -> frozenset:
+    """Return the filter columns the encounter grain answers exactly.
+
+    Args:
+        max_ccsr_categories (int, optional): Largest CCSR_CATEGORY_COUNT of the
+            loaded encounters, None when there are none.
+    """
+    if max_ccsr_categories is None or max_ccsr_categories <= 1:
+        return ENCOUNTER_FILTERS | {CCSR_FILTER}
+    return ENCOUNTER_FILTERS
@@ -0,0 +1,108 @@
+import functools
+import json
+import threading
+from collections import OrderedDict
+
+from plotly.io.json import to_json_plotly
+
+from services.database import sqlite_manager
+from services.settings import FIGURE_CACHE_SIZE
+from services.utils import fingerprint
+
+
+class FigureCache:
+    """Thread-safe LRU cache of serialized plotly figure JSON."""
+
+    def __init__(self, max_entries: int = FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> dict | None:
+        """Return a fresh copy of the cached figure for `key`, or None."""
+        with self._lock:
+            serialized = self._entries.get(key)
+            if serialized is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(serialized)
+
+    def set(self, key: tuple, figure) -> dict:
+        """Serialize and store `figure` under `key`, returning it as a dict."""
+        serialized = (
+            figure.to_json() if hasattr(figure, "to_json") else to_json_plotly(figure)
+        )
+        with self._lock:
+            self._entries[key] = serialized
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return json.loads(serialized)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+figure_cache = FigureCache()
+
+
+def cached_figure(component: str):
+    """Cache a figure builder's output keyed by its data and styling arguments.
+
+    The decorated builder returns the figure as a plotly JSON dict. Builders
+    must not depend on anything other than their arguments.
+
+    Args:
+        component (str): Name identifying the builder in cache keys.
+    """
+
+    def decorator(builder):
+        @functools.wraps(builder)
+        def wrapper(*args, **kwargs):
+            if figure_cache.max_entries <= 0:
+                return builder(*args, **kwargs)
+            key = (component, fingerprint(args), fingerprint(kwargs))
+            figure = figure_cache.get(key)
+            if figure is None:
+                figure = figure_cache.set(key, builder(*args, **kwargs))
+            return figure
+
+        return wrapper
+
+    return decorator
+
+
+_prerendered: dict[tuple[str, str, str], object] = {}
+
+
+def prerendered(func):
+    """Serve callback outputs pre-rendered by `warm` for matching inputs.
+
+    `func.warm(*args)` runs the callback once and keeps its output; later
+    calls with the same inputs and data version return it without running
+    queries or building figures, so outputs rendered before the data changed
+    (e.g. by `sqlite_manager.evict_partition`) are not served. Outputs are
+    shared between sessions and must be treated as read-only.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        key = (func.__qualname__, sqlite_manager.data_version, fingerprint(args))
+        output = _prerendered.get(key)
+        return output if output is not None else func(*args)
+
+    def warm(*args):
+        data_version = sqlite_manager.data_version
+        for key in [key for key in _prerendered if key[1] != data_version]:
+            del _prerendered[key]
+        _prerendered[(func.__qualname__, data_version, fingerprint(args))] = func(*args)
+
+    wrapper.warm = warm
+    return wrapper
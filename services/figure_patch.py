@@ -0,0 +1,92 @@
+import functools
+
+from dash import Patch, no_update
+
+from services.utils import fingerprint
+
+# Trace properties holding per-point values (and precomputed box statistics);
+# everything else is structure.
+DATA_KEYS = (
+    "x",
+    "y",
+    "text",
+    "customdata",
+    "error_x",
+    "error_y",
+    "q1",
+    "median",
+    "q3",
+    "lowerfence",
+    "upperfence",
+    "mean",
+)
+# Axis ranges are derived from the data (e.g. 120% of the largest bar).
+RANGE_AXES = ("xaxis", "yaxis")
+
+
+def figure_structure(figure: dict) -> str:
+    """Fingerprint a figure spec ignoring its data values and axis ranges.
+
+    Two figures with the same structure differ only in values that
+    `patch_figure` can update in place.
+    """
+    data = [
+        {key: (None if key in DATA_KEYS else value) for key, value in trace.items()}
+        for trace in figure.get("data", [])
+    ]
+    layout = {
+        key: value
+        for key, value in figure.get("layout", {}).items()
+        if key != "template"
+    }
+    for axis in RANGE_AXES:
+        if "range" in layout.get(axis, {}):
+            layout[axis] = {**layout[axis], "range": None}
+    return fingerprint([data, layout])
+
+
+def patch_figure(figure: dict, structure: str | None) -> tuple:
+    """Return the update to send for `figure` given the browser's current structure.
+
+    Args:
+        figure (dict): Newly built figure spec.
+        structure (str, optional): `figure_structure` of the figure currently shown.
+
+    Returns:
+        tuple: `(Patch, no_update)` replacing only data values and axis ranges when
+            the structure is unchanged, otherwise `(figure, new_structure)`.
+    """
+    new_structure = figure_structure(figure)
+    if structure != new_structure:
+        return figure, new_structure
+
+    patch = Patch()
+    for i, trace in enumerate(figure["data"]):
+        for key in DATA_KEYS:
+            if key in trace:
+                patch["data"][i][key] = trace[key]
+    for axis in RANGE_AXES:
+        axis_range = figure["layout"].get(axis, {}).get("range")
+        if axis_range is not None:
+            patch["layout"][axis]["range"] = axis_range
+    return patch, no_update
+
+
+def delta_figure(func):
+    """Send figure callback results as `Patch` updates when only data changed.
+
+    The decorated callback takes the structure of the displayed figure (a
+    `dcc.Store` State) as its last argument, which is not passed on to `func`.
+    `func` returns a figure, or a tuple whose first item is the figure; the
+    wrapper returns the figure update and the new structure in its place.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        *inputs, structure = args
+        result = func(*inputs)
+        if isinstance(result, tuple):
+            return (*patch_figure(result[0], structure), *result[1:])
+        return patch_figure(result, structure)
+
+    return wrapper
@@ -0,0 +1,38 @@
+"""Member-month paid summary derived from the claim lines.
+
+`FACT_MEMBER_PAID` holds the paid amount of each member per YEAR_MONTH,
+encounter group and type, and CCSR category. It answers every dashboard
+filter, so per-member totals over a window (cohorts, top spenders) sum a few
+rows per member instead of aggregating and joining claim lines. Rows are
+indexed by member and month.
+"""
+
+import pandas as pd
+
+MEMBER_PAID_TABLE = "FACT_MEMBER_PAID"
+
+MEMBER_PAID_KEYS = [
+    "PERSON_ID",
+    "YEAR_MONTH",
+    "ENCOUNTER_GROUP_SK",
+    "ENCOUNTER_TYPE_SK",
+    "CCSR_CATEGORY_DESCRIPTION",
+]
+
+MEMBER_PAID_INDEX = ("PERSON_ID", "YEAR_MONTH")
+
+
+def build_member_paid(claims: pd.DataFrame) -> pd.DataFrame:
+    """Sum the paid amount of claim lines per `MEMBER_PAID_KEYS`.
+
+    Args:
+        claims (pandas.DataFrame): FACT_CLAIMS rows.
+
+    Returns:
+        pandas.DataFrame: The `MEMBER_PAID_KEYS`, PAID_AMOUNT (null when every
+            line's amount is) and LINE_COUNT, ordered by member and month.
+    """
+    groups = claims.groupby(MEMBER_PAID_KEYS, dropna=False, sort=True)
+    summary = groups["PAID_AMOUNT"].sum(min_count=1).to_frame()
+    summary["LINE_COUNT"] = groups.size()
+    return summary.reset_index()
@@ -0,0 +1,140 @@
+"""Map-reduce execution of aggregations over month chunks on a process pool.
+
+SQLite runs each query on one core. Aggregations that are sums over the
+months of a window (paid amounts by CCSR category, by encounter group, per
+member) can instead be split into month or quarter chunks (`chunk_periods`),
+whose partial aggregates run in parallel on `ChunkPool` worker processes,
+each with its own read-only connection, and are then summed by the caller.
+
+The pool is started on first use in each process (after gunicorn forks its
+workers). Its workers are forked, since spawned ones would re-import the
+main module (`app.py` loads the data); they only open their own connection,
+so they use nothing of the parent's state but imported modules. Platforms
+without fork (Windows) run every query as one statement.
+"""
+
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+import pandas as pd
+
+from services.admission import PROGRESS_STEPS
+from services.columnar import read_typed
+from services.settings import PARALLEL_WORKERS
+
+CHUNK_GRAINS = ("month", "quarter")
+
+FORK_AVAILABLE = "fork" in multiprocessing.get_all_start_methods()
+
+# This worker process's connection, opened by `_open_worker`.
+_worker_conn: Optional[sqlite3.Connection] = None
+
+
+def chunk_periods(
+    start_yyyymm: int, end_yyyymm: int, grain: str
+) -> list[tuple[int, int]]:
+    """Split a YEAR_MONTH period into calendar month or quarter chunks.
+
+    Returns:
+        list[tuple[int, int]]: First and last YEAR_MONTH of each chunk, clipped
+            to the period, in order.
+    """
+    step = 3 if grain == "quarter" else 1
+    year, month = divmod(int(start_yyyymm), 100)
+    month = (month - 1) // step * step + 1
+    chunks = []
+    while year * 100 + month <= end_yyyymm:
+        last_month = month + step - 1
+        chunks.append(
+            (
+                max(year * 100 + month, start_yyyymm),
+                min(year * 100 + last_month, end_yyyymm),
+            )
+        )
+        year, month = (year + 1, 1) if last_month == 12 else (year, last_month + 1)
+    return chunks
+
+
+def _open_worker(uri: str):
+    global _worker_conn
+    _worker_conn = sqlite3.connect(uri, uri=True)
+    _worker_conn.execute("PRAGMA query_only = ON")
+
+
+def _run_chunk(
+    sql: str,
+    params: dict,
+    schema: Optional[dict[str, str]],
+    deadline: Optional[float],
+) -> pd.DataFrame:
+    """Run one partial aggregate in a worker, interrupted past `deadline` (epoch seconds)."""
+    if deadline is not None:
+        _worker_conn.set_progress_handler(
+            lambda: int(time.time() > deadline), PROGRESS_STEPS
+        )
+    try:
+        if schema is None:
+            return pd.read_sql_query(sql, _worker_conn, params=params)
+        return read_typed(_worker_conn, sql, params, schema)
+    finally:
+        _worker_conn.set_progress_handler(None, 0)
+
+
+class ChunkPool:
+    """Process pool running partial aggregates on read-only database connections.
+
+    Args:
+        max_workers (int): Worker processes.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._owner: Optional[tuple[int, str]] = None
+
+    def submit(
+        self,
+        uri: str,
+        sql: str,
+        params: dict,
+        schema: Optional[dict[str, str]],
+        deadline: Optional[float] = None,
+    ) -> Future:
+        """Start running `sql` on the database at `uri` in a worker process.
+
+        The pool is (re)started when first used by this process or with
+        another database.
+
+        Args:
+            uri (str): SQLite URI of the database, opened read-only.
+            sql (str): Partial aggregate statement.
+            params (dict): Bound parameters.
+            schema (dict[str, str], optional): Declared result column types,
+                see `services.columnar`; without one, pandas infers the dtypes.
+            deadline (float, optional): `time.time()` past which the
+                statement is interrupted.
+        """
+        if self._owner != (os.getpid(), uri):
+            self.shutdown()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_open_worker,
+                initargs=(uri,),
+            )
+            self._owner = (os.getpid(), uri)
+        return self._executor.submit(_run_chunk, sql, params, schema, deadline)
+
+    def shutdown(self):
+        """Stop the worker processes of this process's pool, if any."""
+        if self._executor is not None and self._owner[0] == os.getpid():
+            self._executor.shutdown(cancel_futures=True)
+        self._executor = None
+        self._owner = None
+
+
+chunk_pool = ChunkPool(PARALLEL_WORKERS)
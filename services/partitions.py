@@ -0,0 +1,127 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Fact tables split into YEAR_MONTH partitions when loaded.
+PARTITIONED_TABLES = ("FACT_CLAIMS", "FACT_MEMBER_MONTHS")
+
+PARTITION_GRAINS = ("year", "quarter", "none")
+
+# Parameters binding the YEAR_MONTH window of queries on `guarded_source`s.
+WINDOW_PARAMS = ("start_yyyymm", "end_yyyymm")
+
+
+def partition_starts(year_month: pd.Series, grain: str) -> pd.Series:
+    """Return the first YEAR_MONTH of the partition holding each value.
+
+    Args:
+        year_month (pd.Series): YEAR_MONTH values in YYYYMM format (nulls allowed).
+        grain (str): "year" or "quarter".
+
+    Returns:
+        pd.Series: Partition start in YYYYMM format, null where YEAR_MONTH is null.
+    """
+    year = year_month // 100
+    if grain == "year":
+        return year * 100 + 1
+    first_month = (year_month % 100 - 1) // 3 * 3 + 1
+    return year * 100 + first_month
+
+
+def partition_end(start_yyyymm: int, grain: str) -> int:
+    """Return the last YEAR_MONTH of the partition starting at `start_yyyymm`."""
+    return start_yyyymm + (11 if grain == "year" else 2)
+
+
+def partition_name(table_name: str, start_yyyymm: Optional[int], grain: str) -> str:
+    """Name the partition table, e.g. `FACT_CLAIMS_P2023` or `FACT_CLAIMS_P2023Q1`.
+
+    Rows without a YEAR_MONTH go to `<table>_PNULL`.
+    """
+    if start_yyyymm is None:
+        return f"{table_name}_PNULL"
+    year, month = divmod(int(start_yyyymm), 100)
+    if grain == "year":
+        return f"{table_name}_P{year}"
+    return f"{table_name}_P{year}Q{(month - 1) // 3 + 1}"
+
+
+def empty_partition_name(table_name: str) -> str:
+    """Name of the row-less table keeping the schema of a partitioned table."""
+    return f"{table_name}_PEMPTY"
+
+
+def split_partitions(
+    df: pd.DataFrame, table_name: str, grain: str
+) -> list[tuple[str, Optional[int], Optional[int], pd.DataFrame]]:
+    """Split loaded rows into partitions by YEAR_MONTH.
+
+    Returns:
+        list[tuple]: `(partition_name, start_yyyymm, end_yyyymm, rows)` per
+            partition, ordered by start; null bounds for the null partition.
+    """
+    starts = partition_starts(df["YEAR_MONTH"], grain)
+    partitions = []
+    for start, rows in df.groupby(starts, dropna=False, sort=True):
+        if pd.isna(start):
+            partitions.append(
+                (partition_name(table_name, None, grain), None, None, rows)
+            )
+        else:
+            start = int(start)
+            partitions.append(
+                (
+                    partition_name(table_name, start, grain),
+                    start,
+                    partition_end(start, grain),
+                    rows,
+                )
+            )
+    return partitions
+
+
+def guarded_source(table_name: str, partitions: pd.DataFrame) -> str:
+    """Return a FROM source reading the partitions overlapping the bound window.
+
+    Each dated partition is read under a condition comparing its bounds with
+    the `WINDOW_PARAMS`. The condition reads no column, so SQLite evaluates
+    it once and skips the partitions outside the window without scanning
+    them. The text only depends on the partitions loaded, not on the window,
+    so a query keeps one statement whatever period it runs on.
+
+    Args:
+        table_name (str): Partitioned table.
+        partitions (pd.DataFrame): Rows of the PARTITIONS table for it.
+    """
+    start_param, end_param = WINDOW_PARAMS
+    dated = partitions[partitions["START_YYYYMM"].notna()]
+    if dated.empty:
+        return empty_partition_name(table_name)
+    return (
+        "("
+        + " UNION ALL ".join(
+            f"SELECT * FROM {name} "
+            f"WHERE :{start_param} <= {int(end)} AND :{end_param} >= {int(start)}"
+            for name, start, end in zip(
+                dated["PARTITION_NAME"], dated["START_YYYYMM"], dated["END_YYYYMM"]
+            )
+        )
+        + ")"
+    )
+
+
+def overlapping(partitions: pd.DataFrame, start_yyyymm, end_yyyymm) -> list[str]:
+    """Return the names of loaded partitions overlapping `[start, end]`, in order.
+
+    Args:
+        partitions (pd.DataFrame): Rows of the PARTITIONS table for one fact table.
+        start_yyyymm (int): First YEAR_MONTH of the range.
+        end_yyyymm (int): Last YEAR_MONTH of the range.
+    """
+    mask = (
+        partitions["START_YYYYMM"].notna()
+        & (partitions["START_YYYYMM"] <= end_yyyymm)
+        & (partitions["END_YYYYMM"] >= start_yyyymm)
+    )
+    return partitions.loc[np.asarray(mask), "PARTITION_NAME"].tolist()
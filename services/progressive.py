@@ -0,0 +1,67 @@
+"""Callbacks rendered from the sample first, then refined to exact values.
+
+With `PROGRESSIVE_RESULTS`, a `progressive` callback runs in an estimating
+context: data functions that can answer from the member sample (see
+`services.sampling`) return estimates and report it with `mark_estimated`.
+The callback then has one more output, a `dcc.Store` receiving a refine
+token. A second callback, triggered by that store, passes the token to
+`refine`, which runs the callback again outside the estimating context and
+replaces the estimated outputs with exact ones. When nothing was estimated
+(pre-rendered output, no sample loaded) the store is left unchanged and no
+refinement runs.
+"""
+
+import functools
+from contextvars import ContextVar
+from typing import Optional
+
+from dash import no_update
+
+from services.settings import PROGRESSIVE_RESULTS
+
+_estimating: ContextVar[Optional[dict]] = ContextVar("estimating", default=None)
+
+
+def estimating() -> bool:
+    """Return whether data functions should answer from the sample when they can."""
+    return _estimating.get() is not None
+
+
+def mark_estimated():
+    """Record that an output of the running callback is an estimate to refine."""
+    state = _estimating.get()
+    if state is not None:
+        state["estimated"] = True
+
+
+def progressive(func):
+    """Render a callback from the sample, returning a refine token as last output.
+
+    `func` keeps its arguments and outputs; the wrapper appends the refine
+    token (the callback arguments) when an output was estimated, `no_update`
+    otherwise. `wrapper.refine(token, *states)` runs `func` exactly with the
+    token's arguments, its trailing State arguments replaced by the current
+    `states`, and returns `func`'s outputs.
+    """
+
+    def _outputs(result) -> tuple:
+        return result if isinstance(result, tuple) else (result,)
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        if not PROGRESSIVE_RESULTS:
+            return (*_outputs(func(*args)), no_update)
+        state = {"estimated": False}
+        token = _estimating.set(state)
+        try:
+            result = func(*args)
+        finally:
+            _estimating.reset(token)
+        return (*_outputs(result), list(args) if state["estimated"] else no_update)
+
+    def refine(token: list, *states):
+        args = token[: len(token) - len(states)]
+        return func(*args, *states)
+
+    wrapper.refine = refine
+    return wrapper
@@ -0,0 +1,101 @@
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+import pandas as pd
+
+from services.database import sqlite_manager, warehouse
+from services.queries import PUSHDOWN_TABLES
+from services.result_cache import ResultCache, result_cache
+from services.settings import PUSHDOWN_CACHE_TTL, QUERY_BACKEND
+from services.warehouse import referenced_tables
+
+QUERY_BACKENDS = ("sqlite", "snowflake")
+
+
+def _completed(result: pd.DataFrame) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+class QueryRouter:
+    """Sends each query to the local SQLite copy or to the warehouse.
+
+    In pushdown mode statements reading one of the `PUSHDOWN_TABLES` run in
+    the warehouse, and their results are kept in the shared result cache for
+    `PUSHDOWN_CACHE_TTL` seconds since the warehouse data changes underneath
+    the dashboard. Statements only reading local tables (dimensions, sketches)
+    and every statement in "sqlite" mode go to `sqlite_manager`.
+
+    Args:
+        backend (str): One of `QUERY_BACKENDS`.
+    """
+
+    def __init__(self, backend: str = QUERY_BACKEND):
+        if backend not in QUERY_BACKENDS:
+            raise ValueError(
+                f"QUERY_BACKEND must be one of {QUERY_BACKENDS}, got {backend!r}"
+            )
+        self.backend = backend
+
+    def is_pushed_down(self, sql: str) -> bool:
+        """Return whether `sql` runs in the warehouse."""
+        return self.backend == "snowflake" and not referenced_tables(sql).isdisjoint(
+            PUSHDOWN_TABLES
+        )
+
+    def submit(
+        self,
+        sql: str,
+        params: Optional[dict] = None,
+        name="query",
+        schema: Optional[dict[str, str]] = None,
+    ) -> Future:
+        """Start running `sql`; the future holds its result as a DataFrame.
+
+        Local and cached queries complete before this returns, warehouse queries
+        run in the background so callers can have several in flight. `schema`
+        declares the result column types (see `services.columnar`).
+        """
+        if not self.is_pushed_down(sql):
+            return _completed(
+                sqlite_manager.query(sql, params, name=name, schema=schema)
+            )
+
+        cache_version = self._cache_version()
+        if cache_version is None:
+            return warehouse.submit(sql, params, schema)
+        key = ResultCache.make_key(sql, params, cache_version)
+        cached = result_cache.get(key, name)
+        if cached is not None:
+            return _completed(cached)
+
+        future = warehouse.submit(sql, params, schema)
+
+        def store(done: Future):
+            if done.exception() is None:
+                result_cache.set(key, cache_version, done.result())
+
+        future.add_done_callback(store)
+        return future
+
+    def query(
+        self,
+        sql: str,
+        params: Optional[dict] = None,
+        name="query",
+        schema: Optional[dict[str, str]] = None,
+    ) -> pd.DataFrame:
+        """Run `sql` with `params` bound and return its result."""
+        return self.submit(sql, params, name=name, schema=schema).result()
+
+    def _cache_version(self) -> Optional[str]:
+        """Version of cached warehouse results: the local data and the TTL period."""
+        data_version = sqlite_manager.data_version
+        if not result_cache.enabled or data_version is None or PUSHDOWN_CACHE_TTL <= 0:
+            return None
+        return f"{data_version}:warehouse:{int(time.time() // PUSHDOWN_CACHE_TTL)}"
+
+
+query_router = QueryRouter()
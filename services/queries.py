@@ -65,3 +65,6 @@ table_list = [
     {"table_name": "DIM_ENCOUNTER_TYPE", "query": dim_encounter_type_query},
     {"table_name": "DIM_MEMBER", "query": dim_member},
 ]
+
+# Tables left in the warehouse, and queried there, in pushdown mode.
+PUSHDOWN_TABLES = ("FACT_CLAIMS", "FACT_MEMBER_MONTHS")
@@ -0,0 +1,94 @@
+import functools
+from concurrent.futures import Future
+from typing import Optional
+
+import pandas as pd
+
+from services.database import sqlite_manager
+from services.pushdown import query_router
+
+# Rendered statements kept: one per template and set of fragments (filter
+# shape, sources); sources change with the loaded partitions.
+RENDER_CACHE_SIZE = 1024
+
+
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render(template: str, fragments: tuple[tuple[str, str], ...]) -> str:
+    return template.format(**dict(fragments))
+
+
+class QueryRegistry:
+    """Named SQL templates whose values are always bound parameters.
+
+    Templates use `{placeholders}` for structural SQL only (table names,
+    aggregate expressions and conditions from `build_filter_clause`) and
+    `:name` parameters for every value, so a query renders to the same
+    statement text whatever dates and filter values it runs with. SQLite then
+    compiles each statement once per connection and reuses it from the
+    connection's statement cache. `query_router` decides where each
+    statement runs.
+    """
+
+    def __init__(self):
+        self._templates: dict[str, str] = {}
+        self._schemas: dict[str, Optional[dict[str, str]]] = {}
+
+    def register(
+        self, name: str, template: str, schema: Optional[dict[str, str]] = None
+    ) -> str:
+        """Register `template` under `name` and return the name.
+
+        `schema` optionally declares the type of every result column (see
+        `services.columnar`), so results arrive typed instead of inferred.
+        """
+        if name in self._templates:
+            raise ValueError(f"Query {name!r} is already registered")
+        self._templates[name] = template
+        self._schemas[name] = schema
+        return name
+
+    def render(self, name: str, **fragments: str) -> str:
+        """Return the statement text of query `name` for the given SQL fragments."""
+        return _render(self._templates[name], tuple(sorted(fragments.items())))
+
+    def query(self, name: str, params: dict, **fragments: str) -> pd.DataFrame:
+        """Render query `name` and run it with `params` bound."""
+        return query_router.query(
+            self.render(name, **fragments),
+            params,
+            name=name,
+            schema=self._schemas[name],
+        )
+
+    def submit(self, name: str, params: dict, **fragments: str) -> Future:
+        """Like `query`, but return a future instead of waiting for the result."""
+        return query_router.submit(
+            self.render(name, **fragments),
+            params,
+            name=name,
+            schema=self._schemas[name],
+        )
+
+    def query_chunks(
+        self, name: str, chunks: list[tuple[dict, dict]]
+    ) -> list[pd.DataFrame]:
+        """Render and run query `name` once per chunk, in parallel in SQLite.
+
+        Args:
+            name (str): Registered partial aggregate.
+            chunks (list[tuple[dict, dict]]): Bound parameters and SQL
+                fragments of each chunk.
+
+        Returns:
+            list[pandas.DataFrame]: Each chunk's result, in order (see
+                `SQLiteManager.query_chunks`).
+        """
+        statements = [
+            (self.render(name, **fragments), params) for params, fragments in chunks
+        ]
+        return sqlite_manager.query_chunks(
+            statements, name=name, schema=self._schemas[name]
+        )
+
+
+query_registry = QueryRegistry()
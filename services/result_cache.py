@@ -0,0 +1,271 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from services.queries import sqlite_path
+from services.settings import RESULT_CACHE_MAX_MB
+from services.utils import fingerprint
+
+result_cache_path = str(Path(sqlite_path).parent / "result_cache.db")
+
+# Seconds between writes of the access times and hit counts collected by `get`.
+FLUSH_INTERVAL = 30.0
+
+
+class ResultCache:
+    """Query result cache shared by every worker through a local SQLite file.
+
+    Entries are keyed by a fingerprint of the SQL text and parameters plus the
+    data version, so results computed by one worker serve all others and stay
+    valid across restarts until the data changes. Writes are single SQLite
+    transactions, which makes them atomic across processes, and the least
+    recently used entries are evicted beyond `max_bytes`.
+
+    Each thread keeps its own connection, and a lookup is a pure read: access
+    times and hit/miss counts are collected in memory and written with the
+    next `set`, or at most every `FLUSH_INTERVAL` seconds.
+    """
+
+    def __init__(
+        self, path: str = result_cache_path, max_mb: float = RESULT_CACHE_MAX_MB
+    ):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._local = threading.local()
+        self._pending_lock = threading.Lock()
+        self._accessed: dict[str, float] = {}
+        self._counts: dict[str, list[int]] = {}
+        self._flushed_at = time.monotonic()
+        if hasattr(os, "register_at_fork"):
+            # A forked child would write the parent's pending counts again.
+            os.register_at_fork(after_in_child=self._forget_pending)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opened again after a fork or a new `path`."""
+        owner = (os.getpid(), self.path)
+        if getattr(self._local, "owner", None) == owner:
+            return self._local.conn
+        # A connection inherited through fork is left alone, not closed.
+        if getattr(self._local, "owner", (None,))[0] == os.getpid():
+            self._local.conn.close()
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS RESULTS (
+                KEY TEXT PRIMARY KEY,
+                DATA_VERSION TEXT NOT NULL,
+                PAYLOAD BLOB NOT NULL,
+                SIZE INTEGER NOT NULL,
+                LAST_ACCESS REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS STATS (
+                NAME TEXT PRIMARY KEY,
+                HITS INTEGER NOT NULL DEFAULT 0,
+                MISSES INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._local.conn, self._local.owner = conn, owner
+        return conn
+
+    def _forget_pending(self):
+        self._pending_lock = threading.Lock()
+        self._accessed = {}
+        self._counts = {}
+
+    def _write_pending(self, conn: sqlite3.Connection):
+        """Write the collected access times and hit counts, inside a transaction of `conn`."""
+        with self._pending_lock:
+            accessed, self._accessed = self._accessed, {}
+            counts, self._counts = self._counts, {}
+            self._flushed_at = time.monotonic()
+        conn.executemany(
+            "UPDATE RESULTS SET LAST_ACCESS = MAX(LAST_ACCESS, ?) WHERE KEY = ?",
+            [(access, key) for key, access in accessed.items()],
+        )
+        conn.executemany(
+            """
+            INSERT INTO STATS (NAME, HITS, MISSES) VALUES (?, ?, ?)
+            ON CONFLICT(NAME) DO UPDATE SET
+                HITS = HITS + excluded.HITS, MISSES = MISSES + excluded.MISSES
+            """,
+            [(name, hits, misses) for name, (hits, misses) in counts.items()],
+        )
+
+    def flush(self):
+        """Write the access times and hit counts collected by this process."""
+        if not self._accessed and not self._counts:
+            return
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_pending(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def make_key(sql_query: str, params, data_version: str) -> str:
+        params = dict(params) if isinstance(params, dict) else list(params or [])
+        return fingerprint([sql_query, params, data_version])
+
+    def get(self, key: str, name: str = "query") -> Optional[pd.DataFrame]:
+        """Return the cached result for `key`, or None on a miss."""
+        row = (
+            self._connect()
+            .execute("SELECT PAYLOAD FROM RESULTS WHERE KEY = ?", (key,))
+            .fetchone()
+        )
+        with self._pending_lock:
+            if row is not None:
+                self._accessed[key] = time.time()
+            counts = self._counts.setdefault(name, [0, 0])
+            counts[0 if row is not None else 1] += 1
+            due = time.monotonic() - self._flushed_at > FLUSH_INTERVAL
+        if due:
+            try:
+                self.flush()
+            except sqlite3.OperationalError as e:
+                print(f"❌ Result cache statistics not written: {e}")
+        return pickle.loads(row[0]) if row is not None else None
+
+    def set(self, key: str, data_version: str, result: pd.DataFrame):
+        """Store `result` and evict least recently used entries over the size limit.
+
+        The access times and hit counts collected since the last write are
+        written in the same transaction, before evicting.
+        """
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_pending(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO RESULTS VALUES (?, ?, ?, ?, ?)",
+                (key, data_version, payload, len(payload), time.time()),
+            )
+            conn.execute(
+                """
+                DELETE FROM RESULTS WHERE KEY IN (
+                    SELECT KEY FROM (
+                        SELECT KEY, SUM(SIZE) OVER (ORDER BY LAST_ACCESS DESC) AS TOTAL
+                        FROM RESULTS
+                    )
+                    WHERE TOTAL > ?
+                )
+                """,
+                (self.max_bytes,),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def purge(self, data_version: str):
+        """Drop entries computed from any other data version."""
+        self._connect().execute(
+            "DELETE FROM RESULTS WHERE DATA_VERSION != ?", (data_version,)
+        )
+
+    def export(self, conn: sqlite3.Connection, data_version: str) -> int:
+        """Copy the entries of `data_version` into a `WARM_RESULTS` table of `conn`.
+
+        Returns:
+            int: Number of entries copied.
+        """
+        rows = (
+            self._connect()
+            .execute(
+                "SELECT KEY, DATA_VERSION, PAYLOAD, SIZE FROM RESULTS"
+                " WHERE DATA_VERSION = ?",
+                (data_version,),
+            )
+            .fetchall()
+        )
+        conn.execute("DROP TABLE IF EXISTS WARM_RESULTS")
+        conn.execute(
+            """
+            CREATE TABLE WARM_RESULTS (
+                KEY TEXT PRIMARY KEY,
+                DATA_VERSION TEXT NOT NULL,
+                PAYLOAD BLOB NOT NULL,
+                SIZE INTEGER NOT NULL
+            )
+            """
+        )
+        conn.executemany("INSERT INTO WARM_RESULTS VALUES (?, ?, ?, ?)", rows)
+        conn.commit()
+        return len(rows)
+
+    def seed(self, conn: sqlite3.Connection) -> int:
+        """Add the `WARM_RESULTS` entries of `conn` that the cache does not hold.
+
+        Returns:
+            int: Number of entries added; 0 when `conn` has no such table.
+        """
+        try:
+            rows = conn.execute(
+                "SELECT KEY, DATA_VERSION, PAYLOAD, SIZE FROM WARM_RESULTS"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return 0
+        now = time.time()
+        cache_conn = self._connect()
+        cache_conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = cache_conn.total_changes
+            cache_conn.executemany(
+                "INSERT OR IGNORE INTO RESULTS VALUES (?, ?, ?, ?, ?)",
+                [(*row, now) for row in rows],
+            )
+            added = cache_conn.total_changes - before
+            cache_conn.execute("COMMIT")
+        except BaseException:
+            cache_conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def stats(self) -> pd.DataFrame:
+        """Return hits, misses and hit rate per data function across all workers.
+
+        Counts other processes have not written yet (see `FLUSH_INTERVAL`)
+        are not included.
+        """
+        self.flush()
+        return pd.read_sql_query(
+            """
+            SELECT
+                NAME,
+                HITS,
+                MISSES,
+                ROUND(1.0 * HITS / (HITS + MISSES), 3) AS HIT_RATE
+            FROM STATS
+            ORDER BY HITS + MISSES DESC
+            """,
+            self._connect(),
+        )
+
+
+result_cache = ResultCache()
+
+
+if __name__ == "__main__":
+    print(result_cache.stats().to_string(index=False))
@@ -0,0 +1,83 @@
+"""Stratified member sample of the paid amounts, for instant estimates.
+
+`FACT_CLAIMS_SAMPLE` holds the `FACT_MEMBER_PAID` rows of a sample of the
+members of each stratum, a YEAR_MONTH and encounter group. Every stratum
+samples `PROGRESSIVE_SAMPLE_RATE` of its members, and at least
+`PROGRESSIVE_MIN_STRATUM_MEMBERS` (all of them in smaller strata), chosen
+by a hash of the member and stratum so reloads pick the same ones. Rows
+carry the stratum's member count (STRATUM_MEMBERS) and sample size
+(STRATUM_SAMPLE).
+
+A stratum's paid total is estimated as its member count times the mean paid
+amount of its sampled members, with the variance of a simple random sample
+without replacement; totals over several strata add up estimates and
+variances. Members of a stratum without rows matching the filters count as
+zeros, so filtered estimates stay unbiased.
+"""
+
+import math
+
+import pandas as pd
+
+from services.member_paid import build_member_paid
+from services.settings import PROGRESSIVE_MIN_STRATUM_MEMBERS, PROGRESSIVE_SAMPLE_RATE
+
+SAMPLE_TABLE = "FACT_CLAIMS_SAMPLE"
+
+STRATUM_KEYS = ["YEAR_MONTH", "ENCOUNTER_GROUP_SK"]
+
+SAMPLE_INDEX = tuple(STRATUM_KEYS)
+
+# Standard normal quantile of two-sided 95% confidence intervals.
+CONFIDENCE_Z = 1.96
+
+
+class Estimate(float):
+    """A value estimated from the sample, with the half-width of its 95% confidence interval."""
+
+    def __new__(cls, value: float, margin: float):
+        estimate = super().__new__(cls, value)
+        estimate.margin = margin
+        return estimate
+
+
+def margin(variance: float) -> float:
+    """Return the half-width of the 95% confidence interval of an estimate's variance."""
+    return CONFIDENCE_Z * math.sqrt(variance) if variance and variance > 0 else 0.0
+
+
+def build_sample(claims: pd.DataFrame) -> pd.DataFrame:
+    """Sample the members of each stratum and keep their member-paid rows.
+
+    Args:
+        claims (pandas.DataFrame): FACT_CLAIMS rows.
+
+    Returns:
+        pandas.DataFrame: The `FACT_MEMBER_PAID` columns of the sampled
+            members' rows, with STRATUM_MEMBERS and STRATUM_SAMPLE, ordered by
+            stratum.
+    """
+    paid = build_member_paid(claims)
+    members = paid[[*STRATUM_KEYS, "PERSON_ID"]].drop_duplicates()
+    strata = members.groupby(STRATUM_KEYS, dropna=False)
+    members = members.assign(
+        STRATUM_MEMBERS=strata["PERSON_ID"].transform("size"),
+        HASH_RANK=pd.util.hash_pandas_object(members, index=False)
+        .groupby([members[key] for key in STRATUM_KEYS], dropna=False)
+        .rank(method="first"),
+    )
+    sample_size = (
+        (members["STRATUM_MEMBERS"] * PROGRESSIVE_SAMPLE_RATE)
+        .apply(math.ceil)
+        .clip(
+            lower=members["STRATUM_MEMBERS"].clip(upper=PROGRESSIVE_MIN_STRATUM_MEMBERS)
+        )
+    )
+    sampled = members[members["HASH_RANK"] <= sample_size].assign(
+        STRATUM_SAMPLE=sample_size
+    )
+    sample = paid.merge(
+        sampled[[*STRATUM_KEYS, "PERSON_ID", "STRATUM_MEMBERS", "STRATUM_SAMPLE"]],
+        on=[*STRATUM_KEYS, "PERSON_ID"],
+    )
+    return sample.sort_values(STRATUM_KEYS, kind="stable").reset_index(drop=True)
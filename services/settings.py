@@ -0,0 +1,138 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment, falling back to `default`."""
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment, falling back to `default`."""
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting ("1", "true", "yes", "on") from the environment."""
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# "exact" runs COUNT(DISTINCT ...) over raw rows; "approximate" merges the
+# HyperLogLog sketches built at load time.
+DISTINCT_MODE = os.getenv("DISTINCT_MODE", "exact").strip().lower()
+
+# Target relative standard error of the HyperLogLog sketches (0.02 -> ~2%).
+HLL_RELATIVE_ERROR = _env_float("HLL_RELATIVE_ERROR", 0.02)
+
+# Maximum number of serialized figures kept in memory (0 disables the cache).
+FIGURE_CACHE_SIZE = _env_int("FIGURE_CACHE_SIZE", 256)
+
+# Number of CCSR categories added to the cost-driver chart per page.
+CCSR_PAGE_SIZE = _env_int("CCSR_PAGE_SIZE", 15)
+
+# Number of members per page of the top members list.
+TOP_MEMBERS_PAGE_SIZE = _env_int("TOP_MEMBERS_PAGE_SIZE", 10)
+
+# Size limit of the on-disk query result cache shared by all workers (0 disables).
+RESULT_CACHE_MAX_MB = _env_float("RESULT_CACHE_MAX_MB", 256)
+
+# Risk-score distributions over at most this many member months are computed
+# exactly from the raw scores; larger windows merge per-month quantile sketches.
+RISK_EXACT_MAX_ROWS = _env_int("RISK_EXACT_MAX_ROWS", 100_000)
+
+# Split FACT_CLAIMS and FACT_MEMBER_MONTHS into "year" or "quarter" YEAR_MONTH
+# partitions at load time, so date-windowed queries only scan the partitions
+# overlapping their period ("none" keeps single tables).
+PARTITION_GRAIN = os.getenv("PARTITION_GRAIN", "year").strip().lower()
+
+# Copy the SQLite database into memory after loading and query it there. Under
+# gunicorn with `preload_app` the copy is made once in the master and shared
+# copy-on-write by the forked workers.
+SQLITE_IN_MEMORY = _env_bool("SQLITE_IN_MEMORY", False)
+
+# "sqlite" answers every query from the local copy. "snowflake" (pushdown) runs
+# queries on the fact tables in the warehouse and only copies the dimensions.
+QUERY_BACKEND = os.getenv("QUERY_BACKEND", "sqlite").strip().lower()
+
+# Size of the Snowflake connection pool, and so the number of concurrent
+# warehouse queries and parallel table pulls, per process.
+WAREHOUSE_MAX_CONNECTIONS = _env_int("WAREHOUSE_MAX_CONNECTIONS", 4)
+
+# Seconds to wait for a free pooled connection before failing.
+WAREHOUSE_POOL_TIMEOUT = _env_float("WAREHOUSE_POOL_TIMEOUT", 30)
+
+# Retries, with exponential backoff, after a failed connection attempt.
+WAREHOUSE_CONNECT_RETRIES = _env_int("WAREHOUSE_CONNECT_RETRIES", 3)
+
+# Pooled connections idle for longer than this many seconds are pinged
+# (`SELECT 1`) before being reused.
+WAREHOUSE_VALIDATE_AFTER = _env_float("WAREHOUSE_VALIDATE_AFTER", 60)
+
+# Seconds a warehouse result is served from the local result cache.
+PUSHDOWN_CACHE_TTL = _env_int("PUSHDOWN_CACHE_TTL", 3600)
+
+# SQLite database queried in place of Snowflake in pushdown mode, to run the
+# routing locally (build it with `python -m services.warehouse <path>`).
+WAREHOUSE_STANDIN_PATH = os.getenv("WAREHOUSE_STANDIN_PATH", "")
+
+# Build query results that declare their column types as typed Arrow columns
+# handed to pandas without per-value conversion; off reads them with
+# `pandas.read_sql_query` and converts the declared types afterwards.
+COLUMNAR_RESULTS = _env_bool("COLUMNAR_RESULTS", True)
+
+# Derive the encounter-grain FACT_ENCOUNTERS table at load time so encounter
+# counts are plain counts instead of COUNT(DISTINCT) over claim lines.
+ENCOUNTER_GRAIN = _env_bool("ENCOUNTER_GRAIN", True)
+
+# Write the fact tables sorted and indexed by YEAR_MONTH, then ANALYZE and
+# VACUUM the database, so windowed queries read adjacent pages.
+CLUSTERED_LAYOUT = _env_bool("CLUSTERED_LAYOUT", True)
+
+# Seconds a SQLite query may take, waiting for admission included, before it
+# is interrupted (0 disables the deadline).
+QUERY_TIMEOUT = _env_float("QUERY_TIMEOUT", 30)
+
+# Queries reading more rows than this, summed over the tables they reference,
+# are admitted through the separate, smaller lane of expensive queries.
+EXPENSIVE_QUERY_ROWS = _env_int("EXPENSIVE_QUERY_ROWS", 500_000)
+
+# Concurrent expensive and cheap SQLite queries per process; further ones
+# wait in line, up to MAX_QUEUED_QUERIES per lane before being rejected.
+MAX_EXPENSIVE_QUERIES = _env_int("MAX_EXPENSIVE_QUERIES", 2)
+MAX_CHEAP_QUERIES = _env_int("MAX_CHEAP_QUERIES", 8)
+MAX_QUEUED_QUERIES = _env_int("MAX_QUEUED_QUERIES", 32)
+
+# Render the KPI, trend and CCSR charts first from a stratified member sample
+# built at load time, with confidence intervals, then refine them to the exact
+# values once those are computed (SQLite backend only).
+PROGRESSIVE_RESULTS = _env_bool("PROGRESSIVE_RESULTS", False)
+
+# Share of the members of each YEAR_MONTH and encounter group sampled for the
+# progressive estimates, and the fewest members sampled per stratum (smaller
+# strata are sampled whole).
+PROGRESSIVE_SAMPLE_RATE = _env_float("PROGRESSIVE_SAMPLE_RATE", 0.05)
+PROGRESSIVE_MIN_STRATUM_MEMBERS = _env_int("PROGRESSIVE_MIN_STRATUM_MEMBERS", 30)
+
+# Database artifact built offline by `python -m services.build`. When set, the
+# app opens it read-only instead of loading and deriving the data itself.
+ARTIFACT_PATH = os.getenv("ARTIFACT_PATH", "")
+
+# Write the fact columns the dashboard reads as memory-mapped `.npy` files next
+# to the database (see `services.snapshot`), mapped by every worker at startup.
+COLUMNAR_SNAPSHOT = _env_bool("COLUMNAR_SNAPSHOT", False)
+
+# Worker processes running the partial aggregates of map-reduce queries over
+# month chunks (see `services.parallel`); 0 or 1 runs every query as one
+# statement. Windows with fewer than `PARALLEL_MIN_ROWS` fact rows, or spanning a
+# single `PARALLEL_CHUNK` ("month" or "quarter"), are not split.
+PARALLEL_WORKERS = _env_int("PARALLEL_WORKERS", 0)
+PARALLEL_CHUNK = os.getenv("PARALLEL_CHUNK", "month").strip().lower()
+PARALLEL_MIN_ROWS = _env_int("PARALLEL_MIN_ROWS", 200_000)
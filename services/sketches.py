@@ -0,0 +1,418 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+MIN_PRECISION = 4
+MAX_PRECISION = 16
+
+_DENSE = 0
+_SPARSE = 1
+
+# Columns of the box plot statistics computed by `box_statistics`.
+BOX_STATISTICS = (
+    "COUNT",
+    "MEAN",
+    "MIN",
+    "LOWER_FENCE",
+    "Q1",
+    "MEDIAN",
+    "Q3",
+    "UPPER_FENCE",
+    "MAX",
+)
+
+# KLL sketch size parameter: about 3k values kept, rank error around 1.7 / k.
+KLL_K = 200
+
+
+def precision_for_error(relative_error: float) -> int:
+    """Return the smallest HyperLogLog precision meeting a target error.
+
+    The standard error of a HyperLogLog estimate is about `1.04 / sqrt(2 ** p)`.
+
+    Args:
+        relative_error (float): Target relative standard error (e.g. 0.02 for 2%).
+
+    Returns:
+        int: Register precision `p`, clamped to the supported range.
+    """
+    if relative_error <= 0:
+        raise ValueError("HLL relative error must be greater than 0")
+    precision = math.ceil(math.log2((1.04 / relative_error) ** 2))
+    return min(max(precision, MIN_PRECISION), MAX_PRECISION)
+
+
+def hash_values(values) -> np.ndarray:
+    """Hash values to stable 64-bit integers, ignoring nulls.
+
+    Values are hashed through their string form so that e.g. `42` and `42.0`
+    loaded from different sources land on the same hash.
+    """
+    series = pd.Series(values).dropna()
+    if series.empty:
+        return np.empty(0, dtype=np.uint64)
+    return pd.util.hash_array(series.astype(str).to_numpy(dtype=object))
+
+
+def register_ranks(hashes: np.ndarray, precision: int) -> tuple[np.ndarray, np.ndarray]:
+    """Split 64-bit hashes into HyperLogLog register indexes and ranks.
+
+    Args:
+        hashes (np.ndarray): Unsigned 64-bit hashes.
+        precision (int): Register precision `p`.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Register index (top `p` bits) and rank
+            (position of the first set bit in the remaining bits) per hash.
+    """
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    index = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    # Keep the top 52 remaining bits so they are exactly representable as float64
+    # and frexp gives their bit length.
+    remaining = (hashes << np.uint64(precision)) >> np.uint64(12)
+    _, bit_length = np.frexp(remaining.astype(np.float64))
+    rank = np.where(remaining == 0, 53, 53 - bit_length).astype(np.uint8)
+    return index, rank
+
+
+class HyperLogLog:
+    """Mergeable HyperLogLog distinct-count sketch."""
+
+    def __init__(self, precision: int, registers: np.ndarray | None = None):
+        if not MIN_PRECISION <= precision <= MAX_PRECISION:
+            raise ValueError(
+                f"HLL precision must be between {MIN_PRECISION} and {MAX_PRECISION}"
+            )
+        self.precision = precision
+        self.registers = (
+            np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+        )
+
+    @classmethod
+    def from_values(cls, values, precision: int) -> "HyperLogLog":
+        """Build a sketch from raw values (nulls are ignored)."""
+        sketch = cls(precision)
+        index, rank = register_ranks(hash_values(values), precision)
+        np.maximum.at(sketch.registers, index, rank)
+        return sketch
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Merge another sketch into this one in place and return it."""
+        if other.precision != self.precision:
+            raise ValueError(
+                f"Cannot merge HLL sketches of precision {self.precision} "
+                f"and {other.precision}"
+            )
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> float:
+        """Estimate the number of distinct values added to the sketch."""
+        return float(estimate_counts(self.registers[np.newaxis])[0])
+
+    def to_bytes(self) -> bytes:
+        """Serialize the sketch, using a sparse encoding when it is smaller."""
+        nonzero = np.flatnonzero(self.registers)
+        if len(nonzero) * 3 < len(self.registers):
+            return (
+                bytes([self.precision, _SPARSE])
+                + nonzero.astype("<u2").tobytes()
+                + self.registers[nonzero].tobytes()
+            )
+        return bytes([self.precision, _DENSE]) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "HyperLogLog":
+        """Deserialize a sketch produced by `to_bytes`."""
+        precision = blob[0]
+        registers = np.zeros(1 << precision, dtype=np.uint8)
+        _read_registers(blob, registers)
+        return cls(precision, registers)
+
+
+def _read_registers(blob: bytes, registers: np.ndarray):
+    """Copy the registers of a sketch serialized by `to_bytes` into `registers`."""
+    payload = memoryview(blob)[2:]
+    if blob[1] == _DENSE:
+        registers[:] = np.frombuffer(payload, dtype=np.uint8)
+        return
+    n = len(payload) // 3
+    index = np.frombuffer(payload[: 2 * n], dtype="<u2")
+    registers[index] = np.frombuffer(payload[2 * n :], dtype=np.uint8)
+
+
+def estimate_counts(registers: np.ndarray) -> np.ndarray:
+    """Estimate the distinct counts of sketches from their registers.
+
+    Args:
+        registers (np.ndarray): One row of `2 ** p` registers per sketch.
+
+    Returns:
+        np.ndarray: The HyperLogLog estimate of each row, with the small-range
+            (linear counting) correction.
+    """
+    m = registers.shape[1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimates = alpha * m * m / np.ldexp(1.0, -registers.astype(int)).sum(axis=1)
+    zeros = np.count_nonzero(registers == 0, axis=1)
+    small = (estimates <= 2.5 * m) & (zeros > 0)
+    estimates[small] = m * np.log(m / zeros[small])
+    return estimates
+
+
+def build_sketches(
+    df: pd.DataFrame, keys: list[str], value_col: str, precision: int
+) -> pd.DataFrame:
+    """Build one serialized HyperLogLog sketch per group of `keys`.
+
+    Args:
+        df (pandas.DataFrame): Source rows.
+        keys (list[str]): Grouping columns; null keys form their own group.
+        value_col (str): Column whose distinct values are sketched.
+        precision (int): Register precision `p`.
+
+    Returns:
+        pandas.DataFrame: One row per group with the `keys` columns and a
+            `SKETCH` column of serialized sketches.
+    """
+    rows = df[keys + [value_col]].dropna(subset=[value_col]).reset_index(drop=True)
+    index, rank = register_ranks(hash_values(rows[value_col]), precision)
+    registers = (
+        rows[keys]
+        .assign(_IDX=index, _RANK=rank)
+        .groupby(keys + ["_IDX"], dropna=False, sort=False)["_RANK"]
+        .max()
+        .reset_index()
+    )
+
+    sketches = []
+    for group, part in registers.groupby(keys, dropna=False, sort=False):
+        sketch = HyperLogLog(precision)
+        sketch.registers[part["_IDX"].to_numpy()] = part["_RANK"].to_numpy()
+        group = group if isinstance(group, tuple) else (group,)
+        sketches.append((*group, sketch.to_bytes()))
+    return pd.DataFrame(sketches, columns=keys + ["SKETCH"])
+
+
+class KLLSketch:
+    """Mergeable KLL quantile sketch (Karnin, Lang and Liberty).
+
+    Level `i` keeps values that each stand for `2 ** i` input values. When a
+    level outgrows its capacity it is compacted: sorted, and every other value
+    promoted to the next level with double weight. Count, sum, minimum and
+    maximum are tracked exactly. Sketches of at most `k` values are exact.
+    """
+
+    def __init__(self, k: int = KLL_K):
+        self.k = k
+        self.levels: list[np.ndarray] = [np.empty(0)]
+        self.count = 0
+        self.total = 0.0
+        self.min = math.nan
+        self.max = math.nan
+        self._offset = 0
+
+    @classmethod
+    def from_values(cls, values, k: int = KLL_K) -> "KLLSketch":
+        """Build a sketch from raw values (nulls are ignored)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        sketch = cls(k)
+        if len(values):
+            sketch.levels[0] = values
+            sketch.count = len(values)
+            sketch.total = float(values.sum())
+            sketch.min = float(values.min())
+            sketch.max = float(values.max())
+            sketch._compress()
+        return sketch
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def _compress(self):
+        while True:
+            level = next(
+                (
+                    i
+                    for i, items in enumerate(self.levels)
+                    if len(items) > self._capacity(i)
+                ),
+                None,
+            )
+            if level is None:
+                return
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[level])
+            # An odd value out stays behind so the total weight is preserved.
+            odd = len(items) % 2
+            self.levels[level] = items[:odd]
+            self.levels[level + 1] = np.concatenate(
+                [self.levels[level + 1], items[odd + self._offset :: 2]]
+            )
+            # Alternate the kept half to avoid a systematic rank bias.
+            self._offset ^= 1
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Merge another sketch into this one in place and return it."""
+        if other.count == 0:
+            return self
+        self.k = min(self.k, other.k)
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.total += other.total
+        self.min = float(np.fmin(self.min, other.min))
+        self.max = float(np.fmax(self.max, other.max))
+        self._compress()
+        return self
+
+    def _weighted_items(self) -> tuple[np.ndarray, np.ndarray]:
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [
+                np.full(len(values), 2.0**level)
+                for level, values in enumerate(self.levels)
+            ]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantiles(self, qs) -> np.ndarray:
+        """Estimate the values at the given quantiles (between 0 and 1)."""
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.count == 0:
+            return np.full(qs.shape, np.nan)
+        items, weights = self._weighted_items()
+        ranks = np.cumsum(weights)
+        positions = np.searchsorted(ranks, qs * ranks[-1], side="left")
+        return items[np.minimum(positions, len(items) - 1)]
+
+    def box_statistics(self) -> dict:
+        """Estimate box plot statistics, see `box_statistics`."""
+        if self.count == 0:
+            return box_statistics([])
+        q1, median, q3 = self.quantiles([0.25, 0.5, 0.75])
+        items, _ = self._weighted_items()
+        # The extremes are exact; whiskers end at the furthest kept value inside
+        # the fences.
+        items = np.concatenate([[self.min], items, [self.max]])
+        return _box_statistics(
+            items, q1, median, q3, self.count, self.total / self.count
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serialize the sketch."""
+        header = np.array([self.k, self.count, len(self.levels)], dtype="<u8")
+        stats = np.array([self.total, self.min, self.max], dtype="<f8")
+        sizes = np.array([len(items) for items in self.levels], dtype="<u8")
+        values = np.concatenate(self.levels).astype("<f8")
+        return header.tobytes() + stats.tobytes() + sizes.tobytes() + values.tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "KLLSketch":
+        """Deserialize a sketch produced by `to_bytes`."""
+        k, count, n_levels = np.frombuffer(blob, dtype="<u8", count=3)
+        total, minimum, maximum = np.frombuffer(blob, dtype="<f8", count=3, offset=24)
+        sizes = np.frombuffer(blob, dtype="<u8", count=int(n_levels), offset=48)
+        values = np.frombuffer(blob, dtype="<f8", offset=48 + 8 * int(n_levels))
+        sketch = cls(int(k))
+        sketch.levels = np.split(values.copy(), np.cumsum(sizes)[:-1].astype(int))
+        sketch.count = int(count)
+        sketch.total, sketch.min, sketch.max = (
+            float(total),
+            float(minimum),
+            float(maximum),
+        )
+        return sketch
+
+
+def _box_statistics(values, q1, median, q3, count, mean) -> dict:
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return {
+        "COUNT": int(count),
+        "MEAN": float(mean),
+        "MIN": float(values.min()),
+        "LOWER_FENCE": float(inside.min()),
+        "Q1": float(q1),
+        "MEDIAN": float(median),
+        "Q3": float(q3),
+        "UPPER_FENCE": float(inside.max()),
+        "MAX": float(values.max()),
+    }
+
+
+def box_statistics(values) -> dict:
+    """Compute exact box plot statistics of `values` (nulls are ignored).
+
+    Quartiles use linear interpolation. The fences are the most extreme values
+    within 1.5 IQR of the quartiles, where plotly draws the whiskers.
+
+    Returns:
+        dict: The `BOX_STATISTICS` (NaN when there are no values).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = np.sort(values[~np.isnan(values)])
+    if not len(values):
+        return {key: (0 if key == "COUNT" else math.nan) for key in BOX_STATISTICS}
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    return _box_statistics(values, q1, median, q3, len(values), values.mean())
+
+
+def build_quantile_sketches(
+    df: pd.DataFrame, keys: list[str], value_col: str, k: int = KLL_K
+) -> pd.DataFrame:
+    """Build one serialized KLL sketch and value count per group of `keys`.
+
+    Returns:
+        pandas.DataFrame: One row per group with the `keys` columns, `COUNT`
+            (non-null values) and `SKETCH`.
+    """
+    rows = df[keys + [value_col]].dropna(subset=[value_col])
+    sketches = []
+    for group, part in rows.groupby(keys, dropna=False, sort=True):
+        sketch = KLLSketch.from_values(part[value_col].to_numpy(), k)
+        group = group if isinstance(group, tuple) else (group,)
+        sketches.append((*group, sketch.count, sketch.to_bytes()))
+    return pd.DataFrame(sketches, columns=keys + ["COUNT", "SKETCH"])
+
+
+def merge_counts(sketches: pd.Series, keys: pd.DataFrame) -> pd.DataFrame:
+    """Merge serialized HyperLogLog sketches per group and estimate their counts.
+
+    All sketches are decoded into one register matrix and merged with a single
+    `np.maximum.reduceat` over the rows of each group, instead of one sketch
+    object per row. Null sketches are skipped.
+
+    Args:
+        sketches (pandas.Series): Sketches serialized by `HyperLogLog.to_bytes`,
+            all of the same precision.
+        keys (pandas.DataFrame): Group of each sketch, aligned with `sketches`.
+
+    Returns:
+        pandas.DataFrame: One row per group holding a sketch, with the `keys`
+            columns and the rounded estimate as COUNT.
+    """
+    present = sketches.notna().to_numpy()
+    sketches, keys = sketches[present], keys[present]
+    if sketches.empty:
+        return keys.assign(COUNT=pd.Series(dtype="int64"))
+    precisions = {blob[0] for blob in sketches}
+    if len(precisions) > 1:
+        raise ValueError(f"Cannot merge HLL sketches of precisions {precisions}")
+    registers = np.zeros((len(sketches), 1 << precisions.pop()), dtype=np.uint8)
+    for row, blob in zip(registers, sketches):
+        _read_registers(blob, row)
+
+    groups = list(keys.groupby(list(keys.columns), dropna=False).indices.values())
+    order = np.concatenate(groups)
+    starts = np.cumsum([0, *map(len, groups)])[:-1]
+    merged = np.maximum.reduceat(registers[order], starts, axis=0)
+    counts = np.round(estimate_counts(merged)).astype("int64")
+    return keys.iloc[order[starts]].reset_index(drop=True).assign(COUNT=counts)
@@ -0,0 +1,229 @@
+"""Memory-mapped columnar snapshots of the fact tables.
+
+With `COLUMNAR_SNAPSHOT`, the loader writes the fact columns the dashboard
+queries (`SNAPSHOT_COLUMNS`) as one `.npy` file per column into a directory
+next to the database, `<database stem>.columns/`:
+
+- rows are ordered by YEAR_MONTH, and `months.npy` / `offsets.npy` index the
+  rows of each month, so a YEAR_MONTH range is a contiguous slice of every
+  column; rows without a YEAR_MONTH are left out;
+- numeric columns keep their fixed-width NumPy dtype (nulls are NaN in float
+  columns);
+- string columns are dictionary-encoded: `<column>.npy` holds int32 codes
+  (-1 for null) into the sorted, fixed-width `<column>.dict.npy`;
+- `manifest.json`, written last, lists the tables, their columns and the
+  data version the snapshot was taken from.
+
+`ColumnarSnapshot` maps the files read-only: columns are NumPy views of the
+OS page cache, so opening a snapshot costs no parsing or copying, and
+workers forked after it was opened (or mapping the same files) share its
+pages.
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from services.queries import sqlite_path
+
+# Fact columns read by the dashboard's queries, by table.
+SNAPSHOT_COLUMNS = {
+    "FACT_CLAIMS": [
+        "YEAR_MONTH",
+        "PERSON_ID",
+        "ENCOUNTER_ID",
+        "ENCOUNTER_GROUP_SK",
+        "ENCOUNTER_TYPE_SK",
+        "CCSR_CATEGORY_DESCRIPTION",
+        "PAID_AMOUNT",
+    ],
+    "FACT_MEMBER_MONTHS": ["YEAR_MONTH", "PERSON_ID", "NORMALIZED_RISK_SCORE"],
+}
+
+MANIFEST = "manifest.json"
+
+
+def snapshot_path(db_path: str) -> Path:
+    """Return the snapshot directory of a database, `<database stem>.columns`."""
+    return Path(db_path).with_suffix(".columns")
+
+
+def _write_column(directory: Path, name: str, values: pd.Series) -> str:
+    """Write a column as `.npy` file(s) and return its kind: "dictionary" or its dtype."""
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        array = values.to_numpy()
+        np.save(directory / f"{name}.npy", array)
+        return str(array.dtype)
+    codes, dictionary = pd.factorize(values.astype(object), sort=True)
+    np.save(directory / f"{name}.npy", codes.astype(np.int32))
+    np.save(directory / f"{name}.dict.npy", np.asarray(dictionary, dtype=str))
+    return "dictionary"
+
+
+def write_snapshot(
+    tables: dict[str, pd.DataFrame], path: Path, data_version: str
+) -> dict:
+    """Write fact tables as a columnar snapshot at `path`, replacing any there.
+
+    The snapshot is written beside `path` and moved into place once
+    complete. Processes still mapping the files it replaces keep reading
+    them until they reopen.
+
+    Args:
+        tables (dict[str, pandas.DataFrame]): Rows of each table, with at least
+            its `SNAPSHOT_COLUMNS`.
+        path (pathlib.Path): Snapshot directory.
+        data_version (str): Data version of the rows.
+
+    Returns:
+        dict: The snapshot's manifest.
+    """
+    building = path.with_name(path.name + ".tmp")
+    shutil.rmtree(building, ignore_errors=True)
+    building.mkdir(parents=True)
+    manifest = {"data_version": data_version, "tables": {}}
+    for table_name, df in tables.items():
+        directory = building / table_name
+        directory.mkdir()
+        df = df.loc[df["YEAR_MONTH"].notna(), SNAPSHOT_COLUMNS[table_name]]
+        df = df.sort_values("YEAR_MONTH", kind="stable").astype({"YEAR_MONTH": "int32"})
+        months, counts = np.unique(df["YEAR_MONTH"].to_numpy(), return_counts=True)
+        np.save(directory / "months.npy", months)
+        np.save(directory / "offsets.npy", np.concatenate([[0], np.cumsum(counts)]))
+        manifest["tables"][table_name] = {
+            "rows": len(df),
+            "columns": {
+                name: _write_column(directory, name, df[name]) for name in df.columns
+            },
+        }
+    (building / MANIFEST).write_text(json.dumps(manifest, indent=2))
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(building, path)
+    return manifest
+
+
+class ColumnarSnapshot:
+    """Read-only, memory-mapped view of a snapshot written by `write_snapshot`.
+
+    Args:
+        path (str | pathlib.Path): Snapshot directory.
+
+    Raises:
+        FileNotFoundError: If the directory holds no complete snapshot.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        manifest = json.loads((self.path / MANIFEST).read_text())
+        self.data_version: str = manifest["data_version"]
+        self.kinds: dict[str, dict[str, str]] = {
+            table_name: info["columns"]
+            for table_name, info in manifest["tables"].items()
+        }
+        self._arrays: dict[tuple[str, str], np.ndarray] = {}
+        for table_name, columns in self.kinds.items():
+            files = ["months", "offsets", *columns]
+            files += [
+                f"{name}.dict" for name, kind in columns.items() if kind == "dictionary"
+            ]
+            for name in files:
+                self._arrays[table_name, name] = np.load(
+                    self.path / table_name / f"{name}.npy", mmap_mode="r"
+                )
+
+    @property
+    def tables(self) -> list[str]:
+        return list(self.kinds)
+
+    def rows(
+        self,
+        table_name: str,
+        start_yyyymm: Optional[int] = None,
+        end_yyyymm: Optional[int] = None,
+    ) -> slice:
+        """Return the row slice of a table holding a YEAR_MONTH range (all rows without one)."""
+        months = self._arrays[table_name, "months"]
+        offsets = self._arrays[table_name, "offsets"]
+        first = 0 if start_yyyymm is None else np.searchsorted(months, start_yyyymm)
+        last = (
+            len(months)
+            if end_yyyymm is None
+            else np.searchsorted(months, end_yyyymm, side="right")
+        )
+        return slice(int(offsets[first]), int(offsets[max(first, last)]))
+
+    def column(
+        self,
+        table_name: str,
+        name: str,
+        start_yyyymm: Optional[int] = None,
+        end_yyyymm: Optional[int] = None,
+    ) -> np.ndarray:
+        """Return a column's values (codes, for a dictionary column) as a zero-copy view.
+
+        Args:
+            table_name (str): Snapshot table.
+            name (str): Column name.
+            start_yyyymm (int, optional): First YEAR_MONTH of the rows.
+            end_yyyymm (int, optional): Last YEAR_MONTH of the rows.
+        """
+        rows = self.rows(table_name, start_yyyymm, end_yyyymm)
+        return self._arrays[table_name, name][rows]
+
+    def dictionary(self, table_name: str, name: str) -> np.ndarray:
+        """Return the sorted values the codes of a dictionary column point into."""
+        return self._arrays[table_name, f"{name}.dict"]
+
+    def frame(
+        self,
+        table_name: str,
+        columns: Optional[list[str]] = None,
+        start_yyyymm: Optional[int] = None,
+        end_yyyymm: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Return columns of a YEAR_MONTH range as a DataFrame.
+
+        Dictionary columns become categoricals over their dictionary, so
+        strings are not materialized per row.
+        """
+        data = {}
+        for name in columns or list(self.kinds[table_name]):
+            values = self.column(table_name, name, start_yyyymm, end_yyyymm)
+            if self.kinds[table_name][name] == "dictionary":
+                values = pd.Categorical.from_codes(
+                    values, categories=self.dictionary(table_name, name)
+                )
+            data[name] = values
+        return pd.DataFrame(data)
+
+
+def open_snapshot(db_path: str, data_version: str) -> Optional[ColumnarSnapshot]:
+    """Map the snapshot of a database, or return None if it has none of `data_version`."""
+    try:
+        snapshot = ColumnarSnapshot(snapshot_path(db_path))
+    except FileNotFoundError:
+        return None
+    return snapshot if snapshot.data_version == data_version else None
+
+
+if __name__ == "__main__":
+    path = snapshot_path(sys.argv[1] if len(sys.argv) > 1 else sqlite_path)
+    started = time.perf_counter()
+    snapshot = ColumnarSnapshot(path)
+    print(
+        f"{path} (data version {snapshot.data_version[:12]}) mapped in "
+        f"{(time.perf_counter() - started) * 1000:.1f} ms"
+    )
+    for table_name, columns in snapshot.kinds.items():
+        print(f"{table_name}: {snapshot.rows(table_name).stop} rows")
+        for name, kind in columns.items():
+            size = os.path.getsize(path / table_name / f"{name}.npy")
+            print(f"  {name:<28} {kind:<10} {size / 1024:>9.0f} KiB")
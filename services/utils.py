@@ -1,3 +1,5 @@
+import hashlib
+import json
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 
@@ -5,6 +7,12 @@ import pandas as pd
 from dateutil.relativedelta import relativedelta
 from pandas import DateOffset
 
+# Label of the bucket summing the categories beyond a top-N chart.
+ROLLUP_VALUE = "All other categories"
+
+# Filters on more values than this bind them as one JSON array parameter.
+MAX_IN_LIST_PARAMS = 50
+
 
 def dt_to_yyyymm(dt):
     """Convert a datetime object to an integer in YYYYMM format.
@@ -18,50 +26,127 @@ def dt_to_yyyymm(dt):
     return dt.year * 100 + dt.month
 
 
+def fingerprint(value) -> str:
+    """Return a stable hex digest identifying the content of `value`.
+
+    DataFrames and Series are hashed by content (values, index and column
+    names), containers recursively and everything else by `repr`.
+    """
+    digest = hashlib.sha1()
+    _update_digest(digest, value)
+    return digest.hexdigest()
+
+
+def _update_digest(digest, value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(type(value).__name__.encode())
+        names = value.columns if isinstance(value, pd.DataFrame) else [value.name]
+        digest.update(repr(list(names)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}[{len(value)}]".encode())
+        for item in value:
+            _update_digest(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f"dict[{len(value)}]".encode())
+        for key in sorted(value, key=repr):
+            _update_digest(digest, key)
+            _update_digest(digest, value[key])
+    else:
+        digest.update(repr(value).encode())
+
+
+def _selected_values(selection: dict, key: str) -> list:
+    """Return the distinct `key` values of every selected point, sorted."""
+    return sorted({point[key] for point in selection["points"] if key in point})
+
+
 def extract_sql_filters(group_click=None, encounter_type_click=None, ccsr_click=None):
     """Extract SQL filter values from selected data points in interactive charts.
 
+    Every selected point counts, so shift-clicking or box-selecting several
+    bars filters on all of them at once.
+
     Args:
-        group_click (dict, optional): Click data for encounter group selection.
-        encounter_type_click (dict, optional): Click data for encounter type selection.
-        ccsr_click (dict, optional): Click data for CCSR category selection.
+        group_click (dict, optional): Selection data for encounter group selection.
+        encounter_type_click (dict, optional): Selection data for encounter type selection.
+        ccsr_click (dict, optional): Selection data for CCSR category selection.
 
     Returns:
-        dict: Dictionary of SQL filter column names and their selected values.
+        dict: Dictionary of SQL filter column names and lists of their selected values.
     """
     filters = {}
     if group_click and group_click.get("points"):
-        filters["ENCOUNTER_GROUP"] = group_click["points"][0]["y"]
+        filters["ENCOUNTER_GROUP"] = _selected_values(group_click, "y")
     if encounter_type_click and encounter_type_click.get("points"):
-        filters["ENCOUNTER_TYPE"] = encounter_type_click["points"][0]["y"]
+        filters["ENCOUNTER_TYPE"] = _selected_values(encounter_type_click, "y")
     if ccsr_click and ccsr_click.get("points"):
-        ccsr_data = ccsr_click["points"][0]["customdata"]
-        filters["CCSR_CATEGORY_DESCRIPTION"] = (
-            ccsr_data if ccsr_data != "other" else None
-        )
+        ccsr_values = _selected_values(ccsr_click, "customdata")
+        # The rolled-up bucket spans many categories, so a selection including
+        # it does not filter.
+        if ROLLUP_VALUE not in ccsr_values:
+            filters["CCSR_CATEGORY_DESCRIPTION"] = [
+                value if value != "other" else None for value in ccsr_values
+            ]
     return filters
 
 
-def build_filter_clause(filters: Optional[dict]) -> tuple[str, list]:
-    """Build a SQL filter condition string and parameter list from a dictionary of filters.
+def build_filter_clause(
+    filters: Optional[dict],
+    max_in_list: Optional[int] = MAX_IN_LIST_PARAMS,
+    expressions: Optional[dict] = None,
+) -> tuple[str, dict]:
+    """Build a SQL filter condition string and named parameters from a dictionary of filters.
+
+    Columns are emitted in sorted order and values are bound as `:COLUMN`
+    (single value) or `:COLUMN_0, :COLUMN_1, ...` (`IN` list) parameters, so
+    the condition text depends only on which columns are filtered and on how
+    many values each has. Lists longer than `max_in_list` are bound as a single
+    JSON array read with SQLite's `json_each`.
 
     Args:
-        filters (dict, optional): Dictionary of column-value pairs for filtering.
+        filters (dict, optional): Dictionary of column names to a value or a list
+            of values. None matches NULL; an empty list does not filter.
+        max_in_list (int, optional): Longest list bound as an `IN` list, or None
+            to bind every list that way (for engines without `json_each`).
+        expressions (dict, optional): SQL expression compared instead of the
+            column name for some columns, e.g. a column qualified by its table
+            alias. Parameters are still named after the column.
 
     Returns:
-        tuple[str, list]: Tuple containing the SQL condition string and a list of parameter values.
+        tuple[str, dict]: Tuple containing the SQL condition string and a dict of parameter values.
     """
     clauses = []
-    params = []
+    params = {}
     if not filters:
-        return "", []
-
-    for col, value in filters.items():
-        if value is None:
-            clauses.append(f"{col} IS NULL")
-        else:
-            clauses.append(f"{col} = ?")
-            params.append(value)
+        return "", {}
+
+    for col in sorted(filters):
+        values = filters[col]
+        expression = (expressions or {}).get(col, col)
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+        present = sorted({value for value in values if value is not None})
+
+        conditions = []
+        if len(present) == 1:
+            conditions.append(f"{expression} = :{col}")
+            params[col] = present[0]
+        elif len(present) > 1 and (max_in_list is None or len(present) <= max_in_list):
+            names = [f"{col}_{i}" for i in range(len(present))]
+            placeholders = ", ".join(f":{name}" for name in names)
+            conditions.append(f"{expression} IN ({placeholders})")
+            params.update(zip(names, present))
+        elif present:
+            conditions.append(f"{expression} IN (SELECT value FROM json_each(:{col}))")
+            params[col] = json.dumps(present)
+        if any(value is None for value in values):
+            conditions.append(f"{expression} IS NULL")
+
+        if len(conditions) > 1:
+            clauses.append(f"({' OR '.join(conditions)})")
+        elif conditions:
+            clauses.append(conditions[0])
 
     condition = " AND ".join(clauses)
     return (condition if condition else ""), params
@@ -80,6 +165,19 @@ def truncate_text(text, max_length=30):
     return text[:max_length] + "..." if len(text) > max_length else text
 
 
+def truncate_series(series: pd.Series, max_length=30) -> pd.Series:
+    """Vectorized `truncate_text` for a Series of strings.
+
+    Args:
+        series (pd.Series): The strings to truncate.
+        max_length (int, optional): Maximum allowed length. Defaults to 30.
+
+    Returns:
+        pd.Series: Truncated strings with ellipsis where needed.
+    """
+    return series.where(series.str.len() <= max_length, series.str[:max_length] + "...")
+
+
 def format_large_number(value):
     """Format a numeric value with a dollar sign and appropriate suffix (B, M, K).
 
@@ -0,0 +1,151 @@
+"""Execution of dashboard queries in the data warehouse (pushdown mode).
+
+Statements are written for SQLite with `:name` parameters; the helpers here
+adapt them to the warehouse driver, and `WarehouseExecutor` runs them on a
+`ConnectionPool`. The pool can hold connections to a local SQLite database
+standing in for Snowflake.
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from services.columnar import fetch_table, to_dataframe
+from services.connection_pool import ConnectionPool
+from services.queries import table_list
+
+_TABLE_REFERENCE = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_]\w*)", re.IGNORECASE)
+_NAMED_PARAM = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+_ALIAS = re.compile(r"\bAS\s+([A-Za-z_]\w*)", re.IGNORECASE)
+
+
+def referenced_tables(sql: str) -> set[str]:
+    """Return the upper-cased names following FROM or JOIN in `sql` (CTEs included)."""
+    return {name.upper() for name in _TABLE_REFERENCE.findall(sql)}
+
+
+def to_paramstyle(sql: str, paramstyle: str) -> str:
+    """Rewrite the `:name` parameters of `sql` for a driver's DB-API paramstyle.
+
+    Args:
+        sql (str): Statement with `:name` parameters.
+        paramstyle (str): "named" (unchanged) or "pyformat" (`%(name)s`, with
+            literal `%` doubled), the default of the Snowflake connector.
+    """
+    if paramstyle == "named":
+        return sql
+    if paramstyle == "pyformat":
+        return _NAMED_PARAM.sub(r"%(\1)s", sql.replace("%", "%%"))
+    raise ValueError(f"Unsupported paramstyle {paramstyle!r}")
+
+
+def restore_aliases(names: list[str], sql: str) -> list[str]:
+    """Return result column names in the spelling of their alias in `sql`.
+
+    Snowflake upper-cases unquoted identifiers, so a column selected `AS paid`
+    comes back as PAID while the data functions read `paid`.
+    """
+    aliases = {alias.upper(): alias for alias in _ALIAS.findall(sql)}
+    return [aliases.get(name, name) for name in names]
+
+
+class WarehouseExecutor:
+    """Runs queries in the warehouse on a pool of connections.
+
+    Queries are submitted to one worker thread per pooled connection and
+    return futures, so several can be in flight at once. Each query borrows a
+    connection from `pool` for its duration. A forked process starts its own
+    workers.
+
+    Args:
+        pool (ConnectionPool): Connections to the warehouse.
+        paramstyle (str): Parameter style of their driver, see `to_paramstyle`.
+    """
+
+    def __init__(self, pool: ConnectionPool, paramstyle: str):
+        self.pool = pool
+        self.paramstyle = paramstyle
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        sql: str,
+        params: Optional[dict] = None,
+        schema: Optional[dict[str, str]] = None,
+    ) -> Future:
+        """Start running `sql` with `params` bound; the future holds a DataFrame.
+
+        Results with a declared `schema` are fetched as typed Arrow columns
+        (see `services.columnar`).
+        """
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.pool.max_size, thread_name_prefix="warehouse"
+                )
+                self._pid = os.getpid()
+            executor = self._executor
+        return executor.submit(self._run, sql, params, schema)
+
+    def query(
+        self,
+        sql: str,
+        params: Optional[dict] = None,
+        schema: Optional[dict[str, str]] = None,
+    ) -> pd.DataFrame:
+        """Run `sql` with `params` bound and wait for its result."""
+        return self.submit(sql, params, schema).result()
+
+    def _run(
+        self, sql: str, params: Optional[dict], schema: Optional[dict[str, str]]
+    ) -> pd.DataFrame:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                if params:
+                    cursor.execute(to_paramstyle(sql, self.paramstyle), params)
+                else:
+                    cursor.execute(sql)
+                names = restore_aliases(
+                    [column[0] for column in cursor.description], sql
+                )
+                if schema is not None:
+                    return to_dataframe(fetch_table(cursor, schema, names), schema)
+                if hasattr(cursor, "fetch_pandas_all"):
+                    result = cursor.fetch_pandas_all()
+                    return result.rename(columns=dict(zip(result.columns, names)))
+                return pd.DataFrame.from_records(cursor.fetchall(), columns=names)
+            finally:
+                cursor.close()
+
+
+def build_standin(path: str, csv_folder: Path):
+    """Write every table of `table_list` from the CSV files into a SQLite database.
+
+    The result is a complete (not truncated) copy usable as
+    `WAREHOUSE_STANDIN_PATH`.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        for table_info in table_list:
+            table_name = table_info["table_name"]
+            df = pd.read_csv(csv_folder / f"{table_name}.csv")
+            df.to_sql(table_name, conn, if_exists="replace", index=False)
+            print(f"{len(df)} records written to {table_name}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m services.warehouse <standin.db>")
+    build_standin(sys.argv[1], Path(__file__).resolve().parent.parent / "csv_sample")
@@ -0,0 +1,14 @@
+import pytest
+
+from services.database import sqlite_manager
+from services.result_cache import result_cache
+
+
+@pytest.fixture(scope="session")
+def database(tmp_path_factory):
+    """`sqlite_manager` with the sample CSVs loaded into a temporary directory."""
+    directory = tmp_path_factory.mktemp("data")
+    sqlite_manager.db_path = str(directory / "app_data.db")
+    result_cache.path = str(directory / "result_cache.db")
+    sqlite_manager.initialize()
+    return sqlite_manager
@@ -0,0 +1,113 @@
+"""Queueing, rejection, deadlines and counters of query admission."""
+
+import threading
+import time
+
+import pytest
+
+import services.database
+from services.admission import AdmissionControl, QueryRejected, QueryTimeout
+
+# Counts to a billion: far longer than the deadlines below.
+SLOW_QUERY = """
+    WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 1e9)
+    SELECT COUNT(*) FROM n
+"""
+
+
+def _hold(admission, lane, released, admitted=None):
+    """Start a thread holding a slot of `lane` until `released` is set."""
+
+    def run():
+        with admission.admit(lane, None, None):
+            if admitted is not None:
+                admitted.set()
+            released.wait()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def _wait_queued(admission, lane, count):
+    for _ in range(200):
+        if admission.stats()[lane]["queued"] == count:
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"{count} {lane} queries never queued")
+
+
+def test_query_waits_for_a_free_slot():
+    admission = AdmissionControl({"cheap": 1, "expensive": 1}, max_queued=1)
+    released, admitted = threading.Event(), threading.Event()
+    threads = [_hold(admission, "cheap", released)]
+    _wait_queued(admission, "cheap", 0)
+    threads.append(_hold(admission, "cheap", released, admitted))
+    try:
+        _wait_queued(admission, "cheap", 1)
+        assert not admitted.is_set()
+        # The other lane has its own slots.
+        with admission.admit("expensive", None, None):
+            pass
+    finally:
+        released.set()
+        for thread in threads:
+            thread.join()
+    assert admitted.is_set()
+    stats = admission.stats()["cheap"]
+    assert (stats["admitted"], stats["queued"], stats["running"]) == (2, 0, 0)
+    assert stats["max_wait_ms"] > 0
+
+
+def test_query_is_rejected_when_the_line_is_full():
+    admission = AdmissionControl({"cheap": 1, "expensive": 1}, max_queued=1)
+    released = threading.Event()
+    threads = [_hold(admission, "cheap", released)]
+    _wait_queued(admission, "cheap", 0)
+    threads.append(_hold(admission, "cheap", released))
+    _wait_queued(admission, "cheap", 1)
+    try:
+        with pytest.raises(QueryRejected):
+            with admission.admit("cheap", None, None):
+                pass
+        assert admission.stats()["cheap"]["rejected"] == 1
+    finally:
+        released.set()
+        for thread in threads:
+            thread.join()
+
+
+def test_query_is_rejected_when_its_deadline_passes_in_line():
+    admission = AdmissionControl({"cheap": 1, "expensive": 1}, max_queued=1)
+    released = threading.Event()
+    holder = _hold(admission, "cheap", released)
+    _wait_queued(admission, "cheap", 0)
+    try:
+        started = time.monotonic()
+        with pytest.raises(QueryRejected):
+            with admission.admit("cheap", started + 0.1, None):
+                pass
+        assert time.monotonic() - started < 1
+        stats = admission.stats()["cheap"]
+        assert (stats["rejected"], stats["queued"], stats["running"]) == (1, 0, 1)
+    finally:
+        released.set()
+        holder.join()
+
+
+def test_query_past_its_deadline_counts_as_timeout(database, monkeypatch):
+    monkeypatch.setattr(services.database, "QUERY_TIMEOUT", 0.1)
+    timeouts = database.admission.stats()["cheap"]["timeouts"]
+    with pytest.raises(QueryTimeout):
+        database.query(SLOW_QUERY)
+    stats = database.admission.stats()["cheap"]
+    assert stats["timeouts"] == timeouts + 1
+    assert stats["running"] == 0
+
+
+def test_metrics_route_serves_the_admission_counters(database):
+    from app import server
+
+    response = server.test_client().get("/metrics")
+    assert response.status_code == 200
+    assert set(response.get_json()) == {"cheap", "expensive"}
@@ -0,0 +1,389 @@
+"""Snapshot tests of the plain-dict figure builders.
+
+Each chart of `components` is built for representative inputs and compared,
+as JSON, with the same figure built through `plotly.graph_objects` (validated,
+as the builders did before they assembled plain dicts): data, layout,
+template and the base64 typed-array encoding of numeric arrays must match.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+from plotly.colors import qualitative
+from plotly.io.json import to_json_plotly
+
+from components.bar_chart import (
+    horizontal_bar_chart,
+    stacked_percentage_bar,
+    vertical_bar_chart,
+)
+from components.box_plot import box_plot
+from components.no_data_figure import no_data_figure
+from components.trend_chart import trend_chart
+from services.figure_cache import figure_cache
+
+BAR_MARGIN = dict(l=20, r=20, t=0, b=0, pad=5)
+
+
+def _reference_bar(
+    orientation,
+    data,
+    x,
+    y,
+    text=None,
+    bar_height=20,
+    show_tick_labels=True,
+    click_mode="event+select",
+    drag_mode=None,
+    custom_data=None,
+    text_position=None,
+    hover_template=None,
+    error=None,
+):
+    horizontal = orientation == "h"
+    values = data[x] if horizontal else data[y]
+    if error:
+        values = values + data[error]
+    n_bars = len(data[y] if horizontal else data[x])
+    fig = go.Figure(
+        go.Bar(
+            x=data[x].to_numpy(),
+            y=data[y].to_numpy(),
+            orientation=orientation,
+            marker_color="#64AFE0",
+            text=text,
+            textposition=text_position,
+            hovertemplate=hover_template,
+            hoverlabel=dict(bgcolor="white", font=dict(color="black")),
+            customdata=(custom_data if custom_data is not None else data[y]).to_numpy()
+            if horizontal
+            else None,
+            error_x=dict(type="data", array=data[error].to_numpy(), thickness=1)
+            if error
+            else None,
+        )
+    )
+    value_range = [0, max(values) * 1.2 if max(values) > 0 else 1]
+    if horizontal:
+        fig.update_layout(
+            yaxis=dict(autorange="reversed"),
+            xaxis=dict(showticklabels=show_tick_labels, range=value_range),
+            dragmode=drag_mode,
+        )
+    else:
+        fig.update_layout(
+            xaxis=dict(automargin=True),
+            yaxis=dict(showticklabels=show_tick_labels, range=value_range),
+        )
+    fig.update_layout(
+        margin=BAR_MARGIN,
+        plot_bgcolor="white",
+        clickmode=click_mode,
+        height=max(200, n_bars * bar_height + 100),
+    )
+    return fig
+
+
+def _reference_stacked(data, x, group_col, height=120):
+    pct = (data[x] / data[x].sum() * 100).round(1)
+    fig = go.Figure()
+    for i, (value, group) in enumerate(zip(pct, data[group_col])):
+        fig.add_bar(
+            x=[value],
+            y=[""],
+            orientation="h",
+            name=group,
+            text=[f"{value:.0f}%"],
+            textposition="inside",
+            insidetextanchor="middle",
+            customdata=[[x, group]],
+            hovertemplate=(
+                "<b>%{customdata[1]}</b><br>%{customdata[0]}: %{x:,.2f}%<extra></extra>"
+            ),
+            marker_color=qualitative.Set2[i % len(qualitative.Set2)],
+        )
+    fig.update_layout(
+        barmode="stack",
+        margin=dict(l=20, r=20, t=40, b=20),
+        xaxis=dict(automargin=True, showgrid=False, zeroline=False, ticksuffix="%"),
+        yaxis=dict(showticklabels=False),
+        plot_bgcolor="white",
+        height=height,
+        legend=dict(orientation="h", yanchor="bottom", y=1.1, xanchor="center", x=0.5),
+    )
+    return fig
+
+
+def _reference_trend(current_data, comparison_data, current_margins=None):
+    fig = go.Figure()
+    x_cur, y_cur = zip(*current_data)
+    fig.add_trace(
+        go.Scatter(
+            x=np.asarray(x_cur),
+            y=np.asarray(y_cur),
+            mode="lines+markers",
+            name="Current",
+            line=dict(color="#64b0e1"),
+            error_y=None
+            if current_margins is None
+            else dict(type="data", array=np.asarray(current_margins), thickness=1),
+        )
+    )
+    x_cmp, y_cmp = zip(*comparison_data)
+    fig.add_trace(
+        go.Scatter(
+            x=np.asarray(x_cmp),
+            y=np.asarray(y_cmp),
+            mode="lines+markers",
+            name="Comparison",
+            line=dict(color="gray", dash="dash"),
+        )
+    )
+    fig.update_layout(
+        margin=dict(l=20, r=20, t=30, b=30),
+        plot_bgcolor="white",
+        height=100,
+        hovermode="x unified",
+        showlegend=False,
+    )
+    return fig
+
+
+def _reference_box(stats, name):
+    fig = go.Figure(
+        go.Box(
+            q1=stats["Q1"].to_numpy(),
+            median=stats["MEDIAN"].to_numpy(),
+            q3=stats["Q3"].to_numpy(),
+            lowerfence=stats["LOWER_FENCE"].to_numpy(),
+            upperfence=stats["UPPER_FENCE"].to_numpy(),
+            mean=stats["MEAN"].to_numpy(),
+            boxmean=True,
+            hoverinfo="y",
+            marker_color="#636efa",
+            name=name,
+            legendgroup="",
+            alignmentgroup="True",
+            offsetgroup="",
+            notched=False,
+            orientation="v",
+            showlegend=False,
+            x0=" ",
+            y0=" ",
+            xaxis="x",
+            yaxis="y",
+        )
+    )
+    fig.update_layout(
+        plot_bgcolor="white",
+        showlegend=False,
+        boxmode="group",
+        legend=dict(tracegroupgap=0),
+        margin=dict(l=10, r=10, t=10, b=10),
+        height=117,
+        xaxis=dict(anchor="y", domain=[0.0, 1.0], title=dict(text="")),
+        yaxis=dict(anchor="x", domain=[0.0, 1.0], title=dict(text="")),
+    )
+    fig.update_xaxes(showgrid=False, visible=False)
+    fig.update_yaxes(
+        showgrid=True,
+        zeroline=False,
+        ticks="outside",
+        showline=False,
+        linewidth=1,
+        linecolor="#ccc",
+    )
+    return fig
+
+
+def _reference_no_data(message):
+    fig = go.Figure()
+    fig.add_annotation(
+        text=message,
+        xref="paper",
+        yref="paper",
+        x=0.5,
+        y=0.5,
+        showarrow=False,
+        font=dict(size=18, color="gray"),
+        align="center",
+    )
+    fig.update_layout(
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        margin=dict(l=0, r=0, t=40, b=0),
+    )
+    return fig
+
+
+@pytest.fixture(scope="module")
+def inputs() -> dict:
+    groups = pd.DataFrame(
+        {
+            "ENCOUNTER_GROUP": ["Inpatient", "Outpatient", "Office Based", "Other"],
+            "PMPM": [412.5, 230.25, 98.0, 12.75],
+        }
+    )
+    months = pd.date_range("2024-01-01", periods=12, freq="MS")
+    return {
+        "groups": groups,
+        "group_text": [f"${v:,.0f}" for v in groups["PMPM"]],
+        "hover": "Group: %{customdata}<br>PMPM: %{text}<extra></extra>",
+        "ccsr": pd.DataFrame(
+            {
+                "CCSR_CATEGORY_DESCRIPTION": [f"Category {i}" for i in range(40)],
+                "PMPM": np.linspace(250.0, 1.5, 40),
+                "PMPM_MARGIN": np.linspace(20.0, 0.5, 40),
+            }
+        ),
+        "cohort": pd.DataFrame(
+            {
+                "percent_group": ["Top 1%", "Top 5%", "Top 10%", "Bottom 90%"],
+                "total_paid_amount": np.array(
+                    [5_400_000, 3_100_000, 2_000_000, 900_000]
+                ),
+            }
+        ),
+        "current": list(zip(months, np.linspace(300.0, 360.0, 12))),
+        "comparison": list(zip(months, np.linspace(290.0, 310.0, 12))),
+        "stats": pd.DataFrame(
+            {
+                "COUNT": [1200],
+                "Q1": [0.62],
+                "MEDIAN": [0.91],
+                "Q3": [1.35],
+                "LOWER_FENCE": [0.11],
+                "UPPER_FENCE": [2.4],
+                "MEAN": [1.05],
+            }
+        ),
+    }
+
+
+# `(figure, reference)` builders of each case, from the `inputs` fixture.
+CASES = {
+    "horizontal bars (encounter groups)": lambda d: (
+        horizontal_bar_chart(
+            data=d["groups"],
+            x="PMPM",
+            y="ENCOUNTER_GROUP",
+            text_fn=d["group_text"],
+            bar_height=40,
+            show_tick_labels=False,
+            drag_mode="select",
+            custom_data=d["groups"]["ENCOUNTER_GROUP"],
+            text_position="outside",
+            hover_template=d["hover"],
+        ),
+        _reference_bar(
+            "h",
+            d["groups"],
+            "PMPM",
+            "ENCOUNTER_GROUP",
+            text=d["group_text"],
+            bar_height=40,
+            show_tick_labels=False,
+            drag_mode="select",
+            custom_data=d["groups"]["ENCOUNTER_GROUP"],
+            text_position="outside",
+            hover_template=d["hover"],
+        ),
+    ),
+    "horizontal bars with error bars (CCSR)": lambda d: (
+        horizontal_bar_chart(
+            data=d["ccsr"],
+            x="PMPM",
+            y="CCSR_CATEGORY_DESCRIPTION",
+            show_tick_labels=False,
+            error="PMPM_MARGIN",
+        ),
+        _reference_bar(
+            "h",
+            d["ccsr"],
+            "PMPM",
+            "CCSR_CATEGORY_DESCRIPTION",
+            show_tick_labels=False,
+            error="PMPM_MARGIN",
+        ),
+    ),
+    "horizontal bars, integer values (cohorts)": lambda d: (
+        horizontal_bar_chart(
+            data=d["cohort"],
+            x="total_paid_amount",
+            y="percent_group",
+            bar_height=40,
+            click_mode="event",
+        ),
+        _reference_bar(
+            "h",
+            d["cohort"],
+            "total_paid_amount",
+            "percent_group",
+            bar_height=40,
+            click_mode="event",
+        ),
+    ),
+    "vertical bars": lambda d: (
+        vertical_bar_chart(data=d["groups"], x="ENCOUNTER_GROUP", y="PMPM"),
+        _reference_bar("v", d["groups"], "ENCOUNTER_GROUP", "PMPM"),
+    ),
+    "stacked percentage bar": lambda d: (
+        stacked_percentage_bar(
+            d["groups"].copy(), x="PMPM", group_col="ENCOUNTER_GROUP"
+        ),
+        _reference_stacked(d["groups"], "PMPM", "ENCOUNTER_GROUP"),
+    ),
+    "trend": lambda d: (
+        trend_chart(d["current"], d["comparison"]),
+        _reference_trend(d["current"], d["comparison"]),
+    ),
+    "trend with error bars": lambda d: (
+        trend_chart(d["current"], d["comparison"], [4.5] * 12),
+        _reference_trend(d["current"], d["comparison"], [4.5] * 12),
+    ),
+    "box plot": lambda d: (
+        box_plot(d["stats"], name="Risk Score"),
+        _reference_box(d["stats"], "Risk Score"),
+    ),
+    "no data": lambda d: (
+        no_data_figure("No data available."),
+        _reference_no_data("No data available."),
+    ),
+}
+
+
+def _first_difference(new, reference, path="") -> str | None:
+    if isinstance(new, dict) and isinstance(reference, dict):
+        for key in sorted(new.keys() | reference.keys()):
+            if key not in new or key not in reference:
+                return f"{path}.{key} only in {'new' if key in new else 'reference'}"
+            found = _first_difference(new[key], reference[key], f"{path}.{key}")
+            if found:
+                return found
+        return None
+    if isinstance(new, list) and isinstance(reference, list):
+        if len(new) != len(reference):
+            return f"{path}: {len(new)} items, reference has {len(reference)}"
+        for i, (a, b) in enumerate(zip(new, reference)):
+            found = _first_difference(a, b, f"{path}[{i}]")
+            if found:
+                return found
+        return None
+    if new != reference:
+        return f"{path}: {str(new)[:60]!r} != {str(reference)[:60]!r}"
+    return None
+
+
+@pytest.mark.parametrize("case", list(CASES))
+def test_dict_figure_matches_graph_objects(case, inputs, monkeypatch):
+    monkeypatch.setattr(figure_cache, "max_entries", 0)
+    figure, reference = CASES[case](inputs)
+    difference = _first_difference(
+        json.loads(to_json_plotly(figure)), json.loads(reference.to_json())
+    )
+    assert difference is None, difference
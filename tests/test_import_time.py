@@ -0,0 +1,12 @@
+from benchmarks.import_time import measure, total_ms
+
+# Well above `python -m benchmarks.import_time`'s default budget, so slow CI
+# machines pass; a regression to loading the data stack eagerly still fails.
+BUDGET_MS = 5000
+
+
+def test_app_imports_leave_the_snowflake_connector_unloaded():
+    records = measure()
+    imported = {name.strip() for name, _, _ in records}
+    assert "snowflake.connector" not in imported
+    assert total_ms(records) < BUDGET_MS
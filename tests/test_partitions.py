@@ -0,0 +1,129 @@
+"""Evicting and reloading partitions of the fact tables."""
+
+import sqlite3
+import types
+
+import pandas as pd
+import pytest
+
+import services.database
+from services.database import (
+    _CSV_FOLDER,
+    CLAIMS_DERIVED_TABLES,
+    SKETCH_TABLES,
+    SnowflakeManager,
+    SQLiteManager,
+)
+
+PARTITION = "FACT_CLAIMS_P2016"
+
+
+@pytest.fixture(params=["exact", "approximate"])
+def manager(request, database, tmp_path, monkeypatch):
+    """A fresh database of the sample data, in each `DISTINCT_MODE`.
+
+    Approximate mode builds the HyperLogLog sketch tables, exact mode the
+    encounter grain.
+    """
+    monkeypatch.setattr(services.database, "DISTINCT_MODE", request.param)
+    manager = SQLiteManager(str(tmp_path / "app_data.db"))
+    manager.initialize()
+    return manager
+
+
+class FakeWarehouse:
+    """DB-API stand-in for `snowflake.connector` serving the sample CSVs.
+
+    Every statement is recorded; the rows of the source table in the bound
+    YEAR_MONTH range are returned, so a leftover `LIMIT` would be visible in
+    `executed` rather than silently truncating them.
+    """
+
+    Error = Exception
+
+    def __init__(self):
+        self.executed = []
+
+    def connect(self, **kwargs):
+        return types.SimpleNamespace(cursor=self._cursor, close=lambda: None)
+
+    def _cursor(self):
+        result = {}
+
+        def execute(sql, params=None):
+            self.executed.append((sql, params))
+            table_name = sql.split("FROM ")[1].split()[0]
+            rows = pd.read_csv(_CSV_FOLDER / f"{table_name}.csv")
+            if params:
+                rows = rows[rows["YEAR_MONTH"].between(*params)]
+            result["rows"] = rows
+
+        return types.SimpleNamespace(
+            execute=execute,
+            fetch_pandas_all=lambda: result["rows"],
+            close=lambda: None,
+        )
+
+
+def _contents(manager: SQLiteManager, table_name: str) -> dict[str, pd.DataFrame]:
+    """Read `table_name` and the derived and sketch tables built from it, fully sorted."""
+    names = [table_name, *SKETCH_TABLES.get(table_name, {})]
+    if table_name == "FACT_CLAIMS":
+        names.extend(CLAIMS_DERIVED_TABLES)
+    conn = sqlite3.connect(manager.db_path)
+    try:
+        contents = {}
+        for name in names:
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({name})")]
+            if columns:
+                contents[name] = pd.read_sql_query(
+                    f"SELECT * FROM {name} ORDER BY {', '.join(columns)}", conn
+                )
+        return contents
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("table_name", ["FACT_CLAIMS", "FACT_MEMBER_MONTHS"])
+def test_evicted_partition_reloads_its_derived_and_sketch_rows(manager, table_name):
+    partition = f"{table_name}_P2016"
+    before = _contents(manager, table_name)
+
+    manager.evict_partition(partition)
+    for name, rows in _contents(manager, table_name).items():
+        assert not rows["YEAR_MONTH"].between(201601, 201612).any(), name
+    assert partition not in set(manager.partitions()[table_name]["PARTITION_NAME"])
+
+    manager.load_partition(table_name, 201607)
+    after = _contents(manager, table_name)
+    assert after.keys() == before.keys()
+    for name, rows in before.items():
+        pd.testing.assert_frame_equal(after[name], rows, check_dtype=False, obj=name)
+
+
+def test_partition_reloaded_from_snowflake_has_all_its_rows(
+    manager, tmp_path, monkeypatch
+):
+    env_file = tmp_path / ".env"
+    env_file.touch()
+    warehouse = FakeWarehouse()
+    monkeypatch.setenv("SNOWFLAKE_AUTH_METHOD", "password")
+    monkeypatch.setattr(services.database, "_ENV_FILE", env_file)
+    monkeypatch.setattr(
+        services.database, "snowflake_manager", SnowflakeManager(connector=warehouse)
+    )
+
+    manager.evict_partition(PARTITION)
+    manager.load_partition("FACT_CLAIMS", 201607)
+
+    [(sql, params)] = warehouse.executed
+    assert "LIMIT" not in sql
+    assert sql.endswith("WHERE YEAR_MONTH BETWEEN %s AND %s")
+    assert params == (201601, 201612)
+    claims = pd.read_csv(_CSV_FOLDER / "FACT_CLAIMS.csv")
+    conn = sqlite3.connect(manager.db_path)
+    try:
+        (loaded,) = conn.execute(f"SELECT COUNT(*) FROM {PARTITION}").fetchone()
+    finally:
+        conn.close()
+    assert loaded == claims["YEAR_MONTH"].between(201601, 201612).sum()
@@ -0,0 +1,74 @@
+"""Every dashboard query renders to one statement text whatever its values.
+
+Dates and filter values are bound parameters and partition routing is
+guarded by the bound window, so two periods, one of them crossing a
+partition boundary, and two filter values must produce the same statements.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+
+import pytest
+
+from reports.aco_dashboard import data
+from services.query_registry import QueryRegistry
+
+# (start, end, filters) of each run: a window inside the 2016 partitions, then
+# one spanning the 2016 and 2017 partitions.
+RUNS = [
+    (201601, 201606, {"ENCOUNTER_GROUP": ["inpatient"]}),
+    (201611, 201703, {"ENCOUNTER_GROUP": ["outpatient"]}),
+]
+
+
+def _run_queries(start_yyyymm, end_yyyymm, filters):
+    start_date = datetime(start_yyyymm // 100, start_yyyymm % 100, 1)
+    end_date = datetime(end_yyyymm // 100, end_yyyymm % 100, 1)
+    data.calc_kpis(start_date, end_date, filters)
+    data.get_demographic_data(start_date, end_date)
+    data.get_risk_score_distribution(start_date, end_date)
+    data.get_trends_data(filters)
+    data.get_condition_ccsr_data(start_yyyymm, end_yyyymm, filters, top_n=5)
+    data.get_pmpm_performance_vs_expected_data(start_yyyymm, end_yyyymm, filters)
+    data.get_cohort_data(start_yyyymm, end_yyyymm, filters)
+    page = data.get_top_members(start_yyyymm, end_yyyymm, filters, page_size=5)
+    assert not page.empty
+    after = (page["TOTAL_PAID"].iloc[-1], page["PERSON_ID"].iloc[-1])
+    data.get_top_members(start_yyyymm, end_yyyymm, filters, after, page_size=5)
+
+
+@pytest.fixture
+def statements(database, monkeypatch):
+    """Statement texts rendered by each query, recorded as they are rendered."""
+    rendered = defaultdict(set)
+    render = QueryRegistry.render
+
+    def recording_render(self, name, **fragments):
+        statement = render(self, name, **fragments)
+        rendered[name].add(statement)
+        return statement
+
+    monkeypatch.setattr(QueryRegistry, "render", recording_render)
+    return rendered
+
+
+def test_queries_render_one_statement_across_windows_and_values(statements):
+    for run in RUNS:
+        _run_queries(*run)
+    assert statements
+    repeated = {
+        name: len(texts) for name, texts in statements.items() if len(texts) > 1
+    }
+    assert not repeated
+
+
+def test_windowed_statements_skip_partitions_outside_the_window(database):
+    source = database.route("FACT_CLAIMS", windowed=True)
+    assert ":start_yyyymm" in source
+    outside = database._partitions_outside(
+        {"start_yyyymm": 201611, "end_yyyymm": 201703}
+    )
+    assert "FACT_CLAIMS_P2016" not in outside
+    assert "FACT_CLAIMS_P2017" not in outside
+    assert "FACT_CLAIMS_P2015" in outside
+    assert database._partitions_outside({}) == set()
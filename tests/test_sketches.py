@@ -0,0 +1,44 @@
+"""Bulk merging of HyperLogLog sketches."""
+
+import numpy as np
+import pandas as pd
+
+from services.sketches import HyperLogLog, build_sketches, merge_counts
+
+PRECISION = 12
+
+
+def _sketches() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    rows = pd.DataFrame(
+        {
+            "YEAR_MONTH": rng.choice([201601, 201602, 201603], 20_000),
+            "GROUP": rng.integers(0, 4, 20_000),
+            "ID": rng.integers(0, 10_000, 20_000),
+        }
+    )
+    return build_sketches(rows, ["YEAR_MONTH", "GROUP"], "ID", PRECISION)
+
+
+def test_merge_counts_matches_merging_sketches_one_by_one():
+    sketches = _sketches()
+    counts = merge_counts(sketches["SKETCH"], sketches[["YEAR_MONTH"]])
+
+    expected = []
+    for year_month, part in sketches.groupby("YEAR_MONTH"):
+        sketch = HyperLogLog(PRECISION)
+        for blob in part["SKETCH"]:
+            sketch.merge(HyperLogLog.from_bytes(blob))
+        expected.append((year_month, round(sketch.count())))
+    assert list(counts.itertuples(index=False, name=None)) == expected
+
+
+def test_merge_counts_skips_null_sketches():
+    sketches = _sketches()
+    sketches.loc[sketches["YEAR_MONTH"] == 201602, "SKETCH"] = None
+    counts = merge_counts(sketches["SKETCH"], sketches[["YEAR_MONTH"]])
+    assert counts["YEAR_MONTH"].tolist() == [201601, 201603]
+
+    empty = merge_counts(sketches["SKETCH"].iloc[:0], sketches[["YEAR_MONTH"]].iloc[:0])
+    assert empty.empty
+    assert list(empty.columns) == ["YEAR_MONTH", "COUNT"]